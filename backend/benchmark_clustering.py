@@ -0,0 +1,77 @@
+"""Benchmark the engagement clustering engine on synthetic students
+
+Generates feature rows for three engagement profiles (no database needed),
+times a full recompute (feature matrix, standardization, k-means, ranking)
+and prints how many students each cluster received.
+
+    python benchmark_clustering.py --students 1000 10000 100000 --runs 5
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from src.services.clustering_engine import cluster_students
+
+# (accuracy %, median response time s, answer rate, attendance minutes) and share of students
+PROFILES = [
+    ((85.0, 8.0, 0.95, 55.0), 0.5),
+    ((60.0, 15.0, 0.7, 40.0), 0.3),
+    ((30.0, 25.0, 0.3, 15.0), 0.2),
+]
+SPREAD = np.array([10.0, 4.0, 0.1, 8.0])
+
+
+def synthetic_rows(count: int, seed: int = 7) -> dict:
+    rng = np.random.default_rng(seed)
+    rows = {}
+    index = 0
+    for position, (centre, share) in enumerate(PROFILES):
+        size = count - index if position == len(PROFILES) - 1 else int(count * share)
+        values = rng.normal(centre, SPREAD, size=(size, len(centre)))
+        values[:, 0] = values[:, 0].clip(0, 100)
+        values[:, 1:] = values[:, 1:].clip(0, None)
+        values[:, 2] = values[:, 2].clip(0, 1)
+        for accuracy, median_time, answer_rate, minutes in values:
+            rows[f"student{index:06d}"] = {
+                "accuracy": accuracy,
+                "medianResponseTime": median_time,
+                "answerRate": answer_rate,
+                "attendanceMinutes": minutes,
+            }
+            index += 1
+    return rows
+
+
+def run_benchmark(sizes: list, runs: int):
+    for size in sizes:
+        rows = synthetic_rows(size)
+        timings = []
+        result = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = cluster_students(rows)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        ordered = sorted(timings)
+        counts = [len(members) for members in result.members_by_rank()]
+        print(
+            f"   {size:>7} students   median {statistics.median(ordered):8.2f} ms   "
+            f"max {ordered[-1]:8.2f} ms   clusters {counts}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"⏱️  {args.runs} runs per size:")
+    run_benchmark(args.students, args.runs)
@@ -0,0 +1,124 @@
+"""Benchmark participant join/leave writes: one write per event vs. ParticipantWriteBatcher
+
+Simulates the start and end of a lecture (every participant joins, then
+leaves) in throwaway meetings and writes it three ways: the previous
+per-event path one event at a time (as the webhook handled one meeting),
+the per-event path with all events in flight at once, and the batcher.
+The benchmark documents are removed again.
+
+    python benchmark_participant_writes.py --participants 200 1000 --runs 3
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+env_path = backend_dir / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from src.database.connection import connect_to_mongo, get_database_by_name, close_mongo_connection
+from src.database.indexes import ensure_indexes
+from src.models.zoom_attendance_model import ZOOM_DATABASE
+from src.services.participant_writer import ParticipantWriteBatcher
+
+
+def lecture_events(meeting_id: str, count: int) -> list:
+    """(kind, participant record) for every join, then every leave"""
+    now = datetime.now()
+    records = [
+        {
+            "zoom_meeting_id": meeting_id,
+            "meeting_topic": "Benchmark lecture",
+            "user_id": f"user{i:05d}",
+            "user_name": f"Student {i}",
+            "email": f"student{i}@example.com",
+            "participant_uuid": uuid.uuid4().hex,
+            "join_time": now,
+            "status": "joined",
+            "created_at": now,
+        }
+        for i in range(count)
+    ]
+    leaves = [dict(record, leave_time=now, leave_reason="left the meeting") for record in records]
+    return [("join", record) for record in records] + [("leave", record) for record in leaves]
+
+
+async def per_event_write(participants, kind: str, record: dict):
+    """The previous path: insert on join, update by (meeting, user_id) on leave"""
+    if kind == "join":
+        await participants.insert_one(dict(record))
+    else:
+        await participants.update_one(
+            {"zoom_meeting_id": record["zoom_meeting_id"], "user_id": record["user_id"]},
+            {"$set": {
+                "leave_time": record["leave_time"],
+                "leave_reason": record["leave_reason"],
+                "status": "left",
+                "updated_at": datetime.now(),
+            }}
+        )
+
+
+async def per_event_sequential(participants, events: list) -> int:
+    for kind, record in events:
+        await per_event_write(participants, kind, record)
+    return len(events)
+
+
+async def per_event_concurrent(participants, events: list) -> int:
+    await asyncio.gather(*[per_event_write(participants, kind, record) for kind, record in events])
+    return len(events)
+
+
+async def batched(participants, events: list) -> int:
+    batcher = ParticipantWriteBatcher()
+    before = batcher.stats["batches"]
+    await asyncio.gather(*[
+        batcher.join(record) if kind == "join" else batcher.leave(record)
+        for kind, record in events
+    ])
+    return batcher.stats["batches"] - before
+
+
+async def run_benchmark(sizes: list, runs: int):
+    await connect_to_mongo()
+    await ensure_indexes()
+    participants = get_database_by_name(ZOOM_DATABASE).participants
+    prefix = f"benchmark-{uuid.uuid4().hex[:8]}"
+    paths = [
+        ("per-event", per_event_sequential),
+        ("concurrent", per_event_concurrent),
+        ("batched", batched),
+    ]
+
+    try:
+        for count in sizes:
+            print(f"⏱️  {count} participants ({2 * count} events), {runs} runs each:")
+            for label, path in paths:
+                rates = []
+                for run in range(runs):
+                    events = lecture_events(f"{prefix}-{label}-{count}-{run}", count)
+                    start = time.perf_counter()
+                    round_trips = await path(participants, events)
+                    rates.append(len(events) / (time.perf_counter() - start))
+                print(f"   {label:<12} median {statistics.median(rates):9.0f} events/s   "
+                      f"{round_trips:5d} round-trips per run")
+    finally:
+        await participants.delete_many({"zoom_meeting_id": {"$regex": f"^{prefix}"}})
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, nargs="+", default=[200, 1000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.participants, args.runs))
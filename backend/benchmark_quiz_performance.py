@@ -0,0 +1,104 @@
+"""Benchmark QuizService.get_performance: Python-side scan vs. server-side aggregation
+
+Seeds N answers for one question in a throwaway session, times both code
+paths and removes the data again.
+
+    python benchmark_quiz_performance.py --answers 10000 --runs 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from dotenv import load_dotenv
+
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+env_path = backend_dir / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from src.database.connection import connect_to_mongo, get_database, close_mongo_connection
+from src.database.indexes import ensure_indexes
+from src.models.quiz_answer import QuizAnswer
+from src.models.quiz_answer_model import QuizAnswerModel
+
+CORRECT_ANSWER = 1
+
+
+async def legacy_performance(question_id: str, session_id: str) -> dict:
+    """The previous implementation: fetch every answer and summarise in Python"""
+    answer_docs = await QuizAnswerModel.find_by_question_and_session(question_id, session_id)
+    answers = [
+        QuizAnswer(**{k: v for k, v in doc.items() if k != "id" and k != "_id"})
+        for doc in answer_docs
+    ]
+    correct = sum(1 for a in answers if a.answerIndex == CORRECT_ANSWER)
+    average = sum(a.timeTaken for a in answers) / len(answers) if answers else 0
+    last = answers[-10:]
+    return {"answered": len(answers), "correct": correct, "averageTime": average, "last": len(last)}
+
+
+async def aggregated_performance(question_id: str, session_id: str) -> dict:
+    return await QuizAnswerModel.aggregate_performance(question_id, session_id, CORRECT_ANSWER)
+
+
+async def time_runs(fn, runs: int, *args) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    print(f"   {label:<12} median {statistics.median(ordered):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+async def run_benchmark(answer_count: int, runs: int):
+    await connect_to_mongo()
+    await ensure_indexes()
+    database = get_database()
+
+    question_id = f"benchmark-question-{uuid.uuid4().hex[:8]}"
+    session_id = f"benchmark-session-{uuid.uuid4().hex[:8]}"
+
+    print(f"🌱 Seeding {answer_count} answers...")
+    docs = [
+        {
+            "questionId": question_id,
+            "sessionId": session_id,
+            "studentId": f"student{i:06d}",
+            "answerIndex": random.randint(0, 3),
+            "timeTaken": round(random.uniform(1, 30), 2),
+        }
+        for i in range(answer_count)
+    ]
+    for start in range(0, len(docs), 5000):
+        await database.quiz_answers.insert_many(docs[start:start + 5000])
+
+    try:
+        # Warm up both paths once
+        await legacy_performance(question_id, session_id)
+        await aggregated_performance(question_id, session_id)
+
+        print(f"⏱️  {runs} runs each, {answer_count} answers per question:")
+        report("legacy", await time_runs(legacy_performance, runs, question_id, session_id))
+        report("aggregation", await time_runs(aggregated_performance, runs, question_id, session_id))
+    finally:
+        await database.quiz_answers.delete_many({"sessionId": session_id})
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.answers, args.runs))
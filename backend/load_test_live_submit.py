@@ -0,0 +1,142 @@
+"""Load test /api/live-questions/submit/{token} with a classroom answer spike
+
+Simulates N students answering one live question within a short window
+(uniformly spread arrivals, a share of them submitting twice) against a
+running backend and reports latency percentiles and status counts.
+
+Without --token a throwaway live session is created directly in MongoDB
+(using .env) and removed afterwards together with its responses.
+
+    python load_test_live_submit.py --students 500 --window 30
+    python load_test_live_submit.py --url http://localhost:8000 --token <sessionToken>
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+from bson import ObjectId
+from dotenv import load_dotenv
+
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+env_path = backend_dir / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from src.database.connection import connect_to_mongo, get_database, close_mongo_connection
+from src.models.live_question_session import LiveQuestionSessionModel
+
+
+async def create_session(window: int) -> dict:
+    await connect_to_mongo()
+    try:
+        now = datetime.now()
+        return await LiveQuestionSessionModel.create({
+            "questionId": "load-test",
+            "question": "Load test question",
+            "options": ["A", "B", "C", "D"],
+            "correctAnswer": 1,
+            "instructorId": "load-test",
+            "zoomMeetingId": None,
+            "timeLimit": window,
+            "triggeredAt": now,
+            "expiresAt": now + timedelta(seconds=window * 4),
+            "status": "active",
+        })
+    finally:
+        await close_mongo_connection()
+
+
+async def remove_session(session_id: str):
+    await connect_to_mongo()
+    try:
+        database = get_database()
+        await database.question_responses.delete_many({"sessionId": session_id})
+        await database.question_stats.delete_many({"sessionId": session_id})
+        await database.live_question_sessions.delete_one({"_id": ObjectId(session_id)})
+    finally:
+        await close_mongo_connection()
+
+
+def run_spike(url: str, token: str, students: int, window: float, duplicate_share: float) -> None:
+    submit_url = f"{url.rstrip('/')}/api/live-questions/submit/{token}"
+    plan = [(random.uniform(0, window), f"load-student-{i:05d}") for i in range(students)]
+    plan += [
+        (random.uniform(at, window), student)
+        for at, student in random.sample(plan, int(students * duplicate_share))
+    ]
+    plan.sort()
+
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=64, pool_maxsize=256)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    start = time.perf_counter()
+
+    def submit(at: float, student: str):
+        delay = at - (time.perf_counter() - start)
+        if delay > 0:
+            time.sleep(delay)
+        sent = time.perf_counter()
+        try:
+            response = session.post(submit_url, json={
+                "selectedAnswer": random.randint(0, 3),
+                "responseTime": round(random.uniform(2, window), 2),
+                "studentId": student,
+                "studentName": student,
+            }, timeout=30)
+            code = response.status_code
+        except requests.RequestException:
+            code = "error"
+        with lock:
+            latencies.append((time.perf_counter() - sent) * 1000)
+            statuses[code] += 1
+
+    print(f"🚀 {len(plan)} submissions ({students} students) over {window:.0f}s -> {submit_url}")
+    with ThreadPoolExecutor(max_workers=256) as pool:
+        for at, student in plan:
+            pool.submit(submit, at, student)
+
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    print(f"   statuses: {dict(statuses)}")
+    print(
+        f"   latency  p50 {statistics.median(ordered):8.2f} ms   p95 {percentile(0.95):8.2f} ms   "
+        f"p99 {percentile(0.99):8.2f} ms   max {ordered[-1]:8.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", help="existing live session token (default: create one)")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--window", type=float, default=30)
+    parser.add_argument("--duplicates", type=float, default=0.05, help="share of students who submit twice")
+    args = parser.parse_args()
+
+    created = None
+    token = args.token
+    if not token:
+        created = asyncio.run(create_session(int(args.window)))
+        token = created["sessionToken"]
+
+    try:
+        run_spike(args.url, token, args.students, args.window, args.duplicates)
+    finally:
+        if created:
+            asyncio.run(remove_session(created["id"]))
@@ -0,0 +1,96 @@
+"""Move raw Zoom payload copies out of zoom_attendance documents into the webhook archive
+
+Participants used to carry `raw_participant_data` and meetings
+`raw_meeting_data`, a second copy of every parsed field. This migration
+appends each copy to the on-disk webhook archive (as the event it came
+from), stores the archive pointer as `raw_ref` and removes the copy.
+Archived blocks are flushed before any document is changed.
+
+    python migrate_archive_raw_payloads.py            # show what would change
+    python migrate_archive_raw_payloads.py --apply
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+env_path = backend_dir / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from src.database.connection import connect_to_mongo, get_database_by_name, close_mongo_connection
+from src.models.zoom_attendance_model import ZOOM_DATABASE
+from src.services.event_archive import EventArchive
+
+BATCH_SIZE = 500
+
+# collection -> (raw field, event the copy came from, payload object of that event)
+SOURCES = {
+    "participants": (
+        "raw_participant_data",
+        "meeting.participant_joined",
+        lambda doc, raw: {"id": doc.get("zoom_meeting_id"), "participant": raw},
+    ),
+    "meetings": (
+        "raw_meeting_data",
+        "meeting.started",
+        lambda doc, raw: raw,
+    ),
+}
+
+
+async def migrate_batch(collection, field: str, event: str, payload_object, docs: list, apply: bool) -> int:
+    if not apply:
+        return len(docs)
+
+    archive = EventArchive()
+    operations = []
+    for doc in docs:
+        raw_ref = archive.append({
+            "event": event,
+            "payload": {"object": payload_object(doc, doc[field])},
+            "migrated_from": field,
+        })
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"raw_ref": raw_ref}, "$unset": {field: ""}}
+        ))
+    # Pointers must never outlive a crash that loses the archived copy
+    await archive.flush()
+    await collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def migrate(apply: bool):
+    await connect_to_mongo()
+    try:
+        zoom_db = get_database_by_name(ZOOM_DATABASE)
+        for name, (field, event, payload_object) in SOURCES.items():
+            collection = zoom_db[name]
+            migrated = 0
+            batch = []
+            async for doc in collection.find({field: {"$exists": True}}, {field: 1, "zoom_meeting_id": 1}):
+                batch.append(doc)
+                if len(batch) >= BATCH_SIZE:
+                    migrated += await migrate_batch(collection, field, event, payload_object, batch, apply)
+                    batch = []
+            if batch:
+                migrated += await migrate_batch(collection, field, event, payload_object, batch, apply)
+
+            if apply:
+                print(f"✅ {name}: archived {field} of {migrated} documents")
+            else:
+                print(f"ℹ️  {name}: {migrated} documents still carry {field} (run with --apply to migrate)")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apply", action="store_true", help="write the changes")
+    args = parser.parse_args()
+
+    asyncio.run(migrate(args.apply))
@@ -0,0 +1,104 @@
+"""Drop the legacy `responses` id array from live_question_sessions
+
+Sessions used to $push every response id into their own document. The
+counters (totalResponses / correctResponses / incorrectResponses) and the
+question_responses.sessionId index replace it. This migration recomputes
+the counters of every session that still carries the array from
+question_responses and removes the array.
+
+    python migrate_drop_session_responses.py            # show what would change
+    python migrate_drop_session_responses.py --apply
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+env_path = backend_dir / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from src.database.connection import connect_to_mongo, get_database, close_mongo_connection
+
+BATCH_SIZE = 500
+
+
+async def response_counts(database, session_ids: list) -> dict:
+    """(total, correct) per session from question_responses"""
+    counts = {}
+    async for row in database.question_responses.aggregate([
+        {"$match": {"sessionId": {"$in": session_ids}}},
+        {"$group": {
+            "_id": "$sessionId",
+            "total": {"$sum": 1},
+            "correct": {"$sum": {"$cond": ["$isCorrect", 1, 0]}},
+        }},
+    ]):
+        counts[row["_id"]] = (row["total"], row["correct"])
+    return counts
+
+
+async def migrate_batch(database, sessions: list, apply: bool) -> int:
+    counts = await response_counts(database, [str(s["_id"]) for s in sessions])
+    operations = []
+    for session in sessions:
+        total, correct = counts.get(str(session["_id"]), (0, 0))
+        if session.get("totalResponses") != total:
+            print(
+                f"   {session['_id']}: totalResponses {session.get('totalResponses')} -> {total}, "
+                f"array had {session.get('arraySize')} ids"
+            )
+        operations.append(UpdateOne(
+            {"_id": session["_id"]},
+            {
+                "$set": {
+                    "totalResponses": total,
+                    "correctResponses": correct,
+                    "incorrectResponses": total - correct,
+                },
+                "$unset": {"responses": ""},
+            }
+        ))
+
+    if apply and operations:
+        await database.live_question_sessions.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def migrate(apply: bool):
+    await connect_to_mongo()
+    try:
+        database = get_database()
+        # Only the counters and the array size are read, never the array itself
+        cursor = database.live_question_sessions.aggregate([
+            {"$match": {"responses": {"$exists": True}}},
+            {"$project": {"totalResponses": 1, "arraySize": {"$size": {"$ifNull": ["$responses", []]}}}},
+        ])
+
+        migrated = 0
+        batch = []
+        async for session in cursor:
+            batch.append(session)
+            if len(batch) >= BATCH_SIZE:
+                migrated += await migrate_batch(database, batch, apply)
+                batch = []
+        if batch:
+            migrated += await migrate_batch(database, batch, apply)
+
+        if apply:
+            print(f"✅ Migrated {migrated} sessions")
+        else:
+            print(f"ℹ️  {migrated} sessions still carry a responses array (run with --apply to migrate)")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apply", action="store_true", help="write the changes")
+    args = parser.parse_args()
+
+    asyncio.run(migrate(args.apply))
@@ -0,0 +1,37 @@
+"""Recompute the materialized question_stats documents from raw answers
+
+    python rebuild_question_stats.py                 # every session
+    python rebuild_question_stats.py --session <id>  # one session
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+env_path = backend_dir / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from src.database.connection import connect_to_mongo, close_mongo_connection
+from src.models.question_stats_model import QuestionStatsModel
+
+
+async def rebuild(session_id: str = None):
+    await connect_to_mongo()
+    try:
+        scope = f"session {session_id}" if session_id else "all sessions"
+        print(f"🔄 Rebuilding question stats for {scope}...")
+        written = await QuestionStatsModel.rebuild(session_id)
+        print(f"✅ Wrote {written} question_stats documents")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--session", help="only rebuild this sessionId")
+    args = parser.parse_args()
+
+    asyncio.run(rebuild(args.session))
@@ -0,0 +1,351 @@
+"""Replay or synthesise Zoom webhook traffic against a webhook receiver and measure it
+
+Builds an event stream, either synthetic lectures (meeting.started, a join
+spike, leaves and rejoins, participants whose leave never arrives,
+meeting.ended) or events recorded in the webhook archive, signs every
+delivery like Zoom does and sends it to one of the receivers:
+
+    fastapi  POST {url}/api/zoom/events      (this backend)
+    flask    POST {url}/api/zoom/webhook     (backend_flask)
+    lambda   aws/lambda/zoom_webhook_handler.py, invoked in-process; it
+             forwards to {url}/api/zoom/webhook
+
+at a fixed rate (or as fast as --concurrency allows). Reports achieved
+events/s, status codes and latency percentiles. With --mongo it also
+reads the server's write counters before and after the run and reports
+write amplification (write operations and documents written per event;
+the counters are server-wide, so run it against a quiet database). With
+--wait-queue and the fastapi target it waits for the ingest queue to
+drain and reports the queue lag.
+
+    python replay_webhooks.py --target fastapi --meetings 4 --participants 200 --rate 500
+    python replay_webhooks.py --target flask --url http://localhost:5000 --concurrency 32
+    python replay_webhooks.py --target lambda --url http://localhost:5000 --rate 50
+    python replay_webhooks.py --archive 2024-05-06T08:00 2024-05-06T10:00 --new-timestamps
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import hashlib
+import hmac
+import importlib.util
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import requests
+from dotenv import load_dotenv
+
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+env_path = backend_dir / '.env'
+load_dotenv(dotenv_path=env_path)
+
+LAMBDA_HANDLER = backend_dir.parent / "aws" / "lambda" / "zoom_webhook_handler.py"
+TARGET_PATHS = {"fastapi": "/api/zoom/events", "flask": "/api/zoom/webhook"}
+
+
+# --------------------------------------------------------
+# EVENT STREAMS
+# --------------------------------------------------------
+def _iso(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _zoom_uuid() -> str:
+    return base64.b64encode(uuid.uuid4().bytes).decode()
+
+
+def synthesize(meetings: int, participants: int, rejoin_share: float, no_leave_share: float,
+               minutes: int, seed: int) -> list:
+    """Zoom events of ``meetings`` concurrent lectures, ordered by event_ts"""
+    rng = random.Random(seed)
+    start = int(time.time() * 1000)
+    end = start + minutes * 60_000
+    events = []
+
+    def event(name: str, ts: int, obj: dict) -> dict:
+        return {
+            "event": name,
+            "event_ts": ts,
+            "payload": {"account_id": "replay-account", "object": obj},
+        }
+
+    for m in range(meetings):
+        meeting = {
+            "id": rng.randint(10**10, 10**11 - 1),
+            "uuid": _zoom_uuid(),
+            "host_id": f"host-{m}",
+            "topic": f"Replay lecture {m + 1}",
+            "type": 2,
+            "start_time": _iso(start),
+            "timezone": "Europe/Berlin",
+            "duration": minutes,
+        }
+        events.append(event("meeting.started", start, dict(meeting)))
+
+        for p in range(participants):
+            person = {
+                "participant_uuid": str(uuid.UUID(int=rng.getrandbits(128))).upper(),
+                "participant_user_id": f"student-{m}-{p}",
+                "user_name": f"Student {p + 1}",
+                "email": f"student{p + 1}.m{m}@example.edu",
+            }
+            # Most of the class arrives in the first two minutes
+            joined = start + int(rng.expovariate(1 / 40_000))
+            stints = [joined]
+            if rng.random() < rejoin_share:
+                dropped = rng.randint(joined + 60_000, max(joined + 60_001, end - 120_000))
+                stints += [dropped, dropped + rng.randint(5_000, 90_000)]
+            leaves = rng.random() >= no_leave_share
+            left = max(end - rng.randint(0, 300_000), stints[-1] + 60_000)
+            stints.append(left if leaves else None)
+
+            for number, (at, until) in enumerate(zip(stints[::2], stints[1::2])):
+                # Zoom hands out a new per-meeting user id on every join
+                user_id = str(16778240 + p * 16 + number)
+                events.append(event("meeting.participant_joined", at, dict(
+                    meeting, participant=dict(person, user_id=user_id, id=user_id, join_time=_iso(at))
+                )))
+                if until is not None:
+                    events.append(event("meeting.participant_left", until, dict(
+                        meeting, participant=dict(
+                            person, user_id=user_id, id=user_id,
+                            leave_time=_iso(until), leave_reason="left the meeting"
+                        )
+                    )))
+
+        events.append(event("meeting.ended", end, dict(meeting, end_time=_iso(end))))
+
+    events.sort(key=lambda e: e["event_ts"])
+    return events
+
+
+async def load_archive(start: datetime, end: datetime) -> list:
+    from src.services.event_archive import EventArchive
+    return [record["body"] async for record in EventArchive().replay(start, end)]
+
+
+# --------------------------------------------------------
+# RECEIVERS
+# --------------------------------------------------------
+def signed_headers(body: bytes, secret: str) -> dict:
+    timestamp = str(int(time.time()))
+    digest = hmac.new(secret.encode(), f"v0:{timestamp}:{body.decode()}".encode(), hashlib.sha256).hexdigest()
+    return {
+        "Content-Type": "application/json",
+        "x-zoom-request-timestamp": timestamp,
+        "x-zoom-signature": f"v0={digest}",
+    }
+
+
+def http_sender(url: str, path: str, secret: str, concurrency: int):
+    endpoint = f"{url.rstrip('/')}{path}"
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    def send(body: bytes):
+        return session.post(endpoint, data=body, headers=signed_headers(body, secret), timeout=30).status_code
+
+    return endpoint, send
+
+
+def lambda_sender(url: str, secret: str):
+    # The handler reads its backend URL when imported
+    os.environ["BACKEND_API_URL"] = url
+    spec = importlib.util.spec_from_file_location("zoom_webhook_handler", LAMBDA_HANDLER)
+    handler = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(handler)
+
+    def send(body: bytes):
+        # API Gateway proxy event, as Zoom's delivery reaches the function
+        result = handler.lambda_handler({"headers": signed_headers(body, secret), "body": body.decode()}, None)
+        return result.get("statusCode")
+
+    return f"{LAMBDA_HANDLER.name} -> {handler.WEBHOOK_ENDPOINT}", send
+
+
+# --------------------------------------------------------
+# DATABASE COUNTERS
+# --------------------------------------------------------
+async def write_counters() -> dict:
+    from src.database.connection import connect_to_mongo, close_mongo_connection
+    from src.database import connection
+
+    await connect_to_mongo()
+    try:
+        status = await connection.db.client.admin.command("serverStatus")
+    finally:
+        await close_mongo_connection()
+    ops = status.get("opcounters", {})
+    documents = status.get("metrics", {}).get("document", {})
+    return {
+        "writeOps": ops.get("insert", 0) + ops.get("update", 0) + ops.get("delete", 0),
+        "documents": documents.get("inserted", 0) + documents.get("updated", 0) + documents.get("deleted", 0),
+    }
+
+
+def queue_metrics(url: str, bearer: str = None) -> dict:
+    headers = {"x-user-role": "instructor"}
+    if bearer:
+        headers["Authorization"] = f"Bearer {bearer}"
+    response = requests.get(f"{url.rstrip('/')}/api/zoom/webhook-queue", headers=headers, timeout=10)
+    response.raise_for_status()
+    return response.json()["metrics"]
+
+
+# --------------------------------------------------------
+# RUN
+# --------------------------------------------------------
+def run(events: list, send, rate: float, concurrency: int, quiet: bool) -> dict:
+    bodies = [json.dumps(event).encode() for event in events]
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def deliver(number: int, body: bytes):
+        if rate:
+            delay = number / rate - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        sent = time.perf_counter()
+        try:
+            code = send(body)
+        except Exception:
+            code = "error"
+        with lock:
+            latencies.append((time.perf_counter() - sent) * 1000)
+            statuses[code] += 1
+
+    # The Lambda handler prints every step; keep the report readable
+    output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    with output, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for number, body in enumerate(bodies):
+            pool.submit(deliver, number, body)
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    return {
+        "events": len(bodies),
+        "elapsed": elapsed,
+        "statuses": dict(statuses),
+        "p50": statistics.median(ordered),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": ordered[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=["fastapi", "flask", "lambda"], default="fastapi")
+    parser.add_argument("--url", default="http://localhost:8000", help="receiver base URL (lambda: where it forwards to)")
+    parser.add_argument("--secret", default=os.getenv("ZOOM_WEBHOOK_SECRET", ""), help="webhook secret used to sign deliveries")
+    parser.add_argument("--rate", type=float, default=0, help="events per second (0 = as fast as possible)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--meetings", type=int, default=2)
+    parser.add_argument("--participants", type=int, default=100, help="per meeting")
+    parser.add_argument("--minutes", type=int, default=90, help="simulated lecture length")
+    parser.add_argument("--rejoins", type=float, default=0.15, help="share of participants who drop and rejoin")
+    parser.add_argument("--missing-leaves", type=float, default=0.05, help="share whose leave is never sent")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--archive", nargs=2, metavar=("START", "END"), help="replay archived events received in this UTC window")
+    parser.add_argument("--new-timestamps", action="store_true", help="give replayed events a fresh event_ts so they are not dropped as duplicates")
+    parser.add_argument("--mongo", action="store_true", help="report write amplification from serverStatus (uses .env)")
+    parser.add_argument("--wait-queue", action="store_true", help="fastapi target: wait for the ingest queue to drain")
+    parser.add_argument("--bearer", help="instructor token for the queue metrics endpoint")
+    args = parser.parse_args()
+
+    if args.archive:
+        start, end = (datetime.fromisoformat(value) for value in args.archive)
+        start, end = (value if value.tzinfo else value.replace(tzinfo=timezone.utc) for value in (start, end))
+        events = asyncio.run(load_archive(start, end))
+        if args.new_timestamps:
+            offset = int(time.time() * 1000) - min((e.get("event_ts", 0) for e in events), default=0)
+            for event in events:
+                event["event_ts"] = event.get("event_ts", 0) + offset
+        source = f"archive {start.isoformat()} .. {end.isoformat()}"
+    else:
+        events = synthesize(args.meetings, args.participants, args.rejoins, args.missing_leaves, args.minutes, args.seed)
+        source = f"{args.meetings} synthetic lecture(s) x {args.participants} participants"
+    if not events:
+        print("⚠️  No events to send")
+        return
+
+    if args.target == "lambda":
+        endpoint, send = lambda_sender(args.url, args.secret)
+    else:
+        endpoint, send = http_sender(args.url, TARGET_PATHS[args.target], args.secret, args.concurrency)
+
+    kinds = Counter(event.get("event") for event in events)
+    print(f"🚀 {len(events)} events from {source} -> {endpoint}")
+    print(f"   {dict(kinds)}")
+    print(f"   rate {args.rate or 'unlimited'} ev/s, concurrency {args.concurrency}")
+
+    waiting = args.wait_queue and args.target == "fastapi"
+    queue_before = queue_metrics(args.url, args.bearer) if waiting else None
+    before = asyncio.run(write_counters()) if args.mongo else None
+    report = run(events, send, args.rate, args.concurrency, quiet=args.target == "lambda")
+
+    drain = None
+    if waiting:
+        def settled(metrics: dict) -> int:
+            return sum(metrics[key] for key in ("processed", "failed", "duplicates"))
+
+        waited = time.perf_counter()
+        while True:
+            metrics = queue_metrics(args.url, args.bearer)
+            # Counters are cumulative since the server started
+            if settled(metrics) - settled(queue_before) >= metrics["received"] - queue_before["received"]:
+                break
+            time.sleep(0.2)
+        drain = (time.perf_counter() - waited, {
+            key: (metrics[key] - queue_before[key]) if key in ("processed", "failed", "duplicates") else metrics[key]
+            for key in ("processed", "failed", "duplicates", "lagAvgMs", "lagMaxMs")
+        })
+    after = asyncio.run(write_counters()) if args.mongo else None
+
+    print(f"   statuses: {report['statuses']}")
+    print(f"   achieved {report['events'] / report['elapsed']:8.1f} events/s ({report['elapsed']:.2f}s)")
+    print(
+        f"   latency  p50 {report['p50']:8.2f} ms   p95 {report['p95']:8.2f} ms   "
+        f"p99 {report['p99']:8.2f} ms   max {report['max']:8.2f} ms"
+    )
+    if drain:
+        seconds, metrics = drain
+        print(
+            f"   queue drained {seconds:.2f}s after the last ack: processed {metrics['processed']}, "
+            f"failed {metrics['failed']}, duplicates {metrics['duplicates']}, "
+            f"lag avg {metrics['lagAvgMs']} ms / max {metrics['lagMaxMs']} ms"
+        )
+    if before and after:
+        write_ops = after["writeOps"] - before["writeOps"]
+        documents = after["documents"] - before["documents"]
+        print(
+            f"   writes   {write_ops} ops ({write_ops / len(events):.2f} per event), "
+            f"{documents} documents ({documents / len(events):.2f} per event)"
+        )
+        if args.target == "fastapi" and not drain:
+            print("   ⚠️  events still queued after their ack are not counted; pass --wait-queue")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Declarative MongoDB index registry.
+
+Every model module declares the indexes its queries rely on in a module-level
+``INDEXES`` list. At startup ``ensure_indexes`` reconciles that registry with
+the live database: missing indexes are created, indexes whose options differ
+from the declaration are reported as drift, and in strict mode drift (or a
+failed build) refuses to boot.
+
+Print the plan without touching the database:
+    python -m src.database.indexes
+
+Create missing indexes (and optionally rebuild drifted ones):
+    python -m src.database.indexes --apply [--drop-drift]
+"""
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+
+ASCENDING = 1
+DESCENDING = -1
+
+# Options compared when deciding whether an existing index has drifted
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+class IndexSpec(BaseModel):
+    """A single index declared by a model module"""
+    collection: str
+    keys: List[Tuple[str, int]]
+    name: Optional[str] = None
+    unique: bool = False
+    sparse: bool = False
+    expireAfterSeconds: Optional[int] = None
+    partialFilterExpression: Optional[Dict[str, Any]] = None
+    database: Optional[str] = None  # None = default application database
+
+    def index_name(self) -> str:
+        """Explicit name, or the name MongoDB would generate for these keys"""
+        if self.name:
+            return self.name
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+    def options(self) -> Dict[str, Any]:
+        """Options in the shape returned by ``index_information()``"""
+        options: Dict[str, Any] = {}
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.expireAfterSeconds is not None:
+            options["expireAfterSeconds"] = self.expireAfterSeconds
+        if self.partialFilterExpression is not None:
+            options["partialFilterExpression"] = self.partialFilterExpression
+        return options
+
+
+class IndexDriftError(RuntimeError):
+    """Raised in strict mode when the database does not match the registry"""
+
+
+def collect_index_specs() -> List[IndexSpec]:
+    """Gather the ``INDEXES`` declared by every model module"""
+    # Imported here because the model modules import the database package
+    from ..models import (
+        attendance_summary,
+        cluster_model,
+        course,
+        live_question_session,
+        question,
+        question_assignment_model,
+        question_response,
+        question_session_model,
+        question_stats_model,
+        quiz_answer_model,
+        user,
+        webhook_receipt,
+        zoom_attendance_model,
+        zoom_outbox,
+    )
+
+    modules = [
+        user,
+        course,
+        question,
+        question_session_model,
+        question_assignment_model,
+        quiz_answer_model,
+        cluster_model,
+        live_question_session,
+        question_response,
+        question_stats_model,
+        zoom_attendance_model,
+        zoom_outbox,
+        webhook_receipt,
+        attendance_summary,
+    ]
+
+    specs: List[IndexSpec] = []
+    for module in modules:
+        specs.extend(getattr(module, "INDEXES", []))
+    return specs
+
+
+def _normalise_keys(keys) -> List[Tuple[str, Any]]:
+    return [(field, int(direction) if isinstance(direction, (int, float)) else direction)
+            for field, direction in keys]
+
+
+def _existing_options(info: Dict[str, Any]) -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    for option in _COMPARED_OPTIONS:
+        if option in info and info[option] not in (False, None):
+            value = info[option]
+            options[option] = int(value) if option == "expireAfterSeconds" else value
+    return options
+
+
+def _get_target_database(spec: IndexSpec):
+    from .connection import get_database, get_database_by_name
+
+    if spec.database:
+        return get_database_by_name(spec.database)
+    return get_database()
+
+
+async def plan_indexes(specs: Optional[List[IndexSpec]] = None) -> List[Dict[str, Any]]:
+    """
+    Compare the registry with the database without changing anything.
+
+    Each plan entry has an ``action`` of:
+      - ``ok``: an identical index exists
+      - ``create``: no index on these keys exists yet
+      - ``drift``: an index on these keys (or with this name) exists with different options
+    """
+    specs = specs if specs is not None else collect_index_specs()
+    index_info_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    plan: List[Dict[str, Any]] = []
+
+    for spec in specs:
+        database = _get_target_database(spec)
+        if database is None:
+            raise RuntimeError("Database not connected")
+
+        cache_key = (database.name, spec.collection)
+        if cache_key not in index_info_cache:
+            index_info_cache[cache_key] = await database[spec.collection].index_information()
+        existing = index_info_cache[cache_key]
+
+        wanted_keys = _normalise_keys(spec.keys)
+        wanted_options = spec.options()
+        entry = {
+            "database": database.name,
+            "collection": spec.collection,
+            "name": spec.index_name(),
+            "keys": wanted_keys,
+            "options": wanted_options,
+            "action": "create",
+            "detail": "",
+            "spec": spec,
+        }
+
+        same_keys = [
+            (name, info) for name, info in existing.items()
+            if _normalise_keys(info.get("key", [])) == wanted_keys
+        ]
+        same_name = existing.get(spec.index_name())
+
+        if same_keys:
+            name, info = same_keys[0]
+            current_options = _existing_options(info)
+            if current_options == wanted_options:
+                entry["action"] = "ok"
+                entry["name"] = name
+            else:
+                entry["action"] = "drift"
+                entry["existing_name"] = name
+                entry["detail"] = f"options {current_options} != declared {wanted_options}"
+        elif same_name is not None:
+            entry["action"] = "drift"
+            entry["existing_name"] = spec.index_name()
+            entry["detail"] = (
+                f"keys {_normalise_keys(same_name.get('key', []))} != declared {wanted_keys}"
+            )
+
+        plan.append(entry)
+
+    return plan
+
+
+async def ensure_indexes(
+    strict: Optional[bool] = None,
+    drop_drift: bool = False,
+    specs: Optional[List[IndexSpec]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Reconcile the index registry with the database (called from the app lifespan).
+
+    Missing indexes are created. Drifted indexes are reported and left alone
+    unless ``drop_drift`` is set. In strict mode (``MONGODB_STRICT_INDEXES=true``)
+    any remaining drift or failed build raises ``IndexDriftError``.
+    """
+    if strict is None:
+        strict = os.getenv("MONGODB_STRICT_INDEXES", "false").lower() == "true"
+
+    plan = await plan_indexes(specs)
+    problems: List[str] = []
+
+    for entry in plan:
+        spec: IndexSpec = entry["spec"]
+        label = f"{entry['database']}.{entry['collection']}.{entry['name']}"
+
+        if entry["action"] == "drift":
+            if not drop_drift:
+                print(f"⚠️  Index drift on {label}: {entry['detail']}")
+                problems.append(f"{label}: {entry['detail']}")
+                continue
+            print(f"🔁 Rebuilding drifted index {label}")
+            database = _get_target_database(spec)
+            await database[spec.collection].drop_index(entry["existing_name"])
+
+        if entry["action"] in ("create", "drift"):
+            database = _get_target_database(spec)
+            try:
+                await database[spec.collection].create_index(
+                    spec.keys, name=spec.index_name(), **spec.options()
+                )
+                entry["action"] = "created"
+                print(f"✅ Created index {label}")
+            except Exception as e:
+                entry["action"] = "failed"
+                entry["detail"] = str(e)
+                print(f"❌ Failed to create index {label}: {e}")
+                problems.append(f"{label}: {e}")
+
+    if problems and strict:
+        raise IndexDriftError(
+            "Indexes do not match the registry (strict mode):\n  " + "\n  ".join(problems)
+        )
+
+    return plan
+
+
+def format_plan(plan: List[Dict[str, Any]]) -> str:
+    """Render a plan as one line per declared index"""
+    symbols = {"ok": "✓", "create": "+", "drift": "!", "created": "+", "failed": "✗"}
+    lines = []
+    for entry in plan:
+        keys = ", ".join(f"{field}:{direction}" for field, direction in entry["keys"])
+        line = (
+            f"{symbols.get(entry['action'], '?')} {entry['action']:<7} "
+            f"{entry['database']}.{entry['collection']} {entry['name']} ({keys})"
+        )
+        if entry["options"]:
+            line += f" {entry['options']}"
+        if entry.get("detail"):
+            line += f"\n      {entry['detail']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+async def _main(apply: bool, drop_drift: bool):
+    from .connection import connect_to_mongo, close_mongo_connection
+
+    await connect_to_mongo()
+    try:
+        if apply:
+            plan = await ensure_indexes(strict=False, drop_drift=drop_drift)
+        else:
+            plan = await plan_indexes()
+        print(format_plan(plan))
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show or apply the MongoDB index plan")
+    parser.add_argument("--apply", action="store_true", help="create missing indexes")
+    parser.add_argument("--drop-drift", action="store_true", help="drop and rebuild drifted indexes (with --apply)")
+    args = parser.parse_args()
+
+    asyncio.run(_main(args.apply, args.drop_drift))
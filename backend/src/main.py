@@ -7,6 +7,13 @@ from contextlib import asynccontextmanager
 
 from src.middleware.auth import AuthMiddleware
 from src.database.connection import connect_to_mongo, close_mongo_connection
+from src.database.indexes import ensure_indexes
+from src.services.session_expiry import SessionExpiryScheduler
+from src.services.zoom_chat_service import ZoomChatService
+from src.services.zoom_outbox_worker import ZoomOutboxWorker
+from src.services.webhook_queue import WebhookIngestQueue
+from src.services.event_archive import EventArchive
+from src.services.clustering_service import ClusteringService
 
 
 # --------------------------------------------------------
@@ -15,7 +22,23 @@ from src.database.connection import connect_to_mongo, close_mongo_connection
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await connect_to_mongo()
+    await ensure_indexes()
+    session_expiry = SessionExpiryScheduler()
+    session_expiry.start()
+    zoom_outbox = ZoomOutboxWorker()
+    zoom_outbox.start()
+    webhook_queue = WebhookIngestQueue()
+    webhook_queue.start()
+    clustering = ClusteringService()
+    clustering.start()
     yield
+    await clustering.stop()
+    # Drain queued webhooks while the database is still connected
+    await webhook_queue.stop()
+    await EventArchive().flush()
+    await zoom_outbox.stop()
+    await session_expiry.stop()
+    await ZoomChatService().aclose()
     await close_mongo_connection()
 
 
@@ -0,0 +1,177 @@
+from typing import Any, Dict, List, Optional, Union
+from datetime import datetime
+from pymongo import ReturnDocument, UpdateOne
+from ..database.connection import get_database_by_name
+from ..database.indexes import IndexSpec, ASCENDING
+from .zoom_attendance_model import ZOOM_DATABASE, meeting_id_candidates
+
+
+INDEXES = [
+    IndexSpec(
+        collection="attendance_summary",
+        keys=[("zoom_meeting_id", ASCENDING), ("participant_key", ASCENDING)],
+        unique=True,
+        database=ZOOM_DATABASE,
+    ),
+]
+
+
+def _identity(identity: Dict[str, Any]) -> Dict[str, Any]:
+    """Identity fields worth storing (a leave often carries fewer than its join)"""
+    return {
+        k: v for k, v in identity.items()
+        if v is not None and str(v).strip().lower() not in ("", "unknown", "unknown user")
+    }
+
+
+class AttendanceSummaryModel:
+    """
+    One document per (meeting, participant) in ``zoom_attendance.attendance_summary``.
+
+    ``total_seconds`` and ``intervals`` cover closed stints; ``open_since``
+    is set while the participant is in the meeting.
+    """
+
+    @staticmethod
+    async def open_interval(
+        meeting_id: Union[str, int],
+        participant_key: str,
+        identity: Dict[str, Any],
+        at: datetime
+    ) -> Optional[datetime]:
+        """
+        Mark the participant as present since ``at``.
+
+        Returns when the interval that was still open started (a rejoin
+        without a leave), or None.
+        """
+        zoom_db = get_database_by_name(ZOOM_DATABASE)
+        if zoom_db is None:
+            return None
+
+        before = await zoom_db.attendance_summary.find_one_and_update(
+            {"zoom_meeting_id": meeting_id, "participant_key": participant_key},
+            {
+                "$set": {**_identity(identity), "open_since": at, "updated_at": datetime.now()},
+                "$min": {"first_seen": at},
+                "$max": {"last_seen": at},
+                "$setOnInsert": {"total_seconds": 0, "intervals": 0},
+            },
+            projection={"open_since": 1},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
+        )
+        return before.get("open_since") if before else None
+
+    @staticmethod
+    async def close_interval(
+        meeting_id: Union[str, int],
+        participant_key: str,
+        at: datetime
+    ) -> Optional[datetime]:
+        """
+        Mark the participant as gone; returns when the closed interval
+        started, or None if the participant had no open interval.
+        """
+        zoom_db = get_database_by_name(ZOOM_DATABASE)
+        if zoom_db is None:
+            return None
+
+        before = await zoom_db.attendance_summary.find_one_and_update(
+            {
+                "zoom_meeting_id": meeting_id,
+                "participant_key": participant_key,
+                "open_since": {"$ne": None},
+            },
+            {"$set": {"open_since": None, "updated_at": datetime.now()}, "$max": {"last_seen": at}},
+            projection={"open_since": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        return before.get("open_since") if before else None
+
+    @staticmethod
+    async def add_interval(
+        meeting_id: Union[str, int],
+        participant_key: str,
+        seconds: float,
+        at: datetime
+    ) -> None:
+        """Count one closed interval of ``seconds`` ending at ``at``"""
+        zoom_db = get_database_by_name(ZOOM_DATABASE)
+        if zoom_db is None:
+            return
+
+        await zoom_db.attendance_summary.update_one(
+            {"zoom_meeting_id": meeting_id, "participant_key": participant_key},
+            {"$inc": {"total_seconds": seconds, "intervals": 1}, "$max": {"last_seen": at}}
+        )
+
+    @staticmethod
+    async def record_presence(
+        meeting_id: Union[str, int],
+        participant_key: str,
+        identity: Dict[str, Any],
+        at: datetime
+    ) -> None:
+        """Note that the participant was seen at ``at`` without opening an interval"""
+        zoom_db = get_database_by_name(ZOOM_DATABASE)
+        if zoom_db is None:
+            return
+
+        await zoom_db.attendance_summary.update_one(
+            {"zoom_meeting_id": meeting_id, "participant_key": participant_key},
+            {
+                "$set": {**_identity(identity), "updated_at": datetime.now()},
+                "$min": {"first_seen": at},
+                "$max": {"last_seen": at},
+                "$setOnInsert": {"total_seconds": 0, "intervals": 0, "open_since": None},
+            },
+            upsert=True
+        )
+
+    @staticmethod
+    async def close_meeting(meeting_id: Union[str, int], at: datetime) -> int:
+        """
+        Close every interval still open in a meeting at ``at``.
+
+        Each close is conditional on ``open_since`` being unchanged, so a
+        leave processed at the same time is not counted twice. Returns the
+        number of intervals closed.
+        """
+        zoom_db = get_database_by_name(ZOOM_DATABASE)
+        if zoom_db is None:
+            return 0
+
+        operations = []
+        async for summary in zoom_db.attendance_summary.find(
+            {"zoom_meeting_id": {"$in": meeting_id_candidates(meeting_id)}, "open_since": {"$ne": None}},
+            {"open_since": 1}
+        ):
+            seconds = max(0.0, (at - summary["open_since"]).total_seconds())
+            operations.append(UpdateOne(
+                {"_id": summary["_id"], "open_since": summary["open_since"]},
+                {
+                    "$set": {"open_since": None, "updated_at": datetime.now()},
+                    "$inc": {"total_seconds": seconds, "intervals": 1},
+                    "$max": {"last_seen": at},
+                }
+            ))
+        if not operations:
+            return 0
+        result = await zoom_db.attendance_summary.bulk_write(operations, ordered=False)
+        return result.modified_count
+
+    @staticmethod
+    async def find_by_meeting(meeting_id: Union[str, int]) -> List[Dict[str, Any]]:
+        zoom_db = get_database_by_name(ZOOM_DATABASE)
+        if zoom_db is None:
+            return []
+
+        summaries = []
+        async for summary in zoom_db.attendance_summary.find(
+            {"zoom_meeting_id": {"$in": meeting_id_candidates(meeting_id)}}
+        ).sort("first_seen", 1):
+            summary["id"] = str(summary["_id"])
+            del summary["_id"]
+            summaries.append(summary)
+        return summaries
@@ -1,4 +1,4 @@
-from typing import List, Literal
+from typing import Dict, List, Literal, Optional
 from pydantic import BaseModel
 
 
@@ -11,4 +11,5 @@ class StudentCluster(BaseModel):
     color: str
     prediction: Literal["stable", "improving", "declining"]
     students: List[str]  # Student IDs
+    centroid: Optional[Dict[str, float]] = None  # Mean engagement features of the members
 
@@ -1,19 +1,69 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import asyncio
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
 from ..database.connection import get_database
+from ..database.indexes import IndexSpec, ASCENDING
 from .cluster import StudentCluster
 
 
+INDEXES = [
+    IndexSpec(collection="clusters", keys=[("sessionId", ASCENDING), ("version", ASCENDING)]),
+    IndexSpec(
+        collection="cluster_memberships",
+        keys=[("sessionId", ASCENDING), ("studentId", ASCENDING)],
+        unique=True,
+    ),
+]
+
+MEMBERSHIP_BATCH_SIZE = 5000
+
+# Old snapshot garbage collection runs in the background; keep the tasks
+# referenced until they finish
+_gc_tasks = set()
+
+
 class ClusterModel:
+    """
+    Per-session cluster snapshots.
+
+    Every save inserts a complete new version of the session's cluster
+    documents and then flips ``cluster_versions.activeVersion`` to it in one
+    atomic update; readers always resolve the active version first, so they
+    see either the old or the new set, never a partial one. Superseded
+    versions are deleted in the background. Snapshots are never edited in
+    place: students moved between full passes only update
+    ``cluster_memberships`` (see ``move_students``).
+    """
+
+    @staticmethod
+    async def get_active_version(session_id: str) -> Optional[int]:
+        """Active snapshot version, or None for sessions saved before versioning"""
+        database = get_database()
+        if database is None:
+            return None
+
+        pointer = await database.cluster_versions.find_one({"_id": session_id}, {"activeVersion": 1})
+        return pointer.get("activeVersion") if pointer else None
+
+    @staticmethod
+    async def _active_filter(session_id: str) -> dict:
+        version = await ClusterModel.get_active_version(session_id)
+        query = {"sessionId": session_id}
+        if version is not None:
+            query["version"] = version
+        return query
+
     @staticmethod
     async def find_by_session(session_id: str) -> List[dict]:
-        """Find clusters for a session"""
+        """Find the active clusters for a session"""
         database = get_database()
         if database is None:
             return []
         
         clusters = []
-        async for cluster in database.clusters.find({"sessionId": session_id}):
+        async for cluster in database.clusters.find(await ClusterModel._active_filter(session_id)):
             cluster["id"] = str(cluster["_id"])
             del cluster["_id"]
             clusters.append(cluster)
@@ -32,34 +82,153 @@ class ClusterModel:
 
     @staticmethod
     async def update_clusters_for_session(session_id: str, clusters: List[StudentCluster]) -> List[dict]:
-        """Update clusters for a session (replace all)"""
+        """Save a new snapshot of the session's clusters and make it the active one"""
         database = get_database()
         if database is None:
             return []
-        
-        # Delete existing clusters for this session
-        await database.clusters.delete_many({"sessionId": session_id})
-        
-        # Insert new clusters
+
+        pointer = await database.cluster_versions.find_one_and_update(
+            {"_id": session_id},
+            {"$inc": {"nextVersion": 1}},
+            upsert=True,
+            projection={"nextVersion": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        version = pointer["nextVersion"]
+
         cluster_docs = []
         for cluster in clusters:
             cluster_data = cluster.model_dump()
             cluster_data["sessionId"] = session_id
-            result = await database.clusters.insert_one(cluster_data)
-            cluster_data["id"] = str(result.inserted_id)
+            cluster_data["version"] = version
             cluster_docs.append(cluster_data)
-        
+        if cluster_docs:
+            result = await database.clusters.insert_many(cluster_docs)
+            for cluster_data, inserted_id in zip(cluster_docs, result.inserted_ids):
+                cluster_data["id"] = str(inserted_id)
+                del cluster_data["_id"]
+
+        # Only move the pointer forward: a slower concurrent save of an older
+        # snapshot must not replace a newer one
+        flipped = await database.cluster_versions.update_one(
+            {"_id": session_id, "$or": [
+                {"activeVersion": {"$lt": version}},
+                {"activeVersion": {"$exists": False}},
+            ]},
+            {"$set": {"activeVersion": version, "updatedAt": datetime.utcnow()}}
+        )
+        if flipped.modified_count == 0:
+            await database.clusters.delete_many({"sessionId": session_id, "version": version})
+            return await ClusterModel.find_by_session(session_id)
+
+        await ClusterModel._replace_memberships(session_id, cluster_docs)
+
+        task = asyncio.create_task(ClusterModel._collect_old_versions(session_id, version))
+        _gc_tasks.add(task)
+        task.add_done_callback(_gc_tasks.discard)
         return cluster_docs
 
+    @staticmethod
+    async def _collect_old_versions(session_id: str, active_version: int) -> None:
+        """Delete snapshots older than ``active_version`` (and pre-versioning documents)"""
+        database = get_database()
+        if database is None:
+            return
+        try:
+            result = await database.clusters.delete_many({
+                "sessionId": session_id,
+                "$or": [
+                    {"version": {"$lt": active_version}},
+                    {"version": {"$exists": False}},
+                ],
+            })
+            if result.deleted_count:
+                print(f"🧹 Removed {result.deleted_count} superseded cluster documents for session {session_id}")
+        except Exception as e:
+            print(f"❌ Error removing old cluster versions for session {session_id}: {e}")
+
+    @staticmethod
+    async def _replace_memberships(session_id: str, cluster_docs: List[dict]) -> None:
+        """
+        Rewrite the session's student -> cluster lookup documents.
+
+        Memberships are upserted first and stale ones removed afterwards, so
+        a student never disappears from the lookup while it is rebuilt.
+        """
+        database = get_database()
+        assigned_at = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"sessionId": session_id, "studentId": student_id},
+                {"$set": {
+                    "clusterId": cluster["id"],
+                    "engagementLevel": cluster["engagementLevel"],
+                    "assignedAt": assigned_at,
+                }},
+                upsert=True
+            )
+            for cluster in cluster_docs
+            for student_id in cluster.get("students", [])
+        ]
+        for start in range(0, len(operations), MEMBERSHIP_BATCH_SIZE):
+            await database.cluster_memberships.bulk_write(
+                operations[start:start + MEMBERSHIP_BATCH_SIZE], ordered=False
+            )
+        await database.cluster_memberships.delete_many(
+            {"sessionId": session_id, "assignedAt": {"$lt": assigned_at}}
+        )
+
+    @staticmethod
+    async def move_students(session_id: str, moves: List[Tuple[str, Optional[str], str]]) -> int:
+        """
+        Record students moved between a session's clusters in one bulk write.
+
+        ``moves`` holds (studentId, fromEngagementLevel or None, toEngagementLevel).
+        Only ``cluster_memberships`` is updated; the active snapshot keeps its
+        member lists until the next full pass saves a new one.
+        """
+        database = get_database()
+        if database is None or not moves:
+            return 0
+
+        cluster_ids = {
+            cluster["engagementLevel"]: str(cluster["_id"])
+            async for cluster in database.clusters.find(
+                await ClusterModel._active_filter(session_id), {"engagementLevel": 1}
+            )
+        }
+        assigned_at = datetime.utcnow()
+        result = await database.cluster_memberships.bulk_write([
+            UpdateOne(
+                {"sessionId": session_id, "studentId": student_id},
+                {"$set": {
+                    "clusterId": cluster_ids.get(to_level),
+                    "engagementLevel": to_level,
+                    "assignedAt": assigned_at,
+                }},
+                upsert=True
+            )
+            for student_id, _, to_level in moves
+        ], ordered=False)
+        return result.modified_count + result.upserted_count
+
     @staticmethod
     async def find_student_cluster(student_id: str, session_id: str) -> Optional[str]:
         """Find which cluster a student belongs to"""
+        clusters = await ClusterModel.find_student_clusters([student_id], session_id)
+        return clusters.get(student_id)
+
+    @staticmethod
+    async def find_student_clusters(student_ids: List[str], session_id: str) -> Dict[str, Optional[str]]:
+        """Resolve the cluster id of every student in a roster with one indexed query"""
         database = get_database()
         if database is None:
-            return None
-        
-        async for cluster in database.clusters.find({"sessionId": session_id}):
-            if student_id in cluster.get("students", []):
-                return str(cluster["_id"])
-        return None
+            return {student_id: None for student_id in student_ids}
 
+        clusters: Dict[str, Optional[str]] = {student_id: None for student_id in student_ids}
+        async for membership in database.cluster_memberships.find(
+            {"sessionId": session_id, "studentId": {"$in": list(clusters)}},
+            {"_id": 0, "studentId": 1, "clusterId": 1}
+        ):
+            clusters[membership["studentId"]] = membership.get("clusterId")
+        return clusters
@@ -3,6 +3,12 @@ from pydantic import BaseModel
 from datetime import datetime
 from bson import ObjectId
 from ..database.connection import get_database
+from ..database.indexes import IndexSpec, ASCENDING
+
+
+INDEXES = [
+    IndexSpec(collection="courses", keys=[("instructorId", ASCENDING)]),
+]
 
 
 class Course(BaseModel):
@@ -2,10 +2,58 @@ from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReplaceOne
 from ..database.connection import get_database
+from ..database.indexes import IndexSpec, ASCENDING, DESCENDING
+import asyncio
 import secrets
 
 
+INDEXES = [
+    IndexSpec(collection="live_question_sessions", keys=[("sessionToken", ASCENDING)], unique=True),
+    IndexSpec(
+        collection="live_question_sessions",
+        keys=[("status", ASCENDING), ("instructorId", ASCENDING), ("triggeredAt", DESCENDING)],
+    ),
+    IndexSpec(
+        collection="live_question_sessions",
+        keys=[("zoomMeetingId", ASCENDING), ("triggeredAt", DESCENDING)],
+    ),
+    IndexSpec(
+        collection="live_question_sessions",
+        keys=[("status", ASCENDING), ("expiresAt", ASCENDING)],
+    ),
+    IndexSpec(
+        collection="live_question_sessions",
+        keys=[("status", ASCENDING), ("updatedAt", ASCENDING)],
+    ),
+    IndexSpec(collection="live_question_sessions_archive", keys=[("sessionToken", ASCENDING)], unique=True),
+    IndexSpec(
+        collection="live_question_sessions_archive",
+        keys=[("zoomMeetingId", ASCENDING), ("triggeredAt", DESCENDING)],
+    ),
+]
+
+# Session reads never return the legacy per-session list of response ids;
+# responses are looked up through question_responses.sessionId instead
+SESSION_PROJECTION = {"responses": 0}
+
+# List reads (dashboards, meeting history) return summaries: no options,
+# correct answer or any other per-question payload
+SESSION_SUMMARY_PROJECTION = {
+    field: 1 for field in (
+        "sessionToken", "questionId", "question", "instructorId", "instructorName",
+        "zoomMeetingId", "courseId", "status", "timeLimit", "triggeredAt", "expiresAt",
+        "totalResponses", "correctResponses", "incorrectResponses", "createdAt", "updatedAt",
+    )
+}
+
+# Finished sessions are moved here after LIVE_SESSION_ARCHIVE_AFTER_DAYS so
+# live_question_sessions only holds recent ones; lookups by id, token and
+# meeting still see them
+ARCHIVE_COLLECTION = "live_question_sessions_archive"
+
+
 class LiveQuestionSession(BaseModel):
     """Model for live question sessions triggered in Zoom meetings"""
     id: Optional[str] = None
@@ -22,7 +70,6 @@ class LiveQuestionSession(BaseModel):
     timeLimit: int = 30  # seconds
     triggeredAt: datetime
     expiresAt: datetime
-    responses: List[str] = []  # List of response IDs
     totalResponses: int = 0
     correctResponses: int = 0
     incorrectResponses: int = 0
@@ -64,7 +111,6 @@ class LiveQuestionSessionModel:
         
         session_data["createdAt"] = datetime.now()
         session_data["updatedAt"] = datetime.now()
-        session_data["responses"] = []
         session_data["totalResponses"] = 0
         session_data["correctResponses"] = 0
         session_data["incorrectResponses"] = 0
@@ -83,7 +129,9 @@ class LiveQuestionSessionModel:
         if database is None:
             return None
         try:
-            session = await database.live_question_sessions.find_one({"_id": ObjectId(session_id)})
+            session = await database.live_question_sessions.find_one({"_id": ObjectId(session_id)}, SESSION_PROJECTION)
+            if not session:
+                session = await database[ARCHIVE_COLLECTION].find_one({"_id": ObjectId(session_id)}, SESSION_PROJECTION)
             if session:
                 session["id"] = str(session["_id"])
                 del session["_id"]
@@ -99,15 +147,29 @@ class LiveQuestionSessionModel:
         if database is None:
             return None
         
-        session = await database.live_question_sessions.find_one({"sessionToken": token})
+        session = await database.live_question_sessions.find_one({"sessionToken": token}, SESSION_PROJECTION)
+        if not session:
+            session = await database[ARCHIVE_COLLECTION].find_one({"sessionToken": token}, SESSION_PROJECTION)
         if session:
             session["id"] = str(session["_id"])
             del session["_id"]
         return session
 
+    @staticmethod
+    async def find_status_by_token(token: str) -> Optional[str]:
+        """Current status of a session (projected read; None if unknown)"""
+        database = get_database()
+        if database is None:
+            raise Exception("Database not connected")
+
+        session = await database.live_question_sessions.find_one({"sessionToken": token}, {"status": 1})
+        if not session:
+            session = await database[ARCHIVE_COLLECTION].find_one({"sessionToken": token}, {"status": 1})
+        return session.get("status") if session else None
+
     @staticmethod
     async def find_active_sessions(instructor_id: str = None) -> List[dict]:
-        """Find all active sessions (optionally filtered by instructor)"""
+        """Summaries of all active sessions (optionally filtered by instructor)"""
         database = get_database()
         if database is None:
             return []
@@ -117,7 +179,7 @@ class LiveQuestionSessionModel:
             query["instructorId"] = instructor_id
         
         sessions = []
-        async for session in database.live_question_sessions.find(query).sort("triggeredAt", -1):
+        async for session in database.live_question_sessions.find(query, SESSION_SUMMARY_PROJECTION).sort("triggeredAt", -1):
             session["id"] = str(session["_id"])
             del session["_id"]
             sessions.append(session)
@@ -125,16 +187,19 @@ class LiveQuestionSessionModel:
 
     @staticmethod
     async def find_by_meeting_id(meeting_id: str) -> List[dict]:
-        """Find all sessions for a specific Zoom meeting"""
+        """Summaries of all sessions for a specific Zoom meeting"""
         database = get_database()
         if database is None:
             return []
         
         sessions = []
-        async for session in database.live_question_sessions.find({"zoomMeetingId": meeting_id}).sort("triggeredAt", -1):
-            session["id"] = str(session["_id"])
-            del session["_id"]
-            sessions.append(session)
+        for collection in (database.live_question_sessions, database[ARCHIVE_COLLECTION]):
+            async for session in collection.find({"zoomMeetingId": meeting_id}, SESSION_SUMMARY_PROJECTION).sort("triggeredAt", -1):
+                session["id"] = str(session["_id"])
+                del session["_id"]
+                sessions.append(session)
+        # Archived sessions are older; only an interrupted archive run can interleave
+        sessions.sort(key=lambda session: session["triggeredAt"], reverse=True)
         return sessions
 
     @staticmethod
@@ -160,35 +225,28 @@ class LiveQuestionSessionModel:
             return None
 
     @staticmethod
-    async def add_response(session_id: str, response_id: str, is_correct: bool) -> Optional[dict]:
-        """Add a response to the session and update stats"""
+    async def add_responses(session_id: str, total: int, correct_count: int) -> bool:
+        """Count a batch of responses in the session stats with one update"""
         database = get_database()
-        if database is None:
-            return None
-        
+        if database is None or not total:
+            return False
+
         try:
-            # Increment counters
-            increment_data = {"totalResponses": 1}
-            if is_correct:
-                increment_data["correctResponses"] = 1
-            else:
-                increment_data["incorrectResponses"] = 1
-            
             result = await database.live_question_sessions.update_one(
                 {"_id": ObjectId(session_id)},
                 {
-                    "$push": {"responses": response_id},
-                    "$inc": increment_data,
+                    "$inc": {
+                        "totalResponses": total,
+                        "correctResponses": correct_count,
+                        "incorrectResponses": total - correct_count,
+                    },
                     "$set": {"updatedAt": datetime.now()}
                 }
             )
-            
-            if result.modified_count:
-                return await LiveQuestionSessionModel.find_by_id(session_id)
-            return None
+            return result.modified_count > 0
         except Exception as e:
-            print(f"Error adding response: {e}")
-            return None
+            print(f"Error adding responses: {e}")
+            return False
 
     @staticmethod
     async def complete_session(session_id: str) -> bool:
@@ -227,3 +285,79 @@ class LiveQuestionSessionModel:
             print(f"Error expiring sessions: {e}")
             return 0
 
+
+    @staticmethod
+    async def find_expiring(before: datetime) -> List[dict]:
+        """Active sessions expiring before a time (id, token and expiresAt only)"""
+        database = get_database()
+        if database is None:
+            return []
+
+        sessions = []
+        async for session in database.live_question_sessions.find(
+            {"status": "active", "expiresAt": {"$lt": before}},
+            {"sessionToken": 1, "expiresAt": 1}
+        ):
+            session["id"] = str(session["_id"])
+            del session["_id"]
+            sessions.append(session)
+        return sessions
+
+    @staticmethod
+    async def expire_sessions(session_ids: List[str]) -> List[str]:
+        """Expire the given sessions if they are still active and past their expiry time; returns the ids expired"""
+        database = get_database()
+        if database is None or not session_ids:
+            return []
+
+        try:
+            now = datetime.now()
+            due = {
+                "_id": {"$in": [ObjectId(session_id) for session_id in session_ids]},
+                "status": "active",
+                "expiresAt": {"$lte": now}
+            }
+            candidates = [doc["_id"] async for doc in database.live_question_sessions.find(due, {"_id": 1})]
+
+            # Same filter per session: another worker may complete or expire
+            # one in between, and only the writer that changed it reports it
+            async def expire_one(session_id):
+                result = await database.live_question_sessions.update_one(
+                    {**due, "_id": session_id},
+                    {"$set": {"status": "expired", "updatedAt": now}}
+                )
+                return str(session_id) if result.modified_count else None
+
+            expired = await asyncio.gather(*[expire_one(session_id) for session_id in candidates])
+            return [session_id for session_id in expired if session_id]
+        except Exception as e:
+            print(f"Error expiring sessions: {e}")
+            return []
+
+    @staticmethod
+    async def archive_finished_sessions(before: datetime, batch_size: int = 500) -> int:
+        """Move completed/expired sessions last updated before a time to the archive"""
+        database = get_database()
+        if database is None:
+            return 0
+
+        archived = 0
+        while True:
+            sessions = await database.live_question_sessions.find(
+                {"status": {"$in": ["completed", "expired"]}, "updatedAt": {"$lt": before}}
+            ).limit(batch_size).to_list(length=batch_size)
+            if not sessions:
+                return archived
+
+            # Replace (not insert) so a run interrupted between the two
+            # writes can simply be repeated
+            await database[ARCHIVE_COLLECTION].bulk_write(
+                [ReplaceOne({"_id": session["_id"]}, session, upsert=True) for session in sessions],
+                ordered=False
+            )
+            await database.live_question_sessions.delete_many(
+                {"_id": {"$in": [session["_id"] for session in sessions]}}
+            )
+            archived += len(sessions)
+            if len(sessions) < batch_size:
+                return archived
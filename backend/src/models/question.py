@@ -4,6 +4,29 @@ from ..database.connection import get_database
 
 
 class Question:
+    # Document in question_bank_meta whose version is bumped on every write,
+    # so in-process question caches (see QuestionBankCache) can detect changes
+    BANK_VERSION_ID = "questions"
+
+    @staticmethod
+    async def get_bank_version() -> int:
+        """Return the current question bank version"""
+        database = get_database()
+        if database is None:
+            return 0
+
+        meta = await database.question_bank_meta.find_one({"_id": Question.BANK_VERSION_ID})
+        return meta.get("version", 0) if meta else 0
+
+    @staticmethod
+    async def _bump_bank_version(database) -> None:
+        """Mark the question bank as changed"""
+        await database.question_bank_meta.update_one(
+            {"_id": Question.BANK_VERSION_ID},
+            {"$inc": {"version": 1}},
+            upsert=True
+        )
+
     @staticmethod
     async def find_by_id(id: str) -> Optional[Dict[str, Any]]:
         """Find question by ID"""
@@ -43,6 +66,7 @@ class Question:
             question_data = {**data}
         
         result = await database.questions.insert_one(question_data)
+        await Question._bump_bank_version(database)
         question_data["id"] = str(result.inserted_id)
         if "_id" in question_data:
             question_data["_id"] = result.inserted_id
@@ -75,6 +99,7 @@ class Question:
                 {"$set": update_data}
             )
             if result.modified_count:
+                await Question._bump_bank_version(database)
                 return await Question.find_by_id(question_id)
         except:
             pass
@@ -89,7 +114,10 @@ class Question:
         
         try:
             result = await database.questions.delete_one({"_id": ObjectId(question_id)})
-            return result.deleted_count > 0
+            if result.deleted_count > 0:
+                await Question._bump_bank_version(database)
+                return True
+            return False
         except:
             return False
 
@@ -1,7 +1,23 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from ..database.connection import get_database
+from ..database.indexes import IndexSpec, ASCENDING
+
+
+INDEXES = [
+    IndexSpec(
+        collection="question_assignments",
+        keys=[("sessionId", ASCENDING), ("studentId", ASCENDING), ("activationVersion", ASCENDING)],
+        unique=True,
+    ),
+    IndexSpec(
+        collection="question_assignments",
+        keys=[("sessionId", ASCENDING), ("activationVersion", ASCENDING), ("answered", ASCENDING)],
+    ),
+]
 
 
 class QuestionAssignmentModel:
@@ -25,6 +41,66 @@ class QuestionAssignmentModel:
         assignment["id"] = str(result.inserted_id)
         return assignment
 
+    @staticmethod
+    async def claim(session_id: str, student_id: str, question_id: str, activation_version: int) -> Optional[dict]:
+        """
+        Create the student's assignment for this activation, or return the existing one.
+
+        A single upsert against the unique (sessionId, studentId, activationVersion)
+        index, so concurrent requests for the same student converge on one document.
+        """
+        database = get_database()
+        if database is None:
+            raise Exception("Database not connected")
+
+        key = {
+            "sessionId": session_id,
+            "studentId": student_id,
+            "activationVersion": activation_version,
+        }
+        update = {
+            "$setOnInsert": {
+                "questionId": question_id,
+                "assignedAt": datetime.utcnow(),
+                "answered": False,
+            }
+        }
+
+        try:
+            assignment = await database.question_assignments.find_one_and_update(
+                key, update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Lost an upsert race for the same key; the winner's document exists now
+            assignment = await database.question_assignments.find_one(key)
+
+        if assignment:
+            assignment["id"] = str(assignment["_id"])
+            del assignment["_id"]
+        return assignment
+
+    @staticmethod
+    async def reassign(session_id: str, student_id: str, activation_version: int, question_id: str) -> Optional[dict]:
+        """Point an unanswered assignment at a different question"""
+        database = get_database()
+        if database is None:
+            return None
+
+        assignment = await database.question_assignments.find_one_and_update(
+            {
+                "sessionId": session_id,
+                "studentId": student_id,
+                "activationVersion": activation_version,
+                "answered": False
+            },
+            {"$set": {"questionId": question_id, "assignedAt": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+        if assignment:
+            assignment["id"] = str(assignment["_id"])
+            del assignment["_id"]
+        return assignment
+
     @staticmethod
     async def find_active(session_id: str, student_id: str, activation_version: int) -> Optional[dict]:
         """Find active (unanswered) assignment for a student in current activation cycle"""
@@ -78,6 +154,21 @@ class QuestionAssignmentModel:
             question_ids.append(str(assignment.get("questionId")))
         return question_ids
 
+    @staticmethod
+    async def count_by_student(session_id: str) -> Dict[str, int]:
+        """Number of questions assigned to each student in a session (all activations)"""
+        database = get_database()
+        if database is None:
+            return {}
+
+        counts: Dict[str, int] = {}
+        async for row in database.question_assignments.aggregate([
+            {"$match": {"sessionId": session_id}},
+            {"$group": {"_id": "$studentId", "count": {"$sum": 1}}},
+        ]):
+            counts[row["_id"]] = row["count"]
+        return counts
+
     @staticmethod
     async def reset_session(session_id: str) -> int:
         """Remove all assignments for a session"""
@@ -1,8 +1,49 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from pydantic import BaseModel
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 from ..database.connection import get_database
+from ..database.indexes import IndexSpec, ASCENDING
+from .question_stats_model import QuestionStatsModel
+
+
+INDEXES = [
+    IndexSpec(collection="question_responses", keys=[("sessionId", ASCENDING), ("submittedAt", ASCENDING)]),
+    # One response per student per session; responses stored before
+    # studentKey existed are left out of the constraint
+    IndexSpec(
+        collection="question_responses",
+        keys=[("sessionId", ASCENDING), ("studentKey", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"studentKey": {"$exists": True}},
+    ),
+]
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def student_key(
+    student_id: Optional[str] = None,
+    student_email: Optional[str] = None,
+    zoom_user_id: Optional[str] = None,
+    student_name: Optional[str] = None
+) -> Optional[str]:
+    """
+    Normalised identity of the student behind a response.
+
+    The strongest identifier wins (id, then email, then Zoom user id, then
+    display name); emails and names are compared case-insensitively.
+    """
+    if student_id and str(student_id).strip():
+        return f"id:{str(student_id).strip()}"
+    if student_email and student_email.strip():
+        return f"email:{student_email.strip().lower()}"
+    if zoom_user_id and str(zoom_user_id).strip():
+        return f"zoom:{str(zoom_user_id).strip()}"
+    if student_name and student_name.strip():
+        return f"name:{' '.join(student_name.split()).lower()}"
+    return None
 
 
 class QuestionResponse(BaseModel):
@@ -15,6 +56,7 @@ class QuestionResponse(BaseModel):
     studentName: Optional[str] = None
     studentEmail: Optional[str] = None
     zoomUserId: Optional[str] = None
+    studentKey: Optional[str] = None  # See student_key()
     selectedAnswer: int  # Index of selected option
     isCorrect: bool
     responseTime: float  # Time taken to answer in seconds
@@ -49,11 +91,61 @@ class QuestionResponseModel:
         
         result = await database.question_responses.insert_one(response_data)
         response_data["id"] = str(result.inserted_id)
+
+        await QuestionStatsModel.record(
+            response_data.get("sessionId"),
+            response_data.get("questionId"),
+            bool(response_data.get("isCorrect")),
+            response_data.get("responseTime", 0)
+        )
         
         if "_id" in response_data:
             del response_data["_id"]
         return response_data
 
+    @staticmethod
+    async def create_many(responses: List[dict]) -> Tuple[List[dict], List[int]]:
+        """
+        Insert a batch of responses with one unordered bulk insert.
+
+        Returns (inserted responses, indexes of responses rejected as
+        duplicates by the studentKey index). Statistics are recorded for the
+        inserted responses in one bulk write.
+        """
+        database = get_database()
+        if database is None:
+            raise Exception("Database not connected")
+        if not responses:
+            return [], []
+
+        now = datetime.now()
+        for response_data in responses:
+            response_data["createdAt"] = now
+            response_data["submittedAt"] = response_data.get("submittedAt", now)
+
+        duplicates: List[int] = []
+        try:
+            await database.question_responses.insert_many(responses, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") != DUPLICATE_KEY_ERROR:
+                    raise
+                duplicates.append(error["index"])
+
+        rejected = set(duplicates)
+        inserted = []
+        for index, response_data in enumerate(responses):
+            if index in rejected:
+                continue
+            response_data["id"] = str(response_data.pop("_id"))
+            inserted.append(response_data)
+
+        await QuestionStatsModel.record_many([
+            (r.get("sessionId"), r.get("questionId"), bool(r.get("isCorrect")), r.get("responseTime", 0))
+            for r in inserted
+        ])
+        return inserted, duplicates
+
     @staticmethod
     async def find_by_id(response_id: str) -> Optional[dict]:
         """Find response by ID"""
@@ -114,6 +206,12 @@ class QuestionResponseModel:
         database = get_database()
         if database is None:
             return {}
+
+        # Materialized stats (one indexed lookup); sessions recorded before
+        # question_stats existed fall back to scanning their responses
+        stats = await QuestionStatsModel.get(session_id)
+        if stats:
+            return {key: value for key, value in stats.items() if key not in ("sessionId", "questionId")}
         
         responses = await QuestionResponseModel.find_by_session(session_id)
         
@@ -141,6 +239,32 @@ class QuestionResponseModel:
             "slowestResponse": max(response_times) if response_times else 0
         }
 
+    @staticmethod
+    async def student_summaries(session_ids: List[str]) -> List[dict]:
+        """Per-student answer count, correct count, response times and response ids across live sessions"""
+        database = get_database()
+        if database is None or not session_ids:
+            return []
+
+        pipeline = [
+            {"$match": {"sessionId": {"$in": session_ids}}},
+            {"$group": {
+                "_id": {"$ifNull": ["$studentId", {"$ifNull": ["$zoomUserId", {
+                    "$ifNull": ["$studentEmail", "$studentName"]
+                }]}]},
+                "answered": {"$sum": 1},
+                "correct": {"$sum": {"$cond": ["$isCorrect", 1, 0]}},
+                "times": {"$push": "$responseTime"},
+                "ids": {"$push": "$_id"},
+            }},
+        ]
+        summaries = []
+        async for row in database.question_responses.aggregate(pipeline):
+            row["studentId"] = row.pop("_id")
+            row["ids"] = [str(response_id) for response_id in row["ids"]]
+            summaries.append(row)
+        return summaries
+
     @staticmethod
     async def get_live_responses(session_id: str, limit: int = 50) -> list:
         """Get recent responses for live dashboard"""
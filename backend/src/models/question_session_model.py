@@ -1,41 +1,78 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+from pymongo import ReturnDocument
 from ..database.connection import get_database
+from ..database.indexes import IndexSpec, ASCENDING
+
+
+INDEXES = [
+    IndexSpec(collection="question_sessions", keys=[("sessionId", ASCENDING)], unique=True),
+]
 
 
 class QuestionSessionModel:
     @staticmethod
-    async def activate(session_id: str, mode: str = "individual") -> dict:
-        """Mark a session as having active personalized questions and increment version"""
+    async def activate(session_id: str, mode: str = "individual", deck: Optional[List[str]] = None) -> dict:
+        """
+        Mark a session as having active personalized questions and increment version.
+
+        ``deck`` is the shuffled list of question IDs handed out in order by
+        ``claim_next_question`` during this activation.
+        """
         database = get_database()
         if database is None:
             raise Exception("Database not connected")
 
-        session_doc = await database.question_sessions.find_one({"sessionId": session_id})
-        current_version = session_doc.get("version", 0) + 1 if session_doc else 1
-
-        result = await database.question_sessions.update_one(
+        session_doc = await database.question_sessions.find_one_and_update(
             {"sessionId": session_id},
             {
                 "$set": {
-                    "sessionId": session_id,
                     "mode": mode,
                     "active": True,
-                    "version": current_version,
+                    "deck": deck or [],
+                    "deckCursor": 0,
                     "updatedAt": datetime.utcnow()
                 },
+                "$inc": {"version": 1},
                 "$setOnInsert": {
                     "createdAt": datetime.utcnow()
                 }
             },
-            upsert=True
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
+        current_version = session_doc.get("version", 1)
         return {
-            "matched": result.matched_count,
-            "upserted": result.upserted_id is not None,
+            "matched": 1 if current_version > 1 else 0,
+            "upserted": current_version == 1,
             "version": current_version
         }
 
+    @staticmethod
+    async def claim_next_question(session_id: str, activation_version: int) -> Optional[str]:
+        """
+        Atomically take the next question ID from the activation's deck.
+
+        Concurrent callers each get a different deck position; once the deck
+        is exhausted it wraps around. Returns None when the activation has no
+        deck (or is no longer current).
+        """
+        database = get_database()
+        if database is None:
+            return None
+
+        session_doc = await database.question_sessions.find_one_and_update(
+            {"sessionId": session_id, "active": True, "version": activation_version},
+            {"$inc": {"deckCursor": 1}},
+            projection={"deck": 1, "deckCursor": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not session_doc or not session_doc.get("deck"):
+            return None
+
+        deck = session_doc["deck"]
+        return deck[(session_doc["deckCursor"] - 1) % len(deck)]
+
     @staticmethod
     async def deactivate(session_id: str) -> bool:
         """Deactivate personalized questions for a session"""
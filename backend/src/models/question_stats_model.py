@@ -0,0 +1,209 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from pymongo import ReplaceOne, UpdateOne
+from ..database.connection import get_database
+from ..database.indexes import IndexSpec, ASCENDING
+from .question import Question
+
+
+INDEXES = [
+    IndexSpec(collection="question_stats", keys=[("sessionId", ASCENDING), ("questionId", ASCENDING)], unique=True),
+]
+
+# Upper bounds (seconds) of the response-time histogram buckets; the last
+# bucket (index len(RESPONSE_TIME_BUCKETS)) holds everything slower
+RESPONSE_TIME_BUCKETS = [1, 2, 3, 5, 7, 10, 15, 20, 30, 45, 60, 90, 120]
+
+STATS_PERCENTILES = (0.5, 0.9, 0.99)
+
+
+def bucket_index(response_time: float) -> int:
+    """Histogram bucket for a response time"""
+    for index, upper in enumerate(RESPONSE_TIME_BUCKETS):
+        if response_time <= upper:
+            return index
+    return len(RESPONSE_TIME_BUCKETS)
+
+
+def percentiles_from_histogram(histogram: Dict[str, int], fastest: float, slowest: float) -> Dict[str, float]:
+    """Estimate percentiles by interpolating inside the histogram buckets"""
+    counts = [int(histogram.get(str(i), 0)) for i in range(len(RESPONSE_TIME_BUCKETS) + 1)]
+    total = sum(counts)
+    if total == 0:
+        return {}
+
+    results: Dict[str, float] = {}
+    for p in STATS_PERCENTILES:
+        target = p * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if count and cumulative + count >= target:
+                lower = RESPONSE_TIME_BUCKETS[index - 1] if index > 0 else 0
+                upper = RESPONSE_TIME_BUCKETS[index] if index < len(RESPONSE_TIME_BUCKETS) else slowest
+                lower, upper = max(lower, fastest), min(upper, slowest)
+                value = lower + (upper - lower) * (target - cumulative) / count
+                results[f"p{round(p * 100)}"] = round(max(lower, min(value, upper)), 3)
+                break
+            cumulative += count
+    return results
+
+
+class QuestionStatsModel:
+    """
+    Materialized per-(session, question) answer statistics.
+
+    Updated incrementally on every answer write so dashboards can read
+    totals, timing extremes and histogram-based percentiles with a single
+    indexed lookup. ``rebuild`` recomputes the documents from raw answers.
+    """
+
+    @staticmethod
+    async def record(session_id: str, question_id: str, is_correct: bool, response_time: float) -> None:
+        """Fold one answer into the stats document"""
+        database = get_database()
+        if database is None:
+            return
+
+        await database.question_stats.update_one(
+            *QuestionStatsModel._record_update(session_id, question_id, is_correct, response_time),
+            upsert=True
+        )
+
+    @staticmethod
+    async def record_many(answers: List[tuple]) -> None:
+        """Fold (sessionId, questionId, isCorrect, responseTime) tuples in with one bulk write"""
+        database = get_database()
+        if database is None or not answers:
+            return
+
+        await database.question_stats.bulk_write([
+            UpdateOne(*QuestionStatsModel._record_update(*answer), upsert=True)
+            for answer in answers
+        ], ordered=False)
+
+    @staticmethod
+    def _record_update(session_id: str, question_id: str, is_correct: bool, response_time: float) -> tuple:
+        response_time = float(response_time or 0)
+        return (
+            {"sessionId": session_id, "questionId": question_id},
+            {
+                "$inc": {
+                    "total": 1,
+                    "correct": 1 if is_correct else 0,
+                    "incorrect": 0 if is_correct else 1,
+                    "totalTime": response_time,
+                    f"histogram.{bucket_index(response_time)}": 1,
+                },
+                "$min": {"fastest": response_time},
+                "$max": {"slowest": response_time},
+                "$set": {"updatedAt": datetime.utcnow()},
+            },
+        )
+
+    @staticmethod
+    async def get(session_id: str, question_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Read the stats for a session (and question).
+
+        Returns None if nothing has been recorded yet.
+        """
+        database = get_database()
+        if database is None:
+            return None
+
+        query = {"sessionId": session_id}
+        if question_id is not None:
+            query["questionId"] = question_id
+
+        doc = await database.question_stats.find_one(query)
+        if not doc:
+            return None
+
+        total = doc.get("total", 0)
+        correct = doc.get("correct", 0)
+        fastest = doc.get("fastest", 0)
+        slowest = doc.get("slowest", 0)
+        return {
+            "sessionId": doc.get("sessionId"),
+            "questionId": doc.get("questionId"),
+            "total": total,
+            "correct": correct,
+            "incorrect": doc.get("incorrect", 0),
+            "accuracy": (correct / total * 100) if total else 0,
+            "averageResponseTime": (doc.get("totalTime", 0) / total) if total else 0,
+            "fastestResponse": fastest,
+            "slowestResponse": slowest,
+            "percentiles": percentiles_from_histogram(doc.get("histogram", {}), fastest, slowest),
+        }
+
+    @staticmethod
+    async def delete_by_session(session_id: str) -> int:
+        """Drop the stats for a session (e.g. when its answers are cleared)"""
+        database = get_database()
+        if database is None:
+            return 0
+
+        result = await database.question_stats.delete_many({"sessionId": session_id})
+        return result.deleted_count
+
+    @staticmethod
+    async def rebuild(session_id: Optional[str] = None) -> int:
+        """
+        Recompute stats documents from question_responses and quiz_answers.
+
+        Quiz answers stored before correctness was recorded are graded against
+        the question bank. Returns the number of stats documents written.
+        """
+        database = get_database()
+        if database is None:
+            return 0
+
+        match = {"sessionId": session_id} if session_id else {}
+        totals: Dict[tuple, Dict[str, Any]] = {}
+
+        def fold(key: tuple, is_correct: bool, response_time: float):
+            stats = totals.setdefault(key, {
+                "total": 0, "correct": 0, "incorrect": 0, "totalTime": 0.0,
+                "fastest": response_time, "slowest": response_time, "histogram": {},
+            })
+            stats["total"] += 1
+            stats["correct" if is_correct else "incorrect"] += 1
+            stats["totalTime"] += response_time
+            stats["fastest"] = min(stats["fastest"], response_time)
+            stats["slowest"] = max(stats["slowest"], response_time)
+            bucket = str(bucket_index(response_time))
+            stats["histogram"][bucket] = stats["histogram"].get(bucket, 0) + 1
+
+        async for doc in database.question_responses.find(
+            match, {"sessionId": 1, "questionId": 1, "isCorrect": 1, "responseTime": 1}
+        ):
+            fold((doc.get("sessionId"), doc.get("questionId")),
+                 bool(doc.get("isCorrect")), float(doc.get("responseTime") or 0))
+
+        correct_answers: Dict[str, Optional[int]] = {}
+        async for doc in database.quiz_answers.find(
+            match, {"sessionId": 1, "questionId": 1, "isCorrect": 1, "answerIndex": 1, "timeTaken": 1}
+        ):
+            question_id = doc.get("questionId")
+            is_correct = doc.get("isCorrect")
+            if is_correct is None:
+                if question_id not in correct_answers:
+                    question = await Question.find_by_id(question_id)
+                    correct_answers[question_id] = question.get("correctAnswer") if question else None
+                is_correct = doc.get("answerIndex") == correct_answers[question_id]
+            fold((doc.get("sessionId"), question_id), bool(is_correct), float(doc.get("timeTaken") or 0))
+
+        now = datetime.utcnow()
+        operations: List[ReplaceOne] = [
+            ReplaceOne(
+                {"sessionId": key[0], "questionId": key[1]},
+                {"sessionId": key[0], "questionId": key[1], **stats, "updatedAt": now},
+                upsert=True
+            )
+            for key, stats in totals.items()
+        ]
+
+        await database.question_stats.delete_many(match)
+        for start in range(0, len(operations), 1000):
+            await database.question_stats.bulk_write(operations[start:start + 1000], ordered=False)
+        return len(operations)
@@ -1,23 +1,75 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import OperationFailure
 from ..database.connection import get_database
+from ..database.indexes import IndexSpec, ASCENDING, DESCENDING
 from .quiz_answer import QuizAnswer
+from .question_stats_model import QuestionStatsModel
+
+
+# Response-time percentiles reported by aggregate_performance
+PERFORMANCE_PERCENTILES = (0.5, 0.9, 0.99)
+
+# Servers without $percentile estimate them from this many equal-count
+# response-time buckets instead of shipping every time to the client
+PERCENTILE_BUCKETS = 100
+
+# Whether the server accepts $percentile; None until the first query finds out
+_percentile_supported: Optional[bool] = None
+
+INDEXES = [
+    IndexSpec(
+        collection="quiz_answers",
+        keys=[("questionId", ASCENDING), ("sessionId", ASCENDING), ("isCorrect", DESCENDING), ("timeTaken", ASCENDING)],
+    ),
+    IndexSpec(collection="quiz_answers", keys=[("sessionId", ASCENDING)]),
+]
+
+
+def _bucket_percentiles(buckets: List[dict], percentiles) -> List[float]:
+    """
+    Percentiles estimated from ``$bucketAuto`` output (ascending, with the
+    count, min and max of each bucket): the value at rank ``p * n`` is
+    interpolated between the min and max of the bucket holding that rank.
+    """
+    buckets = [bucket for bucket in buckets if bucket.get("min") is not None]
+    total = sum(bucket["count"] for bucket in buckets)
+    if not total:
+        return []
+
+    values = []
+    for p in percentiles:
+        rank = min(total - 1, int(p * total))
+        seen = 0
+        for bucket in buckets:
+            if rank < seen + bucket["count"]:
+                span = bucket["count"] - 1
+                position = (rank - seen) / span if span else 0.0
+                values.append(bucket["min"] + (bucket["max"] - bucket["min"]) * position)
+                break
+            seen += bucket["count"]
+    return values
 
 
 class QuizAnswerModel:
     @staticmethod
-    async def create(answer: QuizAnswer) -> dict:
-        """Store a quiz answer"""
+    async def create(answer: QuizAnswer, is_correct: Optional[bool] = None) -> dict:
+        """Store a quiz answer (and fold it into question_stats when correctness is known)"""
         database = get_database()
         if database is None:
             raise Exception("Database not connected")
         
         answer_data = answer.model_dump()
         answer_data["timestamp"] = datetime.now()
+        if is_correct is not None:
+            answer_data["isCorrect"] = is_correct
         
         result = await database.quiz_answers.insert_one(answer_data)
         answer_data["id"] = str(result.inserted_id)
+
+        if is_correct is not None:
+            await QuestionStatsModel.record(answer.sessionId, answer.questionId, is_correct, answer.timeTaken)
         return answer_data
 
     @staticmethod
@@ -51,6 +103,135 @@ class QuizAnswerModel:
             answers.append(answer)
         return answers
 
+    @staticmethod
+    async def student_summaries(session_id: str) -> List[dict]:
+        """Per-student answer count, correct count, response times and answer ids for a session"""
+        database = get_database()
+        if database is None:
+            return []
+
+        pipeline = [
+            {"$match": {"sessionId": session_id}},
+            {"$group": {
+                "_id": "$studentId",
+                "answered": {"$sum": 1},
+                "correct": {"$sum": {"$cond": [{"$eq": ["$isCorrect", True]}, 1, 0]}},
+                "times": {"$push": "$timeTaken"},
+                "ids": {"$push": "$_id"},
+            }},
+        ]
+        summaries = []
+        async for row in database.quiz_answers.aggregate(pipeline):
+            row["studentId"] = row.pop("_id")
+            row["ids"] = [str(answer_id) for answer_id in row["ids"]]
+            summaries.append(row)
+        return summaries
+
+    @staticmethod
+    async def find_top_performers(question_id: str, session_id: str, limit: int = 10) -> List[dict]:
+        """Best answers for a question in a session: correct first, then fastest"""
+        database = get_database()
+        if database is None:
+            return []
+
+        cursor = database.quiz_answers.find(
+            {"questionId": question_id, "sessionId": session_id},
+            {"_id": 0, "studentId": 1, "isCorrect": 1, "timeTaken": 1}
+        ).sort([("isCorrect", -1), ("timeTaken", 1)]).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    @staticmethod
+    async def aggregate_performance(
+        question_id: str,
+        session_id: str,
+        correct_answer: Optional[int],
+        top_limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Summarise answers for a question in a session in a single aggregation.
+
+        Uses the (questionId, sessionId) index; only the summary and the
+        ``top_limit`` best answers (correct first, then fastest) are returned.
+        """
+        database = get_database()
+        if database is None:
+            return {"answered": 0, "correct": 0, "averageTime": 0, "percentiles": {}, "topPerformers": []}
+
+        def pipeline(with_percentiles: bool) -> List[dict]:
+            summary_group = {
+                "_id": None,
+                "answered": {"$sum": 1},
+                "correct": {"$sum": {"$cond": ["$isCorrect", 1, 0]}},
+                "averageTime": {"$avg": "$timeTaken"},
+            }
+            facets = {
+                "summary": [{"$group": summary_group}],
+                "topPerformers": [
+                    {"$sort": {"isCorrect": -1, "timeTaken": 1}},
+                    {"$limit": top_limit},
+                    {"$project": {"_id": 0, "studentId": 1, "isCorrect": 1, "timeTaken": 1}},
+                ],
+            }
+            if with_percentiles:
+                # $percentile needs MongoDB 7.0+
+                summary_group["percentiles"] = {
+                    "$percentile": {
+                        "input": "$timeTaken",
+                        "p": list(PERFORMANCE_PERCENTILES),
+                        "method": "approximate",
+                    }
+                }
+            else:
+                # Older servers: at most PERCENTILE_BUCKETS small documents
+                facets["distribution"] = [
+                    {"$bucketAuto": {
+                        "groupBy": "$timeTaken",
+                        "buckets": PERCENTILE_BUCKETS,
+                        "output": {
+                            "count": {"$sum": 1},
+                            "min": {"$min": "$timeTaken"},
+                            "max": {"$max": "$timeTaken"},
+                        },
+                    }},
+                ]
+
+            return [
+                {"$match": {"questionId": question_id, "sessionId": session_id}},
+                {"$addFields": {"isCorrect": {"$eq": ["$answerIndex", correct_answer]}}},
+                {"$facet": facets},
+            ]
+
+        global _percentile_supported
+        results = None
+        if _percentile_supported is not False:
+            try:
+                results = await database.quiz_answers.aggregate(pipeline(True)).to_list(length=1)
+                _percentile_supported = True
+            except OperationFailure:
+                # Checked once per process; later calls go straight to the buckets
+                _percentile_supported = False
+        if results is None:
+            results = await database.quiz_answers.aggregate(pipeline(False)).to_list(length=1)
+
+        facets = results[0] if results else {"summary": [], "topPerformers": []}
+        summary = facets["summary"][0] if facets["summary"] else {}
+
+        if "distribution" in facets:
+            values = _bucket_percentiles(facets["distribution"], PERFORMANCE_PERCENTILES)
+        else:
+            values = summary.get("percentiles") or []
+
+        return {
+            "answered": summary.get("answered", 0),
+            "correct": summary.get("correct", 0),
+            "averageTime": summary.get("averageTime") or 0,
+            "percentiles": {
+                f"p{round(p * 100)}": value
+                for p, value in zip(PERFORMANCE_PERCENTILES, values)
+            },
+            "topPerformers": facets["topPerformers"],
+        }
+
     @staticmethod
     async def delete_by_question_and_session(question_id: str, session_id: str) -> int:
         """Delete answers for a question in a session"""
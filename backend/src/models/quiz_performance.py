@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 from pydantic import BaseModel
 
 
@@ -23,4 +23,5 @@ class QuizPerformance(BaseModel):
     correctPercentage: float
     performanceByCluster: List[PerformanceByCluster]
     topPerformers: List[TopPerformer]
+    timePercentiles: Dict[str, float] = {}  # e.g. {"p50": 4.2, "p90": 9.8, "p99": 14.1}
 
@@ -3,6 +3,12 @@ from pydantic import BaseModel, EmailStr
 from datetime import datetime
 from bson import ObjectId
 from ..database.connection import get_database
+from ..database.indexes import IndexSpec, ASCENDING
+
+
+INDEXES = [
+    IndexSpec(collection="users", keys=[("email", ASCENDING)], unique=True),
+]
 
 
 class User(BaseModel):
@@ -0,0 +1,58 @@
+from typing import List, Set
+from datetime import datetime
+from pymongo.errors import BulkWriteError
+from ..database.connection import get_database
+from ..database.indexes import IndexSpec, ASCENDING
+
+
+# Zoom stops retrying a delivery well within three days
+RECEIPT_TTL_SECONDS = 3 * 24 * 3600
+
+INDEXES = [
+    IndexSpec(
+        collection="webhook_receipts",
+        keys=[("receivedAt", ASCENDING)],
+        expireAfterSeconds=RECEIPT_TTL_SECONDS,
+    ),
+]
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class WebhookReceiptModel:
+    """Fingerprints of webhook deliveries already accepted (``_id`` is the fingerprint)"""
+
+    @staticmethod
+    async def claim_many(fingerprints: List[str]) -> Set[str]:
+        """
+        Record deliveries with one unordered insert.
+
+        Returns the fingerprints that were new; the others were already
+        received (by this or another worker) and are duplicates.
+        """
+        database = get_database()
+        if database is None or not fingerprints:
+            return set(fingerprints)
+
+        now = datetime.now()
+        duplicates: Set[str] = set()
+        try:
+            await database.webhook_receipts.insert_many(
+                [{"_id": fingerprint, "receivedAt": now} for fingerprint in fingerprints],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") != DUPLICATE_KEY_ERROR:
+                    raise
+                duplicates.add(fingerprints[error["index"]])
+        return set(fingerprints) - duplicates
+
+    @staticmethod
+    async def release_many(fingerprints: List[str]) -> None:
+        """Forget deliveries that failed processing, so Zoom's retry is accepted"""
+        database = get_database()
+        if database is None or not fingerprints:
+            return
+
+        await database.webhook_receipts.delete_many({"_id": {"$in": fingerprints}})
@@ -0,0 +1,134 @@
+from typing import Any, Dict, List, Union
+from datetime import datetime, timezone
+from ..database.connection import get_database_by_name
+from ..database.indexes import IndexSpec, ASCENDING, DESCENDING
+
+
+ZOOM_DATABASE = "zoom_attendance"
+
+INDEXES = [
+    IndexSpec(
+        collection="participants",
+        keys=[("zoom_meeting_id", ASCENDING), ("user_id", ASCENDING)],
+        database=ZOOM_DATABASE,
+    ),
+    # Key of the join/leave upserts written by ParticipantWriteBatcher
+    IndexSpec(
+        collection="participants",
+        keys=[("zoom_meeting_id", ASCENDING), ("participant_uuid", ASCENDING)],
+        database=ZOOM_DATABASE,
+    ),
+    # Most recent open join of a participant, matched by a leave event
+    IndexSpec(
+        collection="participants",
+        keys=[
+            ("zoom_meeting_id", ASCENDING),
+            ("participant_key", ASCENDING),
+            ("status", ASCENDING),
+            ("join_time", DESCENDING),
+        ],
+        database=ZOOM_DATABASE,
+    ),
+]
+
+
+def meeting_id_candidates(meeting_id: Union[str, int]) -> List[Union[str, int]]:
+    """Zoom sends meeting ids as numbers, our sessions carry them as strings"""
+    candidates: List[Union[str, int]] = [str(meeting_id)]
+    if str(meeting_id).isdigit():
+        candidates.append(int(meeting_id))
+    return candidates
+
+
+def participant_key(participant: Dict[str, Any]) -> str:
+    """
+    Canonical identity of a participant within a meeting.
+
+    Join and leave events don't always carry the same ids, so this picks
+    the most stable one both have, in a fixed order, and normalises it:
+    participant_uuid, then participant_user_id, then email, then the
+    per-meeting user id, then the display name.
+    """
+    for prefix, value in (
+        ("uuid", participant.get("participant_uuid")),
+        ("user", participant.get("participant_user_id")),
+        ("email", participant.get("email") or participant.get("user_email")),
+        ("id", participant.get("user_id") or participant.get("id")),
+        ("name", participant.get("user_name") or participant.get("name") or participant.get("display_name")),
+    ):
+        value = str(value).strip() if value is not None else ""
+        if value and value != "unknown":
+            return f"{prefix}:{value.lower() if prefix in ('email', 'name') else value}"
+    return "unknown"
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class ZoomAttendanceModel:
+    """Read access to the participant records written by the Zoom webhook"""
+
+    @staticmethod
+    async def attendance_minutes(meeting_id: Union[str, int]) -> List[Dict[str, Any]]:
+        """
+        Minutes attended per participant in a meeting.
+
+        Returns one entry per participant (``userId``, ``email``, ``minutes``);
+        a participant who rejoined has their stints summed, and anyone still
+        in the meeting is counted up to now. Read from the attendance
+        summaries kept by ``AttendanceSessionizer``; meetings recorded
+        before those existed are computed from the participant records.
+        """
+        zoom_db = get_database_by_name(ZOOM_DATABASE)
+        if zoom_db is None:
+            return []
+
+        now = datetime.now(timezone.utc)
+        summarised: List[Dict[str, Any]] = []
+        async for summary in zoom_db.attendance_summary.find(
+            {"zoom_meeting_id": {"$in": meeting_id_candidates(meeting_id)}},
+            {"user_id": 1, "email": 1, "total_seconds": 1, "open_since": 1}
+        ):
+            user_id = summary.get("user_id")
+            email = summary.get("email")
+            if not user_id and not email:
+                continue
+            seconds = summary.get("total_seconds", 0)
+            open_since = summary.get("open_since")
+            if isinstance(open_since, datetime):
+                seconds += max(0.0, (now - _as_utc(open_since)).total_seconds())
+            summarised.append({
+                "userId": str(user_id) if user_id else None, "email": email, "minutes": seconds / 60
+            })
+        if summarised:
+            return summarised
+
+        attendees: Dict[str, Dict[str, Any]] = {}
+        async for participant in zoom_db.participants.find(
+            {"zoom_meeting_id": {"$in": meeting_id_candidates(meeting_id)}},
+            {"user_id": 1, "email": 1, "join_time": 1, "leave_time": 1}
+        ):
+            join_time = participant.get("join_time")
+            if not isinstance(join_time, datetime):
+                continue
+            user_id = participant.get("user_id")
+            if user_id in (None, "", "unknown"):
+                user_id = None
+            email = participant.get("email")
+            key = user_id or email
+            if not key:
+                continue
+
+            leave_time = participant.get("leave_time")
+            end = _as_utc(leave_time) if isinstance(leave_time, datetime) else now
+            attended = max(0.0, (end - _as_utc(join_time)).total_seconds() / 60)
+
+            attendee = attendees.setdefault(str(key), {
+                "userId": str(user_id) if user_id else None, "email": email, "minutes": 0.0
+            })
+            attendee["email"] = attendee["email"] or email
+            attendee["minutes"] += attended
+        return list(attendees.values())
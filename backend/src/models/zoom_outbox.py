@@ -0,0 +1,225 @@
+from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument
+from ..database.connection import get_database
+from ..database.indexes import IndexSpec, ASCENDING, DESCENDING
+
+
+# Delivered and dead jobs are kept this long for inspection, then removed
+FINISHED_JOB_TTL_SECONDS = 14 * 24 * 3600
+
+INDEXES = [
+    IndexSpec(collection="zoom_outbox", keys=[("status", ASCENDING), ("nextAttemptAt", ASCENDING)]),
+    IndexSpec(collection="zoom_outbox", keys=[("meetingId", ASCENDING), ("createdAt", ASCENDING)]),
+    IndexSpec(collection="zoom_outbox", keys=[("sessionId", ASCENDING), ("createdAt", DESCENDING)]),
+    # Unset until a job is delivered or dead-lettered, so unfinished jobs never expire
+    IndexSpec(
+        collection="zoom_outbox",
+        keys=[("finishedAt", ASCENDING)],
+        expireAfterSeconds=FINISHED_JOB_TTL_SECONDS,
+    ),
+]
+
+# pending -> sending -> delivered, or back to pending with a later
+# nextAttemptAt on failure, or dead once the attempts are used up. A send
+# whose outcome is unknown (it may have been posted) ends in unknown
+# rather than being sent again
+UNFINISHED_STATUSES = ["pending", "sending"]
+
+
+def _leased_by(job: dict) -> dict:
+    # attempts goes up with every claim, so it tells this claim from a later one
+    return {"_id": ObjectId(job["id"]), "status": "sending", "attempts": job["attempts"]}
+
+
+def _serialize(job: dict) -> dict:
+    job["id"] = str(job["_id"])
+    del job["_id"]
+    return job
+
+
+class ZoomOutboxModel:
+    """Durable queue of Zoom chat messages waiting to be delivered"""
+
+    @staticmethod
+    async def enqueue(meeting_id: str, payload: Dict[str, Any], session_id: Optional[str] = None) -> dict:
+        """Add a message job; the outbox worker picks it up"""
+        database = get_database()
+        if database is None:
+            raise Exception("Database not connected")
+
+        now = datetime.now()
+        job = {
+            "meetingId": meeting_id,
+            "sessionId": session_id,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "nextAttemptAt": now,
+            "lockedUntil": None,
+            "lastError": None,
+            "createdAt": now,
+            "updatedAt": now,
+            "deliveredAt": None,
+            "finishedAt": None,
+        }
+        result = await database.zoom_outbox.insert_one(job)
+        job["_id"] = result.inserted_id
+        return _serialize(job)
+
+    @staticmethod
+    async def claim(lease: timedelta, skip_meetings: List[str] = ()) -> Optional[dict]:
+        """
+        Take the oldest due job, leasing it for ``lease``.
+
+        Jobs left in ``sending`` by a crashed worker become claimable again
+        once their lease runs out. Meetings the caller is already sending
+        to are skipped.
+        """
+        database = get_database()
+        if database is None:
+            return None
+
+        now = datetime.now()
+        query = {
+            "$or": [
+                {"status": "pending", "nextAttemptAt": {"$lte": now}},
+                {"status": "sending", "lockedUntil": {"$lt": now}},
+            ]
+        }
+        if skip_meetings:
+            query["meetingId"] = {"$nin": list(skip_meetings)}
+
+        job = await database.zoom_outbox.find_one_and_update(
+            query,
+            {
+                "$set": {"status": "sending", "lockedUntil": now + lease, "updatedAt": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("createdAt", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+        return _serialize(job) if job else None
+
+    @staticmethod
+    async def extend_lease(job: dict, lease: timedelta) -> bool:
+        """Push a claimed job's lease out while it is still being sent; False if it was reclaimed"""
+        database = get_database()
+        if database is None:
+            return False
+
+        now = datetime.now()
+        result = await database.zoom_outbox.update_one(
+            _leased_by(job),
+            {"$set": {"lockedUntil": now + lease, "updatedAt": now}}
+        )
+        return result.modified_count > 0
+
+    @staticmethod
+    async def has_earlier_unfinished(job: dict) -> bool:
+        """Whether an older job for the same meeting still has to go first"""
+        database = get_database()
+        if database is None:
+            return False
+
+        earlier = await database.zoom_outbox.find_one(
+            {
+                "meetingId": job["meetingId"],
+                "createdAt": {"$lt": job["createdAt"]},
+                "status": {"$in": UNFINISHED_STATUSES},
+            },
+            {"_id": 1}
+        )
+        return earlier is not None
+
+    @staticmethod
+    async def release(job: dict, retry_at: datetime) -> None:
+        """Put a claimed job back without counting the attempt"""
+        database = get_database()
+        if database is None:
+            return
+
+        await database.zoom_outbox.update_one(
+            _leased_by(job),
+            {
+                "$set": {"status": "pending", "nextAttemptAt": retry_at, "lockedUntil": None, "updatedAt": datetime.now()},
+                "$inc": {"attempts": -1},
+            }
+        )
+
+    @staticmethod
+    async def mark_delivered(job: dict) -> bool:
+        """Record a delivery; False if the job's lease had already passed to another claim"""
+        database = get_database()
+        if database is None:
+            return False
+
+        now = datetime.now()
+        result = await database.zoom_outbox.update_one(
+            _leased_by(job),
+            {"$set": {
+                "status": "delivered",
+                "deliveredAt": now,
+                "finishedAt": now,
+                "lockedUntil": None,
+                "lastError": None,
+                "updatedAt": now,
+            }}
+        )
+        return result.modified_count > 0
+
+    @staticmethod
+    async def mark_failed(job: dict, error: str, retry_at: Optional[datetime]) -> bool:
+        """
+        Schedule a retry, or dead-letter the job when ``retry_at`` is None.
+        False if the job's lease had already passed to another claim.
+        """
+        database = get_database()
+        if database is None:
+            return False
+
+        update = {"lastError": error, "lockedUntil": None, "updatedAt": datetime.now()}
+        if retry_at is None:
+            update["status"] = "dead"
+            update["finishedAt"] = update["updatedAt"]
+        else:
+            update["status"] = "pending"
+            update["nextAttemptAt"] = retry_at
+        result = await database.zoom_outbox.update_one(_leased_by(job), {"$set": update})
+        return result.modified_count > 0
+
+    @staticmethod
+    async def mark_unknown(job: dict, error: str) -> bool:
+        """
+        Park a job whose message may have been posted; it is not sent again.
+        False if the job's lease had already passed to another claim.
+        """
+        database = get_database()
+        if database is None:
+            return False
+
+        now = datetime.now()
+        result = await database.zoom_outbox.update_one(
+            _leased_by(job),
+            {"$set": {
+                "status": "unknown",
+                "lastError": error,
+                "lockedUntil": None,
+                "finishedAt": now,
+                "updatedAt": now,
+            }}
+        )
+        return result.modified_count > 0
+
+    @staticmethod
+    async def find_by_session(session_id: str) -> List[dict]:
+        """Message jobs of a live question session, newest first"""
+        database = get_database()
+        if database is None:
+            return []
+
+        jobs = []
+        async for job in database.zoom_outbox.find({"sessionId": session_id}).sort("createdAt", -1):
+            jobs.append(_serialize(job))
+        return jobs
@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from pydantic import BaseModel
 from ..services.clustering_service import ClusteringService
@@ -14,6 +14,15 @@ class UpdateClustersRequest(BaseModel):
     quizPerformance: Optional[Dict] = None
 
 
+class StudentClustersRequest(BaseModel):
+    sessionId: str
+    studentIds: List[str]
+
+
+# Upper bound on the roster size resolved by one batch request
+MAX_ROSTER_SIZE = 5000
+
+
 @router.get("/session/{session_id}")
 async def get_clusters(
     session_id: str,
@@ -99,3 +108,36 @@ async def get_student_cluster(
             detail="Internal server error"
         )
 
+
+
+@router.post("/students")
+async def get_student_clusters(
+    request_data: StudentClustersRequest,
+    user: dict = Depends(get_current_user)
+):
+    """Get cluster assignments for a whole roster in one call"""
+    try:
+        if not request_data.sessionId:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Missing sessionId"
+            )
+        if len(request_data.studentIds) > MAX_ROSTER_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {MAX_ROSTER_SIZE} students per request"
+            )
+
+        clusters = await clustering_service.get_student_clusters(
+            request_data.studentIds, request_data.sessionId
+        )
+
+        return {"clusters": clusters}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting student clusters: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
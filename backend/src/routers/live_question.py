@@ -1,18 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
 from ..models.live_question_session import LiveQuestionSessionModel
-from ..models.question_response import QuestionResponseModel
-from ..models.question import Question
+from ..models.question_response import QuestionResponseModel, student_key
 from ..middleware.auth import get_current_user, require_instructor
 from ..services.zoom_chat_service import ZoomChatService
-import random
+from ..services.question_bank_cache import QuestionBankCache
+from ..services.clustering_service import ClusteringService
+from ..services.live_session_cache import LiveSessionCache
+from ..services.response_pipeline import ResponseSubmissionPipeline
+from ..services.dashboard_stream import DashboardStream
+from ..services.session_expiry import SessionExpiryScheduler
+from ..services.zoom_outbox_worker import ZoomOutboxWorker
+from ..models.zoom_outbox import ZoomOutboxModel
 import os
 
 
 router = APIRouter(prefix="/api/live-questions", tags=["live-questions"])
 zoom_chat_service = ZoomChatService()
+question_bank = QuestionBankCache()
+clustering_service = ClusteringService()
+live_session_cache = LiveSessionCache()
+response_pipeline = ResponseSubmissionPipeline()
+dashboard_stream = DashboardStream()
+session_expiry = SessionExpiryScheduler()
+zoom_outbox = ZoomOutboxWorker()
+
+# Upper bound on how long browsers/CDNs may reuse a question payload
+SESSION_MAX_AGE = int(os.getenv("LIVE_SESSION_MAX_AGE_SECONDS", "5"))
 
 
 class TriggerQuestionRequest(BaseModel):
@@ -46,7 +63,7 @@ async def trigger_question(
     try:
         # Get the question
         if request_data.questionId:
-            question = await Question.find_by_id(request_data.questionId)
+            question = await question_bank.get_by_id(request_data.questionId)
             if not question:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -54,13 +71,12 @@ async def trigger_question(
                 )
         else:
             # Pick random question
-            questions = await Question.find_all()
-            if not questions:
+            question = await question_bank.random_question()
+            if not question:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="No questions available"
                 )
-            question = random.choice(questions)
         
         # Calculate expiry time
         time_limit = request_data.timeLimit or 30
@@ -84,20 +100,28 @@ async def trigger_question(
         }
         
         session = await LiveQuestionSessionModel.create(session_data)
+        live_session_cache.prime(session)
+        session_expiry.schedule(session["id"], session["expiresAt"])
         
         # Generate URL
         base_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
         question_url = f"{base_url}/question/{session['sessionToken']}"
         
-        # Send to Zoom chat if requested
-        zoom_sent = False
+        # Queue the Zoom chat message; the outbox worker delivers it
+        zoom_message = None
         if request_data.sendToZoom:
-            zoom_sent = zoom_chat_service.send_question_link(
-                meeting_id=request_data.zoomMeetingId,
-                question_text=question["question"],
-                question_url=question_url,
-                time_limit=time_limit
-            )
+            try:
+                job = await zoom_outbox.enqueue_question_link(
+                    meeting_id=request_data.zoomMeetingId,
+                    session_id=session["id"],
+                    question_text=question["question"],
+                    question_url=question_url,
+                    time_limit=time_limit
+                )
+                zoom_message = {"id": job["id"], "status": job["status"]}
+            except Exception as e:
+                print(f"❌ Error queueing Zoom message: {e}")
+                zoom_message = {"id": None, "status": "failed"}
         
         # Convert datetime objects for response
         if "triggeredAt" in session and hasattr(session["triggeredAt"], "isoformat"):
@@ -114,7 +138,7 @@ async def trigger_question(
             "message": "Question triggered successfully",
             "session": session,
             "questionUrl": question_url,
-            "zoomMessageSent": zoom_sent
+            "zoomMessage": zoom_message
         }
     
     except HTTPException:
@@ -130,52 +154,51 @@ async def trigger_question(
 
 
 @router.get("/session/{token}")
-async def get_question_by_token(token: str):
+async def get_question_by_token(token: str, request: Request, response: Response):
     """
     Get question details by session token (for students)
     - Public endpoint (no auth required)
     - Students click link from Zoom chat
+    - Served from the token cache; supports If-None-Match
     """
     try:
-        session = await LiveQuestionSessionModel.find_by_token(token)
+        cached = await live_session_cache.get(token)
         
-        if not session:
+        if not cached:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Question session not found"
             )
         
         # Check if session is still active
-        if session["status"] != "active":
+        if cached.status != "active":
             raise HTTPException(
                 status_code=status.HTTP_410_GONE,
-                detail=f"This question session has {session['status']}"
+                detail=f"This question session has {cached.status}"
             )
         
         # Check if expired
-        expires_at = session.get("expiresAt")
-        if expires_at and isinstance(expires_at, datetime) and expires_at < datetime.now():
-            # Mark as expired
-            await LiveQuestionSessionModel.update(session["id"], {"status": "expired"})
+        if cached.is_expired():
+            # Normally done by the expiry scheduler already; later hits
+            # are answered from the cache
+            await session_expiry.expire([cached.session_id])
             raise HTTPException(
                 status_code=status.HTTP_410_GONE,
                 detail="This question session has expired"
             )
         
-        # Return question without correct answer
-        response_data = {
-            "sessionToken": session["sessionToken"],
-            "sessionId": session["id"],
-            "question": session["question"],
-            "options": session["options"],
-            "timeLimit": session["timeLimit"],
-            "triggeredAt": session["triggeredAt"].isoformat() if hasattr(session.get("triggeredAt"), "isoformat") else session.get("triggeredAt"),
-            "expiresAt": session["expiresAt"].isoformat() if hasattr(session.get("expiresAt"), "isoformat") else session.get("expiresAt")
+        headers = {
+            "ETag": cached.etag,
+            "Cache-Control": f"public, max-age={min(SESSION_MAX_AGE, cached.seconds_left())}",
         }
+        if request.headers.get("if-none-match") == cached.etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
         
+        # Return question without correct answer
         return {
             "success": True,
-            "question": response_data
+            "question": cached.payload
         }
     
     except HTTPException:
@@ -202,45 +225,36 @@ async def submit_answer(
     - Prevents duplicate submissions
     """
     try:
-        # Get session
-        session = await LiveQuestionSessionModel.find_by_token(token)
+        # Get session (shared with the question page cache); the status is
+        # re-read, it may have been completed in another worker
+        cached = await live_session_cache.get(token, fresh_status=True)
         
-        if not session:
+        if not cached:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Question session not found"
             )
+        session = cached.session
         
         # Check if session is still active
-        if session["status"] != "active":
+        if cached.status != "active":
             raise HTTPException(
                 status_code=status.HTTP_410_GONE,
-                detail=f"This question session is {session['status']}"
+                detail=f"This question session is {cached.status}"
             )
         
-        # Check for duplicate submission
-        student_identifier = (
-            answer_data.studentId or 
-            answer_data.studentEmail or 
-            answer_data.studentName or 
-            request.client.host
-        )
-        
-        existing_response = await QuestionResponseModel.find_by_student_and_session(
-            student_identifier,
-            session["id"]
-        )
-        
-        if existing_response:
+        if cached.is_expired():
+            await session_expiry.expire([cached.session_id])
             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="You have already submitted an answer to this question"
+                status_code=status.HTTP_410_GONE,
+                detail="This question session has expired"
             )
         
         # Check if answer is correct
         is_correct = answer_data.selectedAnswer == session["correctAnswer"]
         
-        # Create response record
+        # Create response record; the studentKey unique index rejects
+        # duplicate submissions
         response_data = {
             "sessionId": session["id"],
             "sessionToken": token,
@@ -248,6 +262,10 @@ async def submit_answer(
             "studentId": answer_data.studentId,
             "studentName": answer_data.studentName or "Anonymous",
             "studentEmail": answer_data.studentEmail,
+            "studentKey": (
+                student_key(answer_data.studentId, answer_data.studentEmail, None, answer_data.studentName)
+                or f"ip:{request.client.host}"
+            ),
             "selectedAnswer": answer_data.selectedAnswer,
             "isCorrect": is_correct,
             "responseTime": answer_data.responseTime,
@@ -255,14 +273,23 @@ async def submit_answer(
             "ipAddress": request.client.host
         }
         
-        response = await QuestionResponseModel.create(response_data)
+        response = await response_pipeline.submit(response_data)
         
-        # Update session stats
-        await LiveQuestionSessionModel.add_response(
-            session["id"],
-            response["id"],
-            is_correct
-        )
+        if response is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="You have already submitted an answer to this question"
+            )
+        
+        # Live questions feed the engagement clusters of their Zoom meeting
+        if session.get("zoomMeetingId"):
+            clustering_service.record_answer(
+                session["zoomMeetingId"],
+                answer_data.studentId or answer_data.studentEmail or response_data["studentName"],
+                is_correct,
+                answer_data.responseTime,
+                answer_id=response.get("id")
+            )
         
         # Convert datetime for response
         if "submittedAt" in response and hasattr(response["submittedAt"], "isoformat"):
@@ -376,6 +403,97 @@ async def get_session_responses(
         )
 
 
+@router.get("/dashboard/session/{session_id}/stream")
+async def stream_session_responses(
+    session_id: str,
+    request: Request,
+    lastEventId: Optional[str] = None,
+    current_user: dict = Depends(require_instructor)
+):
+    """
+    Server-Sent Events stream of a session's responses and statistics.
+
+    Starts with a ``snapshot`` event, then sends coalesced ``responses`` and
+    ``stats`` events, and closes after the ``final`` event. Reconnects resume from the ``Last-Event-ID`` header (or
+    the ``lastEventId`` query parameter for clients that cannot set headers).
+    """
+    try:
+        session = await LiveQuestionSessionModel.find_by_id(session_id)
+
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found"
+            )
+
+        if session["instructorId"] != current_user["id"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only view your own sessions"
+            )
+
+        last_event_id = request.headers.get("last-event-id") or lastEventId
+        return StreamingResponse(
+            dashboard_stream.subscribe(session, last_event_id),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error opening session stream: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to open response stream"
+        )
+
+
+@router.get("/dashboard/session/{session_id}/zoom-messages")
+async def get_session_zoom_messages(
+    session_id: str,
+    current_user: dict = Depends(require_instructor)
+):
+    """Delivery status of the Zoom chat messages queued for a session"""
+    try:
+        session = await LiveQuestionSessionModel.find_by_id(session_id)
+
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found"
+            )
+
+        if session["instructorId"] != current_user["id"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only view your own sessions"
+            )
+
+        messages = []
+        for job in await ZoomOutboxModel.find_by_session(session_id):
+            messages.append({
+                "id": job["id"],
+                "status": job["status"],
+                "attempts": job["attempts"],
+                "lastError": job.get("lastError"),
+                "createdAt": job["createdAt"].isoformat(),
+                "deliveredAt": job["deliveredAt"].isoformat() if job.get("deliveredAt") else None,
+            })
+
+        return {
+            "success": True,
+            "messages": messages
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting Zoom message status: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get Zoom message status"
+        )
+
+
 @router.post("/dashboard/session/{session_id}/complete")
 async def complete_session(
     session_id: str,
@@ -399,12 +517,15 @@ async def complete_session(
             )
         
         success = await LiveQuestionSessionModel.complete_session(session_id)
+        live_session_cache.invalidate_session(session_id)
+        session_expiry.cancel(session_id)
         
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to complete session"
             )
+        await dashboard_stream.publish_final(session_id, "completed")
         
         return {
             "success": True,
@@ -457,7 +578,7 @@ async def get_meeting_sessions(
 async def test_zoom_connection(current_user: dict = Depends(require_instructor)):
     """Test Zoom API connection"""
     try:
-        result = zoom_chat_service.test_connection()
+        result = await zoom_chat_service.test_connection()
         return result
     except Exception as e:
         return {
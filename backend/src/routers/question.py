@@ -4,9 +4,11 @@ from pydantic import BaseModel
 from datetime import datetime
 from ..models.question import Question
 from ..middleware.auth import get_current_user, require_instructor
+from ..services.question_bank_cache import QuestionBankCache
 
 
 router = APIRouter(prefix="/api/questions", tags=["questions"])
+question_bank = QuestionBankCache()
 
 
 class QuestionOption(BaseModel):
@@ -44,6 +46,7 @@ async def create_question(
         question_dict["createdAt"] = datetime.now().isoformat()
         
         created_question = await Question.create(question_dict)
+        question_bank.invalidate()
         
         # Convert to response format
         response = QuestionResponse(
@@ -73,7 +76,7 @@ async def get_all_questions(
 ):
     """Get all questions"""
     try:
-        questions = await Question.find_all()
+        questions = await question_bank.get_all()
         
         # Convert to response format
         response = []
@@ -106,7 +109,7 @@ async def get_question_by_id(
 ):
     """Get a specific question by ID"""
     try:
-        question = await Question.find_by_id(question_id)
+        question = await question_bank.get_by_id(question_id)
         
         if not question:
             raise HTTPException(
@@ -145,6 +148,7 @@ async def update_question(
     try:
         update_dict = question_data.dict()
         updated_question = await Question.update(question_id, update_dict)
+        question_bank.invalidate()
         
         if not updated_question:
             raise HTTPException(
@@ -181,6 +185,7 @@ async def delete_question(
     """Delete a question (instructor only)"""
     try:
         success = await Question.delete(question_id)
+        question_bank.invalidate()
         
         if not success:
             raise HTTPException(
@@ -1,123 +1,103 @@
-from fastapi import APIRouter, Request, Header, HTTPException
-import hmac, hashlib, base64, os, json
-from datetime import datetime
-from src.database.connection import get_database
+from fastapi import APIRouter, Depends, Request, HTTPException, status
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import json
+from src.middleware.auth import require_instructor
+from src.services.webhook_queue import WebhookIngestQueue
+from src.services.event_archive import EventArchive
+from src.services.webhook_ingest import WebhookIngestCore
+from src.models.attendance_summary import AttendanceSummaryModel
 
 router = APIRouter(prefix="/api/zoom", tags=["Zoom Webhook"])
+webhook_queue = WebhookIngestQueue()
+ingest = WebhookIngestCore(webhook_queue)
 
-
-def compute_signature(secret: str, timestamp: str, body: bytes):
-    message = f"v0:{timestamp}:{body.decode()}"
-    hash_ = hmac.new(secret.encode(), message.encode(), hashlib.sha256).hexdigest()
-    return f"v0={hash_}"
+MAX_REPLAY_WINDOW = timedelta(days=7)
 
 
 @router.post("/events")
-async def zoom_events(
-    request: Request,
-    zoom_signature: str = Header(None, alias="x-zoom-signature"),
-    zoom_timestamp: str = Header(None, alias="x-zoom-request-timestamp")
+@router.post("/webhook")
+async def zoom_events(request: Request):
+    """
+    Zoom webhook deliveries. ``/webhook`` is the path the Lambda relay and
+    the Flask backend use; both go through the same ingestion core.
+    """
+    result = ingest.receive(await request.body(), request.headers)
+    if result.status_code >= 400:
+        raise HTTPException(status_code=result.status_code, detail=result.body.get("error"))
+    return result.body
+
+
+@router.get("/webhook-queue")
+async def webhook_queue_metrics(current_user: dict = Depends(require_instructor)):
+    """Backpressure metrics of the webhook ingestion queue"""
+    return {"success": True, "metrics": webhook_queue.metrics()}
+
+
+@router.get("/meetings/{meeting_id}/attendance")
+async def meeting_attendance(meeting_id: str, current_user: dict = Depends(require_instructor)):
+    """Attendance summary per participant: total seconds, intervals, first and last seen"""
+    try:
+        summaries = await AttendanceSummaryModel.find_by_meeting(meeting_id)
+        return {"success": True, "meetingId": meeting_id, "participants": summaries}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error loading attendance: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load attendance: {str(e)}"
+        )
+
+
+@router.get("/archive/record")
+async def archived_event(
+    segment: str,
+    block: int,
+    index: int,
+    current_user: dict = Depends(require_instructor)
 ):
-
-    raw = await request.body()
-    data = json.loads(raw.decode())
-
-    event = data.get("event")
-    payload = data.get("payload", {})
-    obj = payload.get("object", {})
-    participant = obj.get("participant", {})
-
-    db = get_database()
-
-    # URL VALIDATION
-    if event == "endpoint.url_validation":
-        plain = payload["plainToken"]
-        secret = os.getenv("ZOOM_WEBHOOK_SECRET", "")
-        hashed = hmac.new(secret.encode(), plain.encode(), hashlib.sha256).digest()
-        encrypted = base64.b64encode(hashed).decode()
-        return {"plainToken": plain, "encryptedToken": encrypted}
-
-    # SIGNATURE VALIDATION
-    if zoom_signature:
-        secret = os.getenv("ZOOM_WEBHOOK_SECRET", "")
-        expected = compute_signature(secret, zoom_timestamp, raw)
-        if not hmac.compare_digest(expected, zoom_signature):
-            raise HTTPException(status_code=401, detail="Invalid signature")
-
-    # COMMON MAPPED FIELDS (base document)
-    base_doc = {
-        "zoom_meeting_id": obj.get("id"),
-        "meeting_topic": obj.get("topic"),
-        "meeting_uuid": obj.get("uuid"),
-
-        "user_id": participant.get("user_id") or participant.get("id"),
-        "user_name": participant.get("user_name") or participant.get("name"),
-        "email": participant.get("email"),
-
-        "participant_user_id": participant.get("participant_user_id"),
-        "participant_uuid": participant.get("participant_uuid"),
-
-        "public_ip": participant.get("ip_address"),
-        "private_ip": participant.get("private_ip_address"),
-
-        "raw_participant_data": participant,  # Store everything
-
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
-    }
-
-    # -----------------------------
-    #  EVENT: PARTICIPANT JOINED
-    # -----------------------------
-    if event == "meeting.participant_joined":
-
-        doc = {
-            **base_doc,
-            "status": "joined",
-            "join_time": participant.get("join_time"),
-            "event": "joined"
-        }
-
-        await db.participation.insert_one(doc)
-        print("✔ JOIN DATA STORED:", doc)
-        return {"status": "ok", "event": "joined"}
-
-
-    # -----------------------------
-    #  EVENT: PARTICIPANT LEFT
-    # -----------------------------
-    if event == "meeting.participant_left":
-
-        doc = {
-            **base_doc,
-            "status": "left",
-            "leave_time": participant.get("leave_time"),
-            "leave_reason": participant.get("leave_reason"),
-            "event": "left"
-        }
-
-        await db.participation.insert_one(doc)
-        print("✔ LEAVE DATA STORED:", doc)
-        return {"status": "ok", "event": "left"}
-
-
-    # -----------------------------
-    #  EVENT: MEETING ENDED
-    # -----------------------------
-    if event == "meeting.ended":
-
-        doc = {
-            "zoom_meeting_id": obj.get("id"),
-            "meeting_topic": obj.get("topic"),
-            "meeting_uuid": obj.get("uuid"),
-            "duration": obj.get("duration"),
-            "timezone": obj.get("timezone"),
-            "event": "meeting_ended",
-            "created_at": datetime.utcnow(),
-        }
-
-        await db.participation.insert_one(doc)
-        print("✔ MEETING ENDED STORED:", doc)
-        return {"status": "ok", "event": "meeting_ended"}
-
-    return {"status": "ignored", "event": event}
+    """Raw webhook event behind a document's ``raw_ref`` pointer"""
+    try:
+        record = await EventArchive().lookup({"segment": segment, "block": block, "index": index})
+        if record is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Archived event not found"
+            )
+        return {"success": True, "record": record}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error reading archived event: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to read archived event: {str(e)}"
+        )
+
+
+@router.get("/archive/replay")
+async def replay_archived_events(
+    start: datetime,
+    end: datetime,
+    event: Optional[str] = None,
+    meetingId: Optional[str] = None,
+    current_user: dict = Depends(require_instructor)
+):
+    """
+    Archived webhook events received between ``start`` and ``end`` as
+    newline-delimited JSON, oldest first. Times without an offset are UTC.
+    """
+    start, end = (value if value.tzinfo else value.replace(tzinfo=timezone.utc) for value in (start, end))
+    if end < start or end - start > MAX_REPLAY_WINDOW:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Replay window must be positive and at most {MAX_REPLAY_WINDOW.days} days"
+        )
+
+    async def lines():
+        async for record in EventArchive().replay(start, end, event, meetingId):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
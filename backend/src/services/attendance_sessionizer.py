@@ -0,0 +1,99 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+from datetime import datetime, timezone
+import asyncio
+from ..models.attendance_summary import AttendanceSummaryModel
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """MongoDB hands datetimes back naive in UTC; compare like with like"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class AttendanceSessionizer:
+    """
+    Pairs participant joins and leaves into attendance intervals as they
+    arrive and keeps ``attendance_summary`` up to date, so minutes attended
+    per participant is a single read.
+
+    - a join opens an interval; a join while one is open (a reconnect
+      without a leave) closes it at the new join and opens the next
+    - a leave closes the open interval; a leave without one (join missed)
+      only records when the participant was seen
+    - ``meeting.ended`` closes every interval still open in the meeting
+
+    Updates for one participant are applied in the order ``join``/``leave``
+    were called, even when the callers run concurrently: each call is
+    chained behind the previous one for the same participant.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AttendanceSessionizer, cls).__new__(cls)
+            cls._instance._tails = {}
+        return cls._instance
+
+    def join(
+        self,
+        meeting_id: Union[str, int],
+        participant_key: str,
+        identity: Dict[str, Any],
+        at: datetime
+    ) -> asyncio.Task:
+        """Record a join; returns a task to await for the outcome"""
+        return self._chain((meeting_id, participant_key), lambda: self._join(
+            meeting_id, participant_key, identity, _naive_utc(at)
+        ))
+
+    def leave(
+        self,
+        meeting_id: Union[str, int],
+        participant_key: str,
+        identity: Dict[str, Any],
+        at: datetime
+    ) -> asyncio.Task:
+        """Record a leave; returns a task to await for the outcome"""
+        return self._chain((meeting_id, participant_key), lambda: self._leave(
+            meeting_id, participant_key, identity, _naive_utc(at)
+        ))
+
+    async def meeting_ended(self, meeting_id: Union[str, int], at: datetime) -> int:
+        """Close the intervals still open when the meeting ended; returns how many"""
+        return await AttendanceSummaryModel.close_meeting(meeting_id, _naive_utc(at))
+
+    def _chain(self, key: Tuple[Any, str], update: Callable[[], Awaitable[None]]) -> asyncio.Task:
+        previous = self._tails.get(key)
+        task = asyncio.create_task(self._after(previous, update))
+        self._tails[key] = task
+
+        def forget(done: asyncio.Task) -> None:
+            if self._tails.get(key) is done:
+                del self._tails[key]
+
+        task.add_done_callback(forget)
+        return task
+
+    @staticmethod
+    async def _after(previous: Optional[asyncio.Task], update: Callable[[], Awaitable[None]]) -> None:
+        if previous is not None:
+            # Its outcome belongs to its own caller
+            await asyncio.gather(previous, return_exceptions=True)
+        await update()
+
+    async def _join(self, meeting_id, participant_key: str, identity: Dict[str, Any], at: datetime) -> None:
+        open_since = await AttendanceSummaryModel.open_interval(meeting_id, participant_key, identity, at)
+        if open_since is not None:
+            await AttendanceSummaryModel.add_interval(
+                meeting_id, participant_key, max(0.0, (at - open_since).total_seconds()), at
+            )
+
+    async def _leave(self, meeting_id, participant_key: str, identity: Dict[str, Any], at: datetime) -> None:
+        open_since = await AttendanceSummaryModel.close_interval(meeting_id, participant_key, at)
+        if open_since is None:
+            await AttendanceSummaryModel.record_presence(meeting_id, participant_key, identity, at)
+        else:
+            await AttendanceSummaryModel.add_interval(
+                meeting_id, participant_key, max(0.0, (at - open_since).total_seconds()), at
+            )
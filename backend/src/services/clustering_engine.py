@@ -0,0 +1,243 @@
+"""
+Engagement clustering engine.
+
+Builds a per-student feature matrix and groups students with vectorized
+k-means (k-means++ initialisation, fixed seed so results are reproducible
+between recomputes). Pure NumPy; no database access happens here.
+"""
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+# Column order of the feature matrix
+FEATURES = ("accuracy", "medianResponseTime", "answerRate", "attendanceMinutes")
+
+# Weight of each standardized feature in the engagement score used to rank
+# clusters from most to least engaged (slower answers count against)
+ENGAGEMENT_WEIGHTS = np.array([1.0, -0.5, 1.0, 0.75])
+
+DEFAULT_SEED = 42
+
+
+class ClusteringResult:
+    """Outcome of one clustering pass"""
+
+    def __init__(
+        self,
+        student_ids: List[str],
+        features: np.ndarray,
+        mean: np.ndarray,
+        scale: np.ndarray,
+        centroids: np.ndarray,
+        labels: np.ndarray,
+        ranking: List[int]
+    ):
+        self.student_ids = student_ids
+        self.features = features      # raw features, one row per student
+        self.mean = mean              # standardization parameters
+        self.scale = scale
+        self.centroids = centroids    # in standardized space
+        self.labels = labels          # centroid index per student
+        self.ranking = ranking        # centroid indices, most engaged first
+
+    def members_by_rank(self) -> List[List[str]]:
+        """Student IDs per cluster, most engaged cluster first"""
+        members: List[List[str]] = [[] for _ in self.ranking]
+        position = {centroid: rank for rank, centroid in enumerate(self.ranking)}
+        for student_id, label in zip(self.student_ids, self.labels):
+            members[position[int(label)]].append(student_id)
+        return members
+
+
+def build_feature_matrix(rows: Dict[str, Dict[str, float]]) -> Tuple[List[str], np.ndarray]:
+    """Turn ``{studentId: {feature: value}}`` into (ids, matrix) in FEATURES order"""
+    student_ids = sorted(rows)
+    matrix = np.array(
+        [[float(rows[sid].get(name) or 0.0) for name in FEATURES] for sid in student_ids],
+        dtype=np.float64
+    ).reshape(len(student_ids), len(FEATURES))
+    return student_ids, matrix
+
+
+def standardize(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Z-score each column; constant columns get scale 1"""
+    mean = matrix.mean(axis=0)
+    scale = matrix.std(axis=0)
+    scale[scale == 0] = 1.0
+    return (matrix - mean) / scale, mean, scale
+
+
+def squared_distances(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Pairwise squared Euclidean distances, shape (n_points, n_centroids)"""
+    distances = (
+        np.einsum("ij,ij->i", points, points)[:, None]
+        - 2.0 * points @ centroids.T
+        + np.einsum("ij,ij->i", centroids, centroids)[None, :]
+    )
+    return np.maximum(distances, 0.0)
+
+
+def kmeans_plus_plus(points: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++ seeding"""
+    n = points.shape[0]
+    centroids = np.empty((k, points.shape[1]), dtype=points.dtype)
+    centroids[0] = points[rng.integers(n)]
+    closest = squared_distances(points, centroids[:1]).ravel()
+
+    for i in range(1, k):
+        total = closest.sum()
+        if total == 0:
+            # Fewer distinct points than k; duplicate an existing centroid
+            centroids[i] = points[rng.integers(n)]
+        else:
+            centroids[i] = points[rng.choice(n, p=closest / total)]
+        closest = np.minimum(closest, squared_distances(points, centroids[i:i + 1]).ravel())
+    return centroids
+
+
+def kmeans(
+    points: np.ndarray,
+    k: int,
+    seed: int = DEFAULT_SEED,
+    max_iter: int = 100,
+    tol: float = 1e-6,
+    initial_centroids: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Lloyd's algorithm; returns (centroids, labels)"""
+    rng = np.random.default_rng(seed)
+    centroids = (
+        initial_centroids.astype(np.float64, copy=True)
+        if initial_centroids is not None
+        else kmeans_plus_plus(points, k, rng)
+    )
+    labels = np.zeros(points.shape[0], dtype=np.int64)
+
+    for _ in range(max_iter):
+        labels = squared_distances(points, centroids).argmin(axis=1)
+
+        counts = np.bincount(labels, minlength=k).astype(np.float64)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, points)
+
+        updated = centroids.copy()
+        non_empty = counts > 0
+        updated[non_empty] = sums[non_empty] / counts[non_empty, None]
+
+        # Re-seed empty clusters with the point farthest from its centroid
+        for empty in np.flatnonzero(~non_empty):
+            farthest = squared_distances(points, updated)[np.arange(len(points)), labels].argmax()
+            updated[empty] = points[farthest]
+
+        shift = np.abs(updated - centroids).max()
+        centroids = updated
+        if shift <= tol:
+            break
+
+    labels = squared_distances(points, centroids).argmin(axis=1)
+    return centroids, labels
+
+
+def rank_centroids(centroids: np.ndarray) -> List[int]:
+    """Centroid indices ordered from most to least engaged"""
+    scores = centroids @ ENGAGEMENT_WEIGHTS
+    return [int(i) for i in np.argsort(-scores, kind="stable")]
+
+
+def cluster_students(
+    rows: Dict[str, Dict[str, float]],
+    k: int = 3,
+    seed: int = DEFAULT_SEED
+) -> Optional[ClusteringResult]:
+    """Cluster students by engagement features; None if there are no students"""
+    student_ids, matrix = build_feature_matrix(rows)
+    if not student_ids:
+        return None
+
+    points, mean, scale = standardize(matrix)
+    centroids, labels = kmeans(points, min(k, len(student_ids)), seed=seed)
+    return ClusteringResult(
+        student_ids=student_ids,
+        features=matrix,
+        mean=mean,
+        scale=scale,
+        centroids=centroids,
+        labels=labels,
+        ranking=rank_centroids(centroids),
+    )
+
+
+class OnlineClusters:
+    """
+    Mini-batch k-means state for one session, seeded from a full pass.
+
+    Standardization parameters and the engagement ranking are frozen at the
+    full pass; between passes each batch of updated feature rows moves the
+    nearest centroids with a per-centroid learning rate of 1/count (Sculley's
+    mini-batch k-means) and only the students in the batch are reassigned.
+    Other students keep their labels until the next full recluster.
+    """
+
+    def __init__(self, result: ClusteringResult):
+        self.mean = result.mean
+        self.scale = result.scale
+        self.ranking = list(result.ranking)
+        self.centroids = result.centroids.copy()
+        self.counts = np.bincount(result.labels, minlength=len(self.centroids)).astype(np.float64)
+        self.student_ids = list(result.student_ids)
+        self.index = {student_id: i for i, student_id in enumerate(self.student_ids)}
+        self.features = result.features.copy()
+        self.labels = result.labels.copy()
+        self.updates = 0
+
+    def update(self, rows: Dict[str, Dict[str, float]]) -> Dict[str, Tuple[Optional[int], int]]:
+        """
+        Apply a mini-batch of updated feature rows.
+
+        Returns ``{studentId: (old_label, new_label)}`` for students whose
+        cluster changed (``old_label`` is None for students new to the session).
+        """
+        student_ids, matrix = build_feature_matrix(rows)
+        if not student_ids:
+            return {}
+
+        new_ids = [sid for sid in student_ids if sid not in self.index]
+        if new_ids:
+            for sid in new_ids:
+                self.index[sid] = len(self.student_ids)
+                self.student_ids.append(sid)
+            self.features = np.vstack([self.features, np.zeros((len(new_ids), len(FEATURES)))])
+            self.labels = np.concatenate([self.labels, np.full(len(new_ids), -1, dtype=np.int64)])
+
+        rows_index = np.array([self.index[sid] for sid in student_ids])
+        self.features[rows_index] = matrix
+        points = (matrix - self.mean) / self.scale
+
+        nearest = squared_distances(points, self.centroids).argmin(axis=1)
+        for point, label in zip(points, nearest):
+            self.counts[label] += 1
+            rate = 1.0 / self.counts[label]
+            self.centroids[label] = (1.0 - rate) * self.centroids[label] + rate * point
+
+        # Reassign the batch against the moved centroids
+        nearest = squared_distances(points, self.centroids).argmin(axis=1)
+        previous = self.labels[rows_index]
+        self.labels[rows_index] = nearest
+        self.updates += len(student_ids)
+
+        return {
+            sid: (None if old < 0 else int(old), int(new))
+            for sid, old, new in zip(student_ids, previous, nearest)
+            if old != new
+        }
+
+    def result(self) -> ClusteringResult:
+        """Current state as a ClusteringResult"""
+        return ClusteringResult(
+            student_ids=list(self.student_ids),
+            features=self.features,
+            mean=self.mean,
+            scale=self.scale,
+            centroids=self.centroids,
+            labels=self.labels,
+            ranking=self.ranking,
+        )
@@ -1,147 +1,426 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import os
+import time
+import numpy as np
 from ..models.cluster import StudentCluster
 from ..models.cluster_model import ClusterModel
+from ..models.live_question_session import LiveQuestionSessionModel
+from ..models.question_assignment_model import QuestionAssignmentModel
+from ..models.question_response import QuestionResponseModel
+from ..models.quiz_answer_model import QuizAnswerModel
+from ..models.zoom_attendance_model import ZoomAttendanceModel
+from .clustering_engine import FEATURES, ClusteringResult, OnlineClusters, cluster_students
+
+
+# Cluster presentation, most engaged first; k-means clusters are mapped onto
+# these by engagement rank
+CLUSTER_TEMPLATES = [
+    {
+        "id": "1",
+        "name": "Active Participants",
+        "description": "Highly engaged students",
+        "engagementLevel": "high",
+        "color": "#10b981",
+    },
+    {
+        "id": "2",
+        "name": "Moderate Participants",
+        "description": "Moderately engaged students",
+        "engagementLevel": "medium",
+        "color": "#f59e0b",
+    },
+    {
+        "id": "3",
+        "name": "At-Risk Students",
+        "description": "Low engagement, need support",
+        "engagementLevel": "low",
+        "color": "#ef4444",
+    },
+]
+
+
+# A full pass is repeated until the session has a student per cluster, and
+# again whenever the population has grown by this factor since the last one,
+# so the centroids and standardization come from a representative population
+REBUILD_GROWTH_FACTOR = 2
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"answered": 0, "correct": 0, "quizAnswered": 0, "times": [], "offered": 0, "attendanceMinutes": 0.0}
+
+
+class _SessionClusters:
+    """In-process online clustering state for one session"""
+
+    def __init__(self, totals: Dict[str, Dict[str, Any]], online: OnlineClusters, clusters: List[StudentCluster]):
+        self.totals = totals
+        self.online = online
+        self.clusters = clusters
+        self.baseline_counts = {c.engagementLevel: c.studentCount for c in clusters}
+        self.built_population = len(online.student_ids)
+        self.built_at = time.monotonic()
+        self.last_used = self.built_at
+        # Answers folded in online since the last full pass
+        self.dirty = False
+
+    def needs_full_pass(self) -> bool:
+        """Whether the online state is too young or too outgrown to keep updating"""
+        if self.built_population < len(CLUSTER_TEMPLATES):
+            return True
+        return len(self.online.student_ids) >= REBUILD_GROWTH_FACTOR * self.built_population
 
 
 class ClusteringService:
+    """
+    Student engagement clusters per session.
+
+    A full pass loads every student's features and runs k-means. After that
+    the session is kept in memory and answers are folded in online: the
+    submitting students' feature rows are updated, the centroids take a
+    mini-batch step and only students whose nearest centroid changed are
+    moved (in memory and with one bulk write to the membership lookup; the
+    stored snapshot is replaced by the next full pass).
+
+    Answer submissions only queue their answer. Each session has at most one
+    background worker, which applies the queued answers as mini-batches or
+    runs a full pass instead: when the session has no online state yet
+    (first answer, restart), while it has fewer students than clusters, and
+    once its population has grown by ``REBUILD_GROWTH_FACTOR`` since the
+    last full pass. Queued answers a full pass has already read are dropped
+    by id rather than applied twice. A timer started with the application reclusters
+    sessions that took answers and whose online state is older than
+    ``CLUSTER_FULL_RECLUSTER_SECONDS``, through the same worker, to correct
+    drift.
+    """
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(ClusteringService, cls).__new__(cls)
+            cls._instance._sessions = {}
+            cls._instance._pending = {}
+            cls._instance._rebuild = set()
+            cls._instance._workers = {}
+            cls._instance._timer = None
+            cls._instance.full_recluster_interval = float(
+                os.getenv("CLUSTER_FULL_RECLUSTER_SECONDS", "300")
+            )
         return cls._instance
 
+    def start(self) -> None:
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [task for task in [self._timer, *self._workers.values()] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._timer = None
+
     async def get_clusters(self, session_id: str) -> List[StudentCluster]:
-        """Get clusters from MongoDB or create default ones"""
+        """Get clusters from memory, MongoDB, or compute them from the session's data"""
+        state = self._sessions.get(session_id)
+        if state is not None:
+            state.last_used = time.monotonic()
+            return list(state.clusters)
+
         # Try to get clusters from database
         cluster_docs = await ClusterModel.find_by_session(session_id)
-        
+
         if len(cluster_docs) > 0:
             # Convert to StudentCluster objects
             return [StudentCluster(**doc) for doc in cluster_docs]
 
-        # Initialize default clusters if none exist
-        default_clusters = [
-            StudentCluster(
-                id="1",
-                name="Active Participants",
-                description="Highly engaged students",
-                studentCount=18,
-                engagementLevel="high",
-                color="#10b981",
-                prediction="stable",
-                students=[],
-            ),
-            StudentCluster(
-                id="2",
-                name="Moderate Participants",
-                description="Moderately engaged students",
-                studentCount=10,
-                engagementLevel="medium",
-                color="#f59e0b",
-                prediction="improving",
-                students=[],
-            ),
-            StudentCluster(
-                id="3",
-                name="At-Risk Students",
-                description="Low engagement, need support",
-                studentCount=4,
-                engagementLevel="low",
-                color="#ef4444",
-                prediction="declining",
-                students=[],
-            ),
-        ]
-
-        # Save default clusters to database
-        await ClusterModel.update_clusters_for_session(session_id, default_clusters)
-        return default_clusters
+        # First request for this session: cluster whatever data exists (empty
+        # clusters if nobody has answered or joined yet) and save the result
+        return await self._full_recluster(session_id)
 
     async def update_clusters(
         self,
         session_id: str,
-        quiz_performance: Optional[Dict] = None
+        quiz_performance: Optional[Dict] = None,
+        events: Optional[List[Dict[str, Any]]] = None
     ) -> List[StudentCluster]:
-        """Update clusters in MongoDB"""
-        clusters = await self.get_clusters(session_id)
+        """
+        Update the session's clusters and save the result.
 
-        if quiz_performance:
-            # Update clusters based on quiz performance
-            clusters = self._recalculate_clusters(clusters, quiz_performance)
-            # Save to database
-            await ClusterModel.update_clusters_for_session(session_id, clusters)
+        Without ``events`` the session is fully reclustered. With ``events``
+        (``studentId``, ``isCorrect``, ``responseTime`` per answer) they are
+        applied online as one mini-batch; if the session has no online state
+        yet a full pass runs instead, which already includes the stored answers.
 
-        return clusters
+        ``quiz_performance`` is accepted for API compatibility; clustering
+        works from the stored answers and attendance rather than a summary.
+        """
+        state = self._sessions.get(session_id)
+        if events and state is not None and not state.needs_full_pass():
+            return await self._apply_events(session_id, state, events)
+
+        return await self._full_recluster(session_id)
 
-    def _recalculate_clusters(
+    def record_answer(
         self,
-        current_clusters: List[StudentCluster],
-        quiz_performance: Dict
+        session_id: str,
+        student_id: Optional[str],
+        is_correct: bool,
+        response_time: float,
+        answer_id: Optional[str] = None
+    ) -> None:
+        """
+        Queue a new (already stored) answer for the session's clusters and
+        return at once.
+
+        The session's worker folds queued answers in as one mini-batch.
+        ``answer_id`` (the stored quiz answer or live response id) lets a
+        full pass that already read the answer drop it from the queue.
+        Failures are logged and never reach the answer submission.
+        """
+        if not student_id:
+            return
+
+        self._pending.setdefault(session_id, []).append({
+            "answerId": answer_id,
+            "studentId": student_id,
+            "isCorrect": bool(is_correct),
+            "responseTime": float(response_time or 0),
+        })
+        self._wake(session_id)
+
+    def _wake(self, session_id: str) -> None:
+        if session_id not in self._workers:
+            self._workers[session_id] = asyncio.create_task(self._work(session_id))
+
+    async def _work(self, session_id: str) -> None:
+        try:
+            while True:
+                batch = self._pending.pop(session_id, None)
+                rebuild = session_id in self._rebuild
+                if not batch and not rebuild:
+                    return
+                self._rebuild.discard(session_id)
+                try:
+                    state = self._sessions.get(session_id)
+                    if rebuild or state is None or state.needs_full_pass():
+                        # A full pass reads the stored answers, this batch included
+                        await self._full_recluster(session_id)
+                        if rebuild:
+                            print(f"✅ Reclustered session {session_id}")
+                    else:
+                        await self._apply_events(session_id, state, batch)
+                        if state.needs_full_pass():
+                            self._rebuild.add(session_id)
+                except Exception as e:
+                    print(f"❌ Error updating clusters for session {session_id}: {e}")
+        finally:
+            # Nothing is awaited between the empty check and here, so no answer is stranded
+            del self._workers[session_id]
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.full_recluster_interval / 4)
+            try:
+                now = time.monotonic()
+                for session_id, state in self._sessions.items():
+                    if state.dirty and now - state.built_at >= self.full_recluster_interval:
+                        self._rebuild.add(session_id)
+                        self._wake(session_id)
+                self._evict_idle()
+            except Exception as e:
+                print(f"❌ Cluster recluster timer error: {e}")
+
+    async def _full_recluster(self, session_id: str) -> List[StudentCluster]:
+        previous = [StudentCluster(**doc) for doc in await ClusterModel.find_by_session(session_id)]
+        # Answers queued so far are stored already, so the load below reads them
+        queued = self._pending.pop(session_id, [])
+        try:
+            totals, covered = await self._load_totals(session_id)
+        except Exception:
+            self._pending[session_id] = queued + self._pending.pop(session_id, [])
+            raise
+        # Of the answers queued during the load, keep those it did not read
+        late = [event for event in self._pending.pop(session_id, []) if event["answerId"] not in covered]
+        if late:
+            self._pending[session_id] = late
+
+        result = cluster_students(
+            {student_id: self._features(student) for student_id, student in totals.items()},
+            k=len(CLUSTER_TEMPLATES)
+        )
+        clusters = self._build_clusters(result, previous)
+        cluster_docs = await ClusterModel.update_clusters_for_session(session_id, clusters)
+        # Same ids as the stored documents (and the membership lookup)
+        for cluster, doc in zip(clusters, cluster_docs):
+            cluster.id = doc["id"]
+
+        if result is not None:
+            self._sessions[session_id] = _SessionClusters(totals, OnlineClusters(result), clusters)
+        else:
+            self._sessions.pop(session_id, None)
+        self._evict_idle()
+        return list(clusters)
+
+    def _evict_idle(self) -> None:
+        # Drop sessions nobody has read or answered in for a few recluster periods
+        cutoff = time.monotonic() - 4 * self.full_recluster_interval
+        for session_id in [sid for sid, state in self._sessions.items() if state.last_used < cutoff]:
+            del self._sessions[session_id]
+
+    async def _apply_events(
+        self,
+        session_id: str,
+        state: _SessionClusters,
+        events: List[Dict[str, Any]]
+    ) -> List[StudentCluster]:
+        state.last_used = time.monotonic()
+        state.dirty = True
+
+        rows: Dict[str, Dict[str, float]] = {}
+        for event in events:
+            student_id = event["studentId"]
+            totals = state.totals.setdefault(student_id, _empty_totals())
+            totals["answered"] += 1
+            totals["correct"] += 1 if event["isCorrect"] else 0
+            totals["times"].append(event["responseTime"])
+            # An answer implies the question was offered; live questions a
+            # student skipped are picked up by the next full pass
+            totals["offered"] = max(totals["offered"], totals["answered"])
+            rows[student_id] = self._features(totals)
+
+        changed = state.online.update(rows)
+        if not changed:
+            return list(state.clusters)
+
+        rank_of = {label: rank for rank, label in enumerate(state.online.ranking)}
+        moves = []
+        touched = set()
+        for student_id, (old_label, new_label) in changed.items():
+            old_rank = rank_of[old_label] if old_label is not None else None
+            new_rank = rank_of[new_label]
+            if old_rank is not None:
+                state.clusters[old_rank].students.remove(student_id)
+                touched.add(old_rank)
+            state.clusters[new_rank].students.append(student_id)
+            touched.add(new_rank)
+            moves.append((
+                student_id,
+                CLUSTER_TEMPLATES[old_rank]["engagementLevel"] if old_rank is not None else None,
+                CLUSTER_TEMPLATES[new_rank]["engagementLevel"],
+            ))
+
+        result = state.online.result()
+        for rank in touched:
+            cluster = state.clusters[rank]
+            cluster.studentCount = len(cluster.students)
+            cluster.prediction = self._predict(cluster.engagementLevel, state.baseline_counts, cluster.studentCount)
+            cluster.centroid = self._centroid_summary(result, rank)
+
+        # The stored snapshot catches up on the next full pass
+        await ClusterModel.move_students(session_id, moves)
+        return list(state.clusters)
+
+    async def _load_totals(self, session_id: str) -> Tuple[Dict[str, Dict[str, Any]], Set[str]]:
+        """
+        Raw engagement totals per student for a session, and the ids of the
+        answers they include.
+
+        Answers come from quiz_answers for the session and from the live
+        question sessions triggered in the Zoom meeting with the same id;
+        attendance comes from zoom_attendance.participants for that meeting.
+        """
+        quiz_summaries = await QuizAnswerModel.student_summaries(session_id)
+        assigned = await QuestionAssignmentModel.count_by_student(session_id)
+        live_sessions = await LiveQuestionSessionModel.find_by_meeting_id(session_id)
+        live_summaries = await QuestionResponseModel.student_summaries(
+            [live["id"] for live in live_sessions]
+        )
+        attendance = await ZoomAttendanceModel.attendance_minutes(session_id)
+
+        totals: Dict[str, Dict[str, Any]] = {}
+        covered: Set[str] = set()
+        for summary in quiz_summaries + live_summaries:
+            covered.update(summary["ids"])
+            student_id = summary.get("studentId")
+            if not student_id:
+                continue
+            student = totals.setdefault(student_id, _empty_totals())
+            student["answered"] += summary["answered"]
+            student["correct"] += summary["correct"]
+            student["times"].extend(float(t or 0) for t in summary["times"])
+        for summary in quiz_summaries:
+            if summary.get("studentId") in totals:
+                totals[summary["studentId"]]["quizAnswered"] += summary["answered"]
+
+        for student_id, student in totals.items():
+            # Questions offered: every live question in the meeting plus the
+            # quiz questions assigned to the student (or answered, for modes
+            # without per-student assignments)
+            student["offered"] = len(live_sessions) + max(assigned.get(student_id, 0), student["quizAnswered"])
+
+        # Students may be known by their Zoom user id or by their email;
+        # attendees who never answered get a row of their own
+        for attendee in attendance:
+            student_id = next(
+                (key for key in (attendee["userId"], attendee["email"]) if key and key in totals),
+                attendee["userId"] or attendee["email"]
+            )
+            student = totals.setdefault(student_id, _empty_totals())
+            student["attendanceMinutes"] += attendee["minutes"]
+        return totals, covered
+
+    @staticmethod
+    def _features(totals: Dict[str, Any]) -> Dict[str, float]:
+        """Feature row (in clustering_engine.FEATURES terms) from a student's totals"""
+        answered = totals["answered"]
+        return {
+            "accuracy": totals["correct"] / answered * 100 if answered else 0.0,
+            "medianResponseTime": float(np.median(totals["times"])) if totals["times"] else 0.0,
+            "answerRate": min(1.0, answered / totals["offered"]) if totals["offered"] else 0.0,
+            "attendanceMinutes": totals["attendanceMinutes"],
+        }
+
+    def _build_clusters(
+        self,
+        result: Optional[ClusteringResult],
+        previous: List[StudentCluster]
     ) -> List[StudentCluster]:
-        # Simple clustering algorithm based on quiz performance
-        # In a real implementation, this would consider:
-        # - Quiz performance
-        # - Response time
-        # - Engagement metrics
-        # - Historical data
-
-        performance = quiz_performance.get("correctPercentage", 0)
-
-        # Adjust cluster sizes based on performance
-        # High performance (>80%) -> more students in active cluster
-        # Low performance (<60%) -> more students in at-risk cluster
-
-        total_students = sum(c.studentCount for c in current_clusters)
-
-        if performance >= 80:
-            # High performance: shift students to active cluster
-            return [
-                StudentCluster(
-                    **current_clusters[0].model_dump(),
-                    studentCount=min(total_students, int(total_students * 0.6)),
-                    prediction="stable",
-                ),
-                StudentCluster(
-                    **current_clusters[1].model_dump(),
-                    studentCount=int(total_students * 0.3),
-                    prediction="improving",
-                ),
-                StudentCluster(
-                    **current_clusters[2].model_dump(),
-                    studentCount=max(
-                        0,
-                        total_students
-                        - int(total_students * 0.6)
-                        - int(total_students * 0.3)
-                    ),
-                    prediction="declining",
-                ),
-            ]
-        elif performance < 60:
-            # Low performance: shift students to at-risk cluster
-            return [
-                StudentCluster(
-                    **current_clusters[0].model_dump(),
-                    studentCount=int(total_students * 0.4),
-                    prediction="stable",
-                ),
-                StudentCluster(
-                    **current_clusters[1].model_dump(),
-                    studentCount=int(total_students * 0.3),
-                    prediction="declining",
-                ),
-                StudentCluster(
-                    **current_clusters[2].model_dump(),
-                    studentCount=total_students
-                    - int(total_students * 0.4)
-                    - int(total_students * 0.3),
-                    prediction="declining",
-                ),
-            ]
-
-        # Medium performance: keep current distribution
-        return current_clusters
+        members = result.members_by_rank() if result is not None else []
+        previous_counts = {c.engagementLevel: c.studentCount for c in previous}
+
+        clusters = []
+        for rank, template in enumerate(CLUSTER_TEMPLATES):
+            students = members[rank] if rank < len(members) else []
+            clusters.append(StudentCluster(
+                **template,
+                studentCount=len(students),
+                prediction=self._predict(template["engagementLevel"], previous_counts, len(students)),
+                students=students,
+                centroid=self._centroid_summary(result, rank) if students else None,
+            ))
+        return clusters
+
+    @staticmethod
+    def _centroid_summary(result: ClusteringResult, rank: int) -> Optional[Dict[str, float]]:
+        """Mean raw features of the members of the cluster at ``rank``"""
+        if rank >= len(result.ranking):
+            return None
+        members = result.features[result.labels == result.ranking[rank]]
+        if len(members) == 0:
+            return None
+        return {name: round(float(value), 3) for name, value in zip(FEATURES, members.mean(axis=0))}
+
+    @staticmethod
+    def _predict(level: str, previous_counts: Dict[str, int], count: int) -> str:
+        """Trend of a cluster compared with the previous clustering pass"""
+        before = previous_counts.get(level)
+        if before is None or before == count:
+            return "stable"
+        growing = count > before
+        # A growing at-risk cluster is a decline; growing engaged clusters improve
+        if level == "low":
+            return "declining" if growing else "improving"
+        return "improving" if growing else "declining"
 
     async def get_student_cluster(
         self, student_id: str, session_id: str
@@ -150,3 +429,8 @@ class ClusteringService:
         cluster_id = await ClusterModel.find_student_cluster(student_id, session_id)
         return cluster_id
 
+    async def get_student_clusters(
+        self, student_ids: List[str], session_id: str
+    ) -> Dict[str, Optional[str]]:
+        """Get the cluster of every student in a roster from MongoDB"""
+        return await ClusterModel.find_student_clusters(student_ids, session_id)
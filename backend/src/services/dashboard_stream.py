@@ -0,0 +1,239 @@
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+from collections import deque
+import asyncio
+import json
+import os
+import secrets
+import time
+from ..models.question_response import QuestionResponseModel
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, default=lambda v: v.isoformat() if hasattr(v, "isoformat") else str(v))
+
+
+class _SessionChannel:
+    """Event buffer, running statistics and wake-up signal for one session"""
+
+    def __init__(self, session_id: str, stats: Dict[str, Any], buffer_size: int):
+        self.session_id = session_id
+        self.seq = 0
+        self.events: Deque[Tuple[int, str, str]] = deque(maxlen=buffer_size)
+        self.changed = asyncio.Event()
+        self.pending: List[Dict[str, Any]] = []
+        self.flusher: Optional[asyncio.Task] = None
+        self.last_emit = 0.0
+        self.subscribers = 0
+        self.last_active = time.monotonic()
+        # Set once the ``final`` event is buffered; streams end after it
+        self.finished = False
+
+        total = stats.get("total", 0)
+        self.stats = {
+            "total": total,
+            "correct": stats.get("correct", 0),
+            "incorrect": stats.get("incorrect", 0),
+            "totalTime": stats.get("averageResponseTime", 0) * total,
+            "fastestResponse": stats.get("fastestResponse", 0),
+            "slowestResponse": stats.get("slowestResponse", 0),
+        }
+
+    def fold(self, response: Dict[str, Any]) -> None:
+        stats = self.stats
+        response_time = float(response.get("responseTime") or 0)
+        first = stats["total"] == 0
+        stats["total"] += 1
+        stats["correct" if response.get("isCorrect") else "incorrect"] += 1
+        stats["totalTime"] += response_time
+        stats["fastestResponse"] = response_time if first else min(stats["fastestResponse"], response_time)
+        stats["slowestResponse"] = response_time if first else max(stats["slowestResponse"], response_time)
+
+    def statistics(self) -> Dict[str, Any]:
+        stats = self.stats
+        total = stats["total"]
+        return {
+            "total": total,
+            "correct": stats["correct"],
+            "incorrect": stats["incorrect"],
+            "accuracy": (stats["correct"] / total * 100) if total else 0,
+            "averageResponseTime": (stats["totalTime"] / total) if total else 0,
+            "fastestResponse": stats["fastestResponse"],
+            "slowestResponse": stats["slowestResponse"],
+        }
+
+    def append(self, name: str, data: Any) -> None:
+        self.seq += 1
+        self.events.append((self.seq, name, _encode(data)))
+
+    def wake(self) -> None:
+        # Waiters hold a reference to the old event; swap in a fresh one
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def events_after(self, seq: int) -> Optional[List[Tuple[int, str, str]]]:
+        """Buffered events newer than ``seq``; None if some were already dropped"""
+        if seq >= self.seq:
+            return []
+        if not self.events or self.events[0][0] > seq + 1:
+            return None
+        return [event for event in self.events if event[0] > seq]
+
+
+class DashboardStream:
+    """
+    In-process pub/sub feeding the instructor dashboard's SSE stream.
+
+    The submit path publishes stored responses; per session they are
+    coalesced into at most ``DASHBOARD_STREAM_MAX_UPDATES_PER_SECOND`` pairs
+    of ``responses`` (new responses since the last update) and ``stats``
+    (running totals) events, and a ``final`` event when the session is
+    completed or expires. Statistics are seeded with one read when the
+    first watcher connects and then kept up to date in memory, so MongoDB
+    load does not grow with the number of watchers.
+
+    Event ids are ``<epoch>-<seq>``; a reconnect with ``Last-Event-ID``
+    replays the buffered events after it, or gets a fresh ``snapshot`` if
+    the id is from another process lifetime or too old for the buffer.
+    A stream ends after its ``final`` event, or right after the snapshot
+    of a session that is no longer active.
+    Only responses submitted to this process are published.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DashboardStream, cls).__new__(cls)
+            cls._instance._channels = {}
+            cls._instance._epoch = secrets.token_hex(4)
+            cls._instance.min_interval = 1.0 / float(
+                os.getenv("DASHBOARD_STREAM_MAX_UPDATES_PER_SECOND", "4")
+            )
+            cls._instance.buffer_size = int(os.getenv("DASHBOARD_STREAM_BUFFER", "256"))
+            cls._instance.heartbeat = 15.0
+            cls._instance.idle_timeout = 300.0
+        return cls._instance
+
+    def publish(self, session_id: str, responses: List[Dict[str, Any]]) -> None:
+        """Queue stored responses for the session's watchers (no-op if nobody watches)"""
+        channel = self._channels.get(session_id)
+        if channel is None or not responses:
+            return
+
+        for response in responses:
+            channel.fold(response)
+        channel.pending.extend(responses)
+        if channel.flusher is None:
+            channel.flusher = asyncio.create_task(self._flush(channel))
+
+    async def _flush(self, channel: _SessionChannel) -> None:
+        try:
+            wait = channel.last_emit + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._emit(channel)
+            channel.wake()
+        finally:
+            channel.flusher = None
+
+    def _emit(self, channel: _SessionChannel) -> None:
+        if channel.pending:
+            responses, channel.pending = channel.pending, []
+            channel.append("responses", {"responses": responses})
+            channel.append("stats", {"statistics": channel.statistics()})
+        channel.last_emit = time.monotonic()
+        channel.last_active = channel.last_emit
+
+    async def publish_final(self, session_id: str, status: str) -> None:
+        """Send the closing ``final`` event (status and results) to a session's watchers"""
+        channel = self._channels.get(session_id)
+        if channel is None:
+            return
+
+        # Responses committed by other workers are only in the database
+        statistics = await QuestionResponseModel.get_session_statistics(session_id)
+        self._emit(channel)
+        channel.append("final", {"status": status, "statistics": statistics})
+        channel.finished = True
+        channel.wake()
+
+    async def _channel(self, session_id: str) -> _SessionChannel:
+        channel = self._channels.get(session_id)
+        if channel is None:
+            stats = await QuestionResponseModel.get_session_statistics(session_id)
+            # Another watcher may have created it while we were reading
+            channel = self._channels.get(session_id)
+            if channel is None:
+                channel = _SessionChannel(session_id, stats, self.buffer_size)
+                self._channels[session_id] = channel
+        self._drop_idle()
+        return channel
+
+    def _drop_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_timeout
+        for session_id in [
+            sid for sid, channel in self._channels.items()
+            if channel.subscribers == 0 and channel.last_active < cutoff and channel.flusher is None
+        ]:
+            del self._channels[session_id]
+
+    def _parse_event_id(self, last_event_id: Optional[str]) -> Optional[int]:
+        if not last_event_id:
+            return None
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def _format(self, seq: int, name: str, data: str) -> str:
+        return f"id: {self._epoch}-{seq}\nevent: {name}\ndata: {data}\n\n"
+
+    async def _snapshot(self, channel: _SessionChannel, session: Dict[str, Any]) -> str:
+        responses = await QuestionResponseModel.get_live_responses(channel.session_id)
+        data = _encode({
+            "session": {"id": session["id"], "question": session["question"], "status": session["status"]},
+            "statistics": channel.statistics(),
+            "responses": responses,
+        })
+        return self._format(channel.seq, "snapshot", data)
+
+    async def subscribe(
+        self,
+        session: Dict[str, Any],
+        last_event_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Server-Sent Events for a session, starting after ``last_event_id``"""
+        channel = await self._channel(session["id"])
+        channel.subscribers += 1
+        try:
+            cursor = self._parse_event_id(last_event_id)
+            if cursor is None or channel.events_after(cursor) is None:
+                cursor = channel.seq
+                yield await self._snapshot(channel, session)
+                if session["status"] != "active":
+                    return
+
+            while True:
+                changed = channel.changed
+                events = channel.events_after(cursor)
+                if events is None:
+                    # Fell behind the buffer; start over from a snapshot
+                    cursor = channel.seq
+                    yield await self._snapshot(channel, session)
+                    continue
+                for seq, name, data in events:
+                    yield self._format(seq, name, data)
+                    cursor = seq
+                    if name == "final":
+                        return
+                if events:
+                    continue
+                if channel.finished:
+                    # Resumed after the final event
+                    return
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            channel.subscribers -= 1
+            channel.last_active = time.monotonic()
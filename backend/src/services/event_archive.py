@@ -0,0 +1,227 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import asyncio
+import gzip
+import json
+import os
+import re
+import secrets
+
+DEFAULT_ARCHIVE_DIR = Path(__file__).parent.parent.parent / "data" / "webhook_archive"
+
+# <day>/<hour>-<process token>, e.g. 20240105/14-3fa9c1
+SEGMENT_PATTERN = re.compile(r"^\d{8}/\d{2}-[0-9a-f]+$")
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class _Block:
+    """Records compressed and written together, as one gzip member"""
+
+    def __init__(self, segment: str, number: int):
+        self.segment = segment
+        self.number = number
+        self.lines: List[bytes] = []
+        self.first: Optional[str] = None
+        self.last: Optional[str] = None
+
+
+class EventArchive:
+    """
+    Append-only archive of raw Zoom webhook events on disk.
+
+    Events are written as JSON lines to gzip segments under
+    ``WEBHOOK_ARCHIVE_DIR``, one segment per hour and process. Lines are
+    grouped into blocks of ``WEBHOOK_ARCHIVE_BLOCK_RECORDS``, each block
+    compressed on its own; the segment's ``.idx`` file records the byte
+    offset, length and time range of every block. A record is addressed by
+    a pointer (segment, block, index), so a lookup decompresses one block
+    and a replay skips blocks outside the requested time range.
+
+    ``append`` hands out the pointer immediately; blocks are written in the
+    background at most ``WEBHOOK_ARCHIVE_FLUSH_SECONDS`` later, and
+    ``flush`` writes whatever is still in memory.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(EventArchive, cls).__new__(cls)
+            cls._instance.root = Path(os.getenv("WEBHOOK_ARCHIVE_DIR") or DEFAULT_ARCHIVE_DIR)
+            cls._instance.block_records = int(os.getenv("WEBHOOK_ARCHIVE_BLOCK_RECORDS", "256"))
+            cls._instance.flush_interval = float(os.getenv("WEBHOOK_ARCHIVE_FLUSH_SECONDS", "1"))
+            # Segments are never shared, so a restarted process never appends to a file it did not index
+            cls._instance._token = secrets.token_hex(3)
+            cls._instance._block = None
+            cls._instance._sealed = []
+            cls._instance._next_block = {}
+            cls._instance._writer = None
+            cls._instance._write_lock = asyncio.Lock()
+        return cls._instance
+
+    def append(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Archive a webhook event; returns the pointer to store with the parsed data"""
+        now = datetime.now(timezone.utc)
+        segment = f"{now:%Y%m%d}/{now:%H}-{self._token}"
+        if self._block is None or self._block.segment != segment:
+            self._seal()
+            # Only the current hour's segment is ever appended to
+            number = self._next_block.get(segment, 0)
+            self._next_block = {segment: number + 1}
+            self._block = _Block(segment, number)
+
+        block = self._block
+        received_at = now.isoformat()
+        record = {
+            "event": event_data.get("event"),
+            "meeting_id": (event_data.get("payload", {}).get("object", {}) or {}).get("id"),
+            "received_at": received_at,
+            "body": event_data,
+        }
+        pointer = {"segment": segment, "block": block.number, "index": len(block.lines)}
+        block.lines.append(json.dumps(record, default=_encode, separators=(",", ":")).encode("utf-8") + b"\n")
+        block.first = block.first or received_at
+        block.last = received_at
+
+        if len(block.lines) >= self.block_records:
+            self._seal()
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+        return pointer
+
+    async def flush(self) -> None:
+        """Write every archived event still held in memory"""
+        self._seal()
+        await self._write_pending()
+
+    async def lookup(self, pointer: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The archived record a pointer refers to, or None"""
+        segment = pointer.get("segment", "")
+        if not SEGMENT_PATTERN.match(segment):
+            return None
+        number, index = int(pointer.get("block", -1)), int(pointer.get("index", -1))
+
+        # Not written yet
+        for block in self._sealed + ([self._block] if self._block else []):
+            if block.segment == segment and block.number == number:
+                return json.loads(block.lines[index]) if 0 <= index < len(block.lines) else None
+        return await asyncio.to_thread(self._read_record, segment, number, index)
+
+    async def replay(
+        self,
+        start: datetime,
+        end: datetime,
+        event: Optional[str] = None,
+        meeting_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Archived records received between ``start`` and ``end`` (UTC), oldest first"""
+        await self.flush()
+        start, end = start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+        hour = start.replace(minute=0, second=0, microsecond=0)
+        while hour <= end:
+            records = await asyncio.to_thread(self._read_hour, hour, start, end, event, meeting_id)
+            for record in records:
+                yield record
+            hour += timedelta(hours=1)
+
+    def _seal(self) -> None:
+        if self._block is not None and self._block.lines:
+            self._sealed.append(self._block)
+            self._block = None
+
+    async def _run(self) -> None:
+        try:
+            # Give the block a chance to fill unless one is already waiting
+            if not self._sealed:
+                await asyncio.sleep(self.flush_interval)
+            self._seal()
+            await self._write_pending()
+        finally:
+            self._writer = None
+            if self._sealed:
+                self._writer = asyncio.create_task(self._run())
+
+    async def _write_pending(self) -> None:
+        async with self._write_lock:
+            while self._sealed:
+                block = self._sealed[0]
+                try:
+                    await asyncio.to_thread(self._write_block, block)
+                except Exception as e:
+                    # Parsed fields are in MongoDB; don't hold raw events in memory forever
+                    print(f"❌ Error archiving {len(block.lines)} webhook events: {e}")
+                self._sealed.pop(0)
+
+    def _paths(self, segment: str):
+        base = self.root / segment
+        return base.with_name(base.name + ".jsonl.gz"), base.with_name(base.name + ".idx")
+
+    def _write_block(self, block: _Block) -> None:
+        data_path, index_path = self._paths(block.segment)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        data = gzip.compress(b"".join(block.lines))
+        with open(data_path, "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(data)
+        entry = {
+            "block": block.number,
+            "offset": offset,
+            "length": len(data),
+            "records": len(block.lines),
+            "first": block.first,
+            "last": block.last,
+        }
+        with open(index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def _read_index(self, index_path: Path) -> List[Dict[str, Any]]:
+        if not index_path.exists():
+            return []
+        with open(index_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _read_block(self, data_path: Path, entry: Dict[str, Any]) -> List[bytes]:
+        with open(data_path, "rb") as f:
+            f.seek(entry["offset"])
+            return gzip.decompress(f.read(entry["length"])).splitlines()
+
+    def _read_record(self, segment: str, number: int, index: int) -> Optional[Dict[str, Any]]:
+        data_path, index_path = self._paths(segment)
+        for entry in self._read_index(index_path):
+            if entry["block"] == number:
+                if not 0 <= index < entry["records"]:
+                    return None
+                return json.loads(self._read_block(data_path, entry)[index])
+        return None
+
+    def _read_hour(
+        self,
+        hour: datetime,
+        start: datetime,
+        end: datetime,
+        event: Optional[str],
+        meeting_id: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        records = []
+        for index_path in sorted((self.root / f"{hour:%Y%m%d}").glob(f"{hour:%H}-*.idx")):
+            data_path = index_path.with_name(index_path.name[:-len(".idx")] + ".jsonl.gz")
+            for entry in self._read_index(index_path):
+                if datetime.fromisoformat(entry["last"]) < start or datetime.fromisoformat(entry["first"]) > end:
+                    continue
+                for line in self._read_block(data_path, entry):
+                    record = json.loads(line)
+                    if not start <= datetime.fromisoformat(record["received_at"]) <= end:
+                        continue
+                    if event and record.get("event") != event:
+                        continue
+                    if meeting_id and str(record.get("meeting_id")) != str(meeting_id):
+                        continue
+                    records.append(record)
+        # Segments of several processes cover the same hour
+        records.sort(key=lambda record: record["received_at"])
+        return records
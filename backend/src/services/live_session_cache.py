@@ -0,0 +1,178 @@
+from typing import Any, Dict, Optional
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import json
+import os
+from ..models.live_question_session import LiveQuestionSessionModel
+
+
+def _isoformat(value: Any) -> Any:
+    # MongoDB keeps milliseconds; truncate so a freshly created session and
+    # one read back serialise (and hash) identically
+    if isinstance(value, datetime):
+        value = value.replace(microsecond=value.microsecond // 1000 * 1000)
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+class CachedLiveSession:
+    """A live question session as cached per token"""
+
+    def __init__(self, session: Dict[str, Any]):
+        self.session = session
+        self.session_id = session["id"]
+        self.status = session.get("status")
+        self.loaded_at = datetime.now()
+        self.status_checked_at = self.loaded_at
+        expires_at = session.get("expiresAt")
+        self.expires_at = expires_at if isinstance(expires_at, datetime) else None
+
+        # Student-safe payload (no correct answer)
+        self.payload = {
+            "sessionToken": session["sessionToken"],
+            "sessionId": session["id"],
+            "question": session["question"],
+            "options": session["options"],
+            "timeLimit": session["timeLimit"],
+            "triggeredAt": _isoformat(session.get("triggeredAt")),
+            "expiresAt": _isoformat(session.get("expiresAt")),
+        }
+        body = json.dumps(self.payload, sort_keys=True, default=str)
+        self.etag = '"' + hashlib.sha1(body.encode("utf-8")).hexdigest()[:20] + '"'
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return self.expires_at is not None and self.expires_at < (now or datetime.now())
+
+    def seconds_left(self, now: Optional[datetime] = None) -> int:
+        if self.expires_at is None:
+            return 0
+        return max(0, int((self.expires_at - (now or datetime.now())).total_seconds()))
+
+
+class LiveSessionCache:
+    """
+    In-process cache of live question sessions keyed by session token.
+
+    Posting a question link into Zoom chat makes the whole class open the
+    same token within seconds. Concurrent misses for a token share a single
+    database read (single-flight) and the result is kept until the session
+    expires, plus ``LIVE_SESSION_CACHE_GRACE_SECONDS`` so late requests still
+    get a 410 without a database round-trip; sessions without an expiry are
+    reloaded after the same grace period.
+
+    The question payload never changes, but ``status`` does, possibly in
+    another worker process (an instructor completing the session), where
+    invalidation here cannot reach. ``status`` is therefore re-read with a
+    projected query once it is older than ``LIVE_SESSION_STATUS_TTL_SECONDS``,
+    or on every call with ``fresh_status=True`` (answer submission).
+
+    Cached session dicts are shared and must be treated as read-only.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(LiveSessionCache, cls).__new__(cls)
+            cls._instance._entries = {}
+            cls._instance._tokens_by_session = {}
+            cls._instance._inflight = {}
+            cls._instance._status_inflight = {}
+            cls._instance.grace = timedelta(seconds=float(
+                os.getenv("LIVE_SESSION_CACHE_GRACE_SECONDS", "600")
+            ))
+            cls._instance.status_ttl = timedelta(seconds=float(
+                os.getenv("LIVE_SESSION_STATUS_TTL_SECONDS", "2")
+            ))
+            cls._instance.max_entries = int(os.getenv("LIVE_SESSION_CACHE_MAX_ENTRIES", "1024"))
+        return cls._instance
+
+    async def get(self, token: str, fresh_status: bool = False) -> Optional[CachedLiveSession]:
+        """Cached session for a token, loading it once on a miss; None if unknown"""
+        entry = self._entries.get(token)
+        if entry is not None and not self._is_stale(entry):
+            if fresh_status or datetime.now() - entry.status_checked_at > self.status_ttl:
+                return await self._revalidate_status(token, entry, strict=fresh_status)
+            return entry
+
+        inflight = self._inflight.get(token)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[token] = future
+        try:
+            session = await LiveQuestionSessionModel.find_by_token(token)
+            entry = CachedLiveSession(session) if session else None
+            if entry is not None:
+                self._store(token, entry)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters see the exception; nobody may be waiting on this one
+            future.exception()
+            raise
+        finally:
+            del self._inflight[token]
+
+    async def _revalidate_status(self, token: str, entry: CachedLiveSession, strict: bool) -> Optional[CachedLiveSession]:
+        # Concurrent revalidations of a token share one read, like misses
+        inflight = self._status_inflight.get(token)
+        if inflight is None:
+            inflight = asyncio.ensure_future(LiveQuestionSessionModel.find_status_by_token(token))
+            self._status_inflight[token] = inflight
+            inflight.add_done_callback(lambda _: self._status_inflight.pop(token, None))
+        try:
+            status = await asyncio.shield(inflight)
+        except Exception as e:
+            if strict:
+                raise
+            # The page can be served with the last known status meanwhile
+            print(f"⚠️  Could not revalidate live session status: {e}")
+            return entry
+
+        if status is None:
+            self.invalidate(token)
+            return None
+        entry.status = status
+        entry.status_checked_at = datetime.now()
+        return entry
+
+    def prime(self, session: Dict[str, Any]) -> None:
+        """Cache a session that was just created so the first hits skip the database"""
+        self._store(session["sessionToken"], CachedLiveSession(session))
+
+    def mark_status(self, token: str, status: str) -> None:
+        """Record a status change (e.g. expired) made by the caller"""
+        entry = self._entries.get(token)
+        if entry is not None:
+            entry.status = status
+
+    def mark_session_status(self, session_id: str, status: str) -> None:
+        token = self._tokens_by_session.get(session_id)
+        if token is not None:
+            self.mark_status(token, status)
+
+    def invalidate(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            self._tokens_by_session.pop(entry.session_id, None)
+
+    def invalidate_session(self, session_id: str) -> None:
+        token = self._tokens_by_session.get(session_id)
+        if token is not None:
+            self.invalidate(token)
+
+    def _is_stale(self, entry: CachedLiveSession) -> bool:
+        if entry.expires_at is None:
+            return entry.loaded_at + self.grace < datetime.now()
+        return entry.expires_at + self.grace < datetime.now()
+
+    def _store(self, token: str, entry: CachedLiveSession) -> None:
+        if len(self._entries) >= self.max_entries:
+            for stale_token in [t for t, e in self._entries.items() if self._is_stale(e) or e.is_expired()]:
+                self.invalidate(stale_token)
+            while len(self._entries) >= self.max_entries:
+                self.invalidate(next(iter(self._entries)))
+        self._entries[token] = entry
+        self._tokens_by_session[entry.session_id] = token
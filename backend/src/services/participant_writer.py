@@ -0,0 +1,158 @@
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+import asyncio
+import os
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from ..database.connection import get_database_by_name
+from ..models.zoom_attendance_model import ZOOM_DATABASE
+
+
+class ParticipantWriteBatcher:
+    """
+    Group commit for Zoom participant join/leave records.
+
+    Writes are queued and flushed every ``PARTICIPANT_FLUSH_INTERVAL_MS``
+    (or as soon as ``PARTICIPANT_MAX_BATCH`` are waiting) as one ordered
+    ``bulk_write`` on ``zoom_attendance.participants``. Every write is an
+    upsert keyed on (zoom_meeting_id, participant_uuid), so a join followed
+    by its leave in the same batch lands on one document, in order. Each
+    caller awaits its own outcome: the id of the document it created, or
+    None when it updated an existing one.
+
+    Writes are applied in the order ``join``/``leave`` were called, so
+    events of one meeting may be submitted concurrently as long as they are
+    submitted in arrival order.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ParticipantWriteBatcher, cls).__new__(cls)
+            cls._instance._queue = []
+            cls._instance._flusher = None
+            cls._instance.flush_interval = float(os.getenv("PARTICIPANT_FLUSH_INTERVAL_MS", "20")) / 1000
+            cls._instance.max_batch = int(os.getenv("PARTICIPANT_MAX_BATCH", "500"))
+            cls._instance.stats = {"batches": 0, "writes": 0}
+        return cls._instance
+
+    async def join(self, participant_data: Dict[str, Any]) -> Optional[Any]:
+        """
+        Record a join; a rejoin reopens the participant's existing document.
+
+        ``participant_data`` is the full participant record and must carry
+        ``zoom_meeting_id`` and ``participant_uuid``.
+        """
+        fields = {k: v for k, v in participant_data.items() if k != "created_at"}
+        fields["updated_at"] = datetime.now()
+        return await self.submit(UpdateOne(
+            self._key(participant_data),
+            {
+                "$set": fields,
+                "$unset": {"leave_time": "", "leave_reason": ""},
+                "$setOnInsert": {"created_at": participant_data.get("created_at") or datetime.now()},
+            },
+            upsert=True
+        ))
+
+    async def leave(self, participant_data: Dict[str, Any]) -> Optional[Any]:
+        """
+        Record a leave on the participant's document, creating it when the
+        join was never seen.
+
+        ``participant_data`` is the record to create in that case; its
+        ``leave_time``, ``leave_reason`` and ``status`` are always applied.
+        """
+        changes = {
+            "leave_time": participant_data.get("leave_time"),
+            "leave_reason": participant_data.get("leave_reason", ""),
+            "status": "left",
+            "updated_at": datetime.now(),
+        }
+        key = self._key(participant_data)
+        on_insert = {
+            k: v for k, v in participant_data.items()
+            if k not in changes and k not in key
+        }
+        return await self.submit(UpdateOne(
+            key,
+            {"$set": changes, "$setOnInsert": on_insert},
+            upsert=True
+        ))
+
+    @staticmethod
+    def _key(participant_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "zoom_meeting_id": participant_data["zoom_meeting_id"],
+            "participant_uuid": participant_data["participant_uuid"],
+        }
+
+    async def submit(self, operation: UpdateOne) -> Optional[Any]:
+        """Queue a write and wait for its batch; returns the upserted id, if any"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((operation, future))
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+        return await future
+
+    async def _run(self) -> None:
+        try:
+            # Wait for the batch to fill unless it is already full
+            if len(self._queue) < self.max_batch:
+                await asyncio.sleep(self.flush_interval)
+            while self._queue:
+                batch = self._queue[:self.max_batch]
+                self._queue = self._queue[self.max_batch:]
+                await self._commit(batch)
+        finally:
+            self._flusher = None
+            if self._queue:
+                self._flusher = asyncio.create_task(self._run())
+
+    async def _commit(self, batch: List[Tuple[UpdateOne, asyncio.Future]]) -> None:
+        zoom_db = get_database_by_name(ZOOM_DATABASE)
+        if zoom_db is None:
+            self._fail(batch, RuntimeError("Database not connected"))
+            return
+
+        # An ordered bulk write stops at the first error: settle everything
+        # before it, fail the offending write and resubmit the rest
+        while batch:
+            self.stats["batches"] += 1
+            self.stats["writes"] += len(batch)
+            try:
+                result = await zoom_db.participants.bulk_write(
+                    [operation for operation, _ in batch],
+                    ordered=True
+                )
+                self._settle(batch, result.upserted_ids)
+                return
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors") or []
+                if not errors:
+                    self._fail(batch, e)
+                    return
+                failed_at = errors[0]["index"]
+                upserted = {
+                    item["index"]: item["_id"] for item in e.details.get("upserted", [])
+                }
+                self._settle(batch[:failed_at], upserted)
+                print(f"❌ Error writing participant record: {errors[0].get('errmsg')}")
+                self._fail(batch[failed_at:failed_at + 1], RuntimeError(errors[0].get("errmsg", "write failed")))
+                batch = batch[failed_at + 1:]
+            except Exception as e:
+                print(f"❌ Error writing {len(batch)} participant records: {e}")
+                self._fail(batch, e)
+                return
+
+    @staticmethod
+    def _settle(batch: List[Tuple[UpdateOne, asyncio.Future]], upserted: Dict[int, Any]) -> None:
+        for index, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(upserted.get(index))
+
+    @staticmethod
+    def _fail(batch: List[Tuple[UpdateOne, asyncio.Future]], error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
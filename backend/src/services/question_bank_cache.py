@@ -0,0 +1,102 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+import os
+import random
+import time
+from ..models.question import Question
+
+
+class QuestionBankCache:
+    """
+    Read-through, in-process cache of the questions collection.
+
+    The whole bank is loaded once and indexed by id and by category. Writes
+    through the Question model bump a version counter in MongoDB; the cache
+    compares that counter at most every ``QUESTION_BANK_VERSION_CHECK_SECONDS``
+    (a single point read) and reloads only when it changed. The /api/questions
+    routes also invalidate the local copy directly after a write.
+
+    Cached question dicts are shared between callers and must be treated as
+    read-only; ``get_by_id`` returns a copy.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(QuestionBankCache, cls).__new__(cls)
+            cls._instance._questions = None
+            cls._instance._by_id = {}
+            cls._instance._by_category = {}
+            cls._instance._version = None
+            cls._instance._last_check = 0.0
+            cls._instance._lock = asyncio.Lock()
+            cls._instance.check_interval = float(
+                os.getenv("QUESTION_BANK_VERSION_CHECK_SECONDS", "5")
+            )
+        return cls._instance
+
+    def invalidate(self) -> None:
+        """Drop the cached bank; the next read reloads it"""
+        self._questions = None
+        self._by_id = {}
+        self._by_category = {}
+        self._version = None
+
+    async def _load(self) -> None:
+        version = await Question.get_bank_version()
+        questions = await Question.find_all()
+
+        by_id: Dict[str, Dict[str, Any]] = {}
+        by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for question in questions:
+            by_id[str(question["id"])] = question
+            by_category.setdefault(question.get("category", ""), []).append(question)
+
+        self._questions = questions
+        self._by_id = by_id
+        self._by_category = by_category
+        self._version = version
+        self._last_check = time.monotonic()
+
+    async def _ensure_fresh(self) -> None:
+        if self._questions is not None and time.monotonic() - self._last_check < self.check_interval:
+            return
+
+        async with self._lock:
+            # Another coroutine may have (re)loaded while we waited for the lock
+            if self._questions is None:
+                await self._load()
+                return
+            if time.monotonic() - self._last_check < self.check_interval:
+                return
+
+            version = await Question.get_bank_version()
+            if version != self._version:
+                await self._load()
+            else:
+                self._last_check = time.monotonic()
+
+    async def get_all(self) -> List[Dict[str, Any]]:
+        """All questions in the bank"""
+        await self._ensure_fresh()
+        return list(self._questions)
+
+    async def get_by_id(self, question_id: str) -> Optional[Dict[str, Any]]:
+        """Find a question by id, falling back to the database on a miss"""
+        await self._ensure_fresh()
+        question = self._by_id.get(str(question_id))
+        if question is not None:
+            return dict(question)
+        return await Question.find_by_id(question_id)
+
+    async def get_by_category(self, category: str) -> List[Dict[str, Any]]:
+        """All questions in a category"""
+        await self._ensure_fresh()
+        return list(self._by_category.get(category, []))
+
+    async def random_question(self) -> Optional[Dict[str, Any]]:
+        """Pick a random question, or None if the bank is empty"""
+        await self._ensure_fresh()
+        if not self._questions:
+            return None
+        return dict(random.choice(self._questions))
@@ -7,6 +7,12 @@ from ..models.quiz_answer_model import QuizAnswerModel
 from ..models.quiz_performance import QuizPerformance, PerformanceByCluster, TopPerformer
 from ..models.question_assignment_model import QuestionAssignmentModel
 from ..models.question_session_model import QuestionSessionModel
+from ..models.question_stats_model import QuestionStatsModel
+from .clustering_service import ClusteringService
+from .question_bank_cache import QuestionBankCache
+
+question_bank = QuestionBankCache()
+clustering_service = ClusteringService()
 
 
 class QuizService:
@@ -20,7 +26,7 @@ class QuizService:
     async def _initialize_mock_data(self):
         """Initialize mock questions if they don't exist"""
         # Check if questions already exist
-        existing_questions = await Question.find_all()
+        existing_questions = await question_bank.get_all()
         if len(existing_questions) > 0:
             return  # Questions already exist
         
@@ -63,17 +69,18 @@ class QuizService:
             "difficulty": "hard",
             "category": "Neural Networks",
         })
+        question_bank.invalidate()
 
     async def submit_answer(self, answer: QuizAnswer) -> Dict:
         """Store answer in MongoDB"""
         await self._initialize_mock_data()
         
-        # Store answer in database
-        stored_answer = await QuizAnswerModel.create(answer)
-
         # Get question to check correctness
-        question = await Question.find_by_id(answer.questionId)
-        is_correct = question and answer.answerIndex == question.get("correctAnswer")
+        question = await question_bank.get_by_id(answer.questionId)
+        is_correct = bool(question) and answer.answerIndex == question.get("correctAnswer")
+
+        # Store answer in database (also updates question_stats)
+        stored_answer = await QuizAnswerModel.create(answer, is_correct=is_correct)
 
         session_state = await QuestionSessionModel.get_state(answer.sessionId)
         activation_version = session_state.get("version") if session_state else None
@@ -90,6 +97,12 @@ class QuizService:
             activation_version=activation_version
         )
 
+        # Queued for the session's engagement clusters (applied in the background)
+        clustering_service.record_answer(
+            answer.sessionId, answer.studentId, is_correct, answer.timeTaken,
+            answer_id=stored_answer.get("id") if stored_answer else None
+        )
+
         return {
             "success": True,
             "isCorrect": is_correct or False,
@@ -98,11 +111,27 @@ class QuizService:
     async def get_performance(self, question_id: str, session_id: str) -> QuizPerformance:
         """Get performance data from MongoDB"""
         await self._initialize_mock_data()
-        
-        # Get answers from database
-        answer_docs = await QuizAnswerModel.find_by_question_and_session(question_id, session_id)
-        
-        if len(answer_docs) == 0:
+
+        question = await question_bank.get_by_id(question_id)
+        correct_answer = question.get("correctAnswer") if question else None
+
+        stats = await QuestionStatsModel.get(session_id, question_id)
+        if stats:
+            # Materialized counters plus an indexed top-N query
+            summary = {
+                "answered": stats["total"],
+                "correct": stats["correct"],
+                "averageTime": stats["averageResponseTime"],
+                "percentiles": stats["percentiles"],
+                "topPerformers": await QuizAnswerModel.find_top_performers(question_id, session_id),
+            }
+        else:
+            # No stats yet (answers stored before question_stats existed):
+            # compute everything in one aggregation instead
+            summary = await QuizAnswerModel.aggregate_performance(question_id, session_id, correct_answer)
+        answered = summary["answered"]
+
+        if answered == 0:
             return QuizPerformance(
                 totalStudents=0,
                 answeredStudents=0,
@@ -113,53 +142,39 @@ class QuizService:
                 topPerformers=[],
             )
 
-        question = await Question.find_by_id(question_id)
         if not question:
             raise ValueError("Question not found")
 
-        # Convert answer docs to QuizAnswer objects for processing
-        session_answers = [
-            QuizAnswer(**{k: v for k, v in doc.items() if k != "id" and k != "_id"})
-            for doc in answer_docs
-        ]
-
-        correct_answers = sum(
-            1 for a in session_answers
-            if a.answerIndex == question.get("correctAnswer")
-        )
+        correct_answers = summary["correct"]
+        average_time = summary["averageTime"]
 
-        average_time = (
-            sum(a.timeTaken for a in session_answers) / len(session_answers)
-            if session_answers else 0
-        )
-
-        # Get top performers
+        # Top performers: correct answers first, then fastest
         top_performers = [
             TopPerformer(
-                studentName=f"Student {a.studentId[:8]}",
-                isCorrect=a.answerIndex == question.get("correctAnswer"),
-                timeTaken=a.timeTaken,
+                studentName=f"Student {str(a.get('studentId', ''))[:8]}",
+                isCorrect=a.get("isCorrect", False),
+                timeTaken=a.get("timeTaken", 0),
             )
-            for a in session_answers[-10:]
+            for a in summary["topPerformers"]
         ]
 
         # Calculate performance by cluster (mock data for now)
         performance_by_cluster = [
             PerformanceByCluster(
                 clusterName="Active Participants",
-                answered=int(len(session_answers) * 0.6),
+                answered=int(answered * 0.6),
                 correct=int(correct_answers * 0.7),
                 percentage=83.3,
             ),
             PerformanceByCluster(
                 clusterName="Moderate Participants",
-                answered=int(len(session_answers) * 0.3),
+                answered=int(answered * 0.3),
                 correct=int(correct_answers * 0.25),
                 percentage=62.5,
             ),
             PerformanceByCluster(
                 clusterName="At-Risk Students",
-                answered=int(len(session_answers) * 0.1),
+                answered=int(answered * 0.1),
                 correct=int(correct_answers * 0.05),
                 percentage=0,
             ),
@@ -167,21 +182,24 @@ class QuizService:
 
         return QuizPerformance(
             totalStudents=32,  # TODO: Get from session
-            answeredStudents=len(session_answers),
+            answeredStudents=answered,
             correctAnswers=correct_answers,
             averageTime=average_time,
-            correctPercentage=(correct_answers / len(session_answers) * 100) if session_answers else 0,
+            correctPercentage=(correct_answers / answered * 100) if answered else 0,
             performanceByCluster=performance_by_cluster,
             topPerformers=top_performers,
+            timePercentiles=summary["percentiles"],
         )
 
     async def trigger_question(self, question_id: str, session_id: str) -> Dict:
         """Trigger question - activate individual question mode so each student gets a different question"""
         # Activate individual question mode - each student will get a different question
-        activation_state = await QuestionSessionModel.activate(session_id, mode="individual")
+        deck = await self._build_deck()
+        activation_state = await QuestionSessionModel.activate(session_id, mode="individual", deck=deck)
         
         # Clear previous answers for this session
         await QuizAnswerModel.delete_by_session(session_id)
+        await QuestionStatsModel.delete_by_session(session_id)
         await QuestionAssignmentModel.reset_session(session_id)
 
         # TODO: Emit Socket.IO event to all students in session
@@ -198,9 +216,39 @@ class QuizService:
         """Prepare session for individualized questions"""
         await QuestionAssignmentModel.reset_session(session_id)
         await QuizAnswerModel.delete_by_session(session_id)
-        activation_state = await QuestionSessionModel.activate(session_id, mode="individual")
+        await QuestionStatsModel.delete_by_session(session_id)
+        deck = await self._build_deck()
+        activation_state = await QuestionSessionModel.activate(session_id, mode="individual", deck=deck)
         return {"success": True, "mode": "individual", "version": activation_state.get("version")}
 
+    async def _build_deck(self) -> List[str]:
+        """Shuffled question IDs handed out in order during one activation"""
+        questions = await question_bank.get_all()
+        if not questions:
+            await self._initialize_mock_data()
+            questions = await question_bank.get_all()
+
+        deck = [str(q.get("id")) for q in questions]
+        random.shuffle(deck)
+        return deck
+
+    async def _claim_question(self, session_id: str, activation_version: int) -> Dict:
+        """Take the next question from the activation deck, falling back to a random pick"""
+        question_id = await QuestionSessionModel.claim_next_question(session_id, activation_version)
+        question = await question_bank.get_by_id(question_id) if question_id else None
+        if question:
+            return question
+
+        # Activations created without a deck, or a deck question that was deleted since
+        question = await question_bank.random_question()
+        if not question:
+            await self._initialize_mock_data()
+            question = await question_bank.random_question()
+
+        if not question:
+            raise ValueError("No questions available in the database")
+        return question
+
     async def get_assignment_for_student(self, session_id: str, student_id: str) -> Dict:
         """Fetch or create a personalized question assignment for a student"""
         session_state = await QuestionSessionModel.get_state(session_id)
@@ -219,7 +267,7 @@ class QuizService:
                     "completed": True
                 }
 
-            question = await Question.find_by_id(assignment.get("questionId"))
+            question = await question_bank.get_by_id(assignment.get("questionId"))
             if question:
                 return {
                     "active": True,
@@ -228,26 +276,35 @@ class QuizService:
                     "completed": False
                 }
 
-        # Need to create a new assignment
-        questions = await Question.find_all()
-        if not questions:
-            await self._initialize_mock_data()
-            questions = await Question.find_all()
+        question = await self._claim_question(session_id, activation_version)
 
-        if not questions:
-            raise ValueError("No questions available in the database")
-
-        active_question_ids = await QuestionAssignmentModel.find_active_question_ids(session_id, activation_version)
-        available_questions = [
-            q for q in questions
-            if str(q.get("id")) not in active_question_ids
-        ]
-
-        if not available_questions:
-            available_questions = questions
-
-        question = random.choice(available_questions)
-        assignment = await QuestionAssignmentModel.create(session_id, student_id, question.get("id"), activation_version)
+        if assignment:
+            # The assigned question was deleted from the bank; hand out the claimed one instead
+            reassigned = await QuestionAssignmentModel.reassign(
+                session_id, student_id, activation_version, question.get("id")
+            )
+            if reassigned is None:
+                # Answered concurrently (reassign only touches unanswered ones): report what is stored
+                reassigned = await QuestionAssignmentModel.find_for_student(session_id, student_id, activation_version)
+                if reassigned is None:
+                    raise Exception("Question assignment could not be read back")
+                if reassigned.get("answered"):
+                    return {
+                        "active": True,
+                        "assignmentId": reassigned.get("id"),
+                        "completed": True
+                    }
+                question = await question_bank.get_by_id(reassigned.get("questionId")) or question
+            assignment = reassigned
+        else:
+            assignment = await QuestionAssignmentModel.claim(
+                session_id, student_id, question.get("id"), activation_version
+            )
+            if assignment is None:
+                raise Exception("Question assignment could not be created")
+            if assignment.get("questionId") != question.get("id"):
+                # A concurrent request for the same student created the assignment first
+                question = await question_bank.get_by_id(assignment.get("questionId")) or question
 
         return {
             "active": True,
@@ -0,0 +1,112 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import os
+from ..models.live_question_session import LiveQuestionSessionModel
+from ..models.question_response import QuestionResponseModel
+from .dashboard_stream import DashboardStream
+
+
+class ResponseSubmissionPipeline:
+    """
+    Group commit for live question responses.
+
+    Submissions are queued and written every ``RESPONSE_FLUSH_INTERVAL_MS``
+    (or as soon as ``RESPONSE_MAX_BATCH`` are waiting) with one unordered
+    bulk insert; the session counters get one update per session per batch.
+    Each submitter awaits its own outcome, so a duplicate rejected by the
+    (sessionId, studentKey) unique index still gets a 409 even when the
+    first answer was taken by another worker. Repeat submissions seen by
+    this process are rejected before they are queued.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ResponseSubmissionPipeline, cls).__new__(cls)
+            cls._instance._queue = []
+            cls._instance._flusher = None
+            cls._instance._seen = {}
+            cls._instance.flush_interval = float(os.getenv("RESPONSE_FLUSH_INTERVAL_MS", "5")) / 1000
+            cls._instance.max_batch = int(os.getenv("RESPONSE_MAX_BATCH", "500"))
+            cls._instance.max_tracked_sessions = 1024
+        return cls._instance
+
+    async def submit(self, response_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Queue a response and wait for its batch to be written.
+
+        Returns the stored response, or None if the student already answered.
+        """
+        seen = self._seen_keys(response_data["sessionId"])
+        key = response_data["studentKey"]
+        if key in seen:
+            return None
+        seen.add(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((response_data, future))
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+        return await future
+
+    def _seen_keys(self, session_id: str) -> Set[str]:
+        seen = self._seen.get(session_id)
+        if seen is None:
+            # Keep only recent sessions; the unique index covers the rest
+            while len(self._seen) >= self.max_tracked_sessions:
+                del self._seen[next(iter(self._seen))]
+            seen = self._seen[session_id] = set()
+        return seen
+
+    async def _run(self) -> None:
+        try:
+            # Wait for the batch to fill unless it is already full
+            if len(self._queue) < self.max_batch:
+                await asyncio.sleep(self.flush_interval)
+            while self._queue:
+                batch = self._queue[:self.max_batch]
+                self._queue = self._queue[self.max_batch:]
+                try:
+                    await self._commit(batch)
+                except Exception as e:
+                    print(f"❌ Error committing {len(batch)} responses: {e}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+        finally:
+            self._flusher = None
+            if self._queue:
+                self._flusher = asyncio.create_task(self._run())
+
+    async def _commit(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            inserted, duplicates = await QuestionResponseModel.create_many([doc for doc, _ in batch])
+        except Exception as e:
+            print(f"❌ Error writing {len(batch)} responses: {e}")
+            for doc, future in batch:
+                self._seen_keys(doc["sessionId"]).discard(doc["studentKey"])
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        rejected = set(duplicates)
+        for index, (doc, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(None if index in rejected else doc)
+
+        by_session: Dict[str, List[Dict[str, Any]]] = {}
+        for doc in inserted:
+            by_session.setdefault(doc["sessionId"], []).append(doc)
+        stream = DashboardStream()
+        for session_id, docs in by_session.items():
+            # The responses are stored; a failure here must not stop the
+            # other sessions' counters or the remaining batches
+            try:
+                stream.publish(session_id, docs)
+                await LiveQuestionSessionModel.add_responses(
+                    session_id,
+                    len(docs),
+                    sum(1 for doc in docs if doc.get("isCorrect"))
+                )
+            except Exception as e:
+                print(f"❌ Error updating session {session_id} after storing {len(docs)} responses: {e}")
@@ -0,0 +1,161 @@
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import asyncio
+import math
+import os
+import time
+from ..models.live_question_session import LiveQuestionSessionModel
+from .dashboard_stream import DashboardStream
+from .live_session_cache import LiveSessionCache
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel: keys are filed into ``slots`` buckets by the tick
+    they are due at, so scheduling and cancelling are O(1) and each tick
+    only looks at one bucket. Deadlines further out than one revolution
+    stay in their bucket until their tick comes round.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self.slots: List[Dict[str, int]] = [{} for _ in range(slots)]
+        self.current = math.floor(time.time() / tick)
+        self._slot_of: Dict[str, int] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slot_of
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def schedule(self, key: str, deadline: float) -> None:
+        """File ``key`` to fire at ``deadline`` (epoch seconds); overdue keys fire on the next tick"""
+        self.cancel(key)
+        due = max(math.ceil(deadline / self.tick), self.current + 1)
+        slot = due % len(self.slots)
+        self.slots[slot][key] = due
+        self._slot_of[key] = slot
+
+    def cancel(self, key: str) -> None:
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            self.slots[slot].pop(key, None)
+
+    def advance(self, now: float) -> List[str]:
+        """Move the wheel to ``now`` and return the keys that became due"""
+        target = math.floor(now / self.tick)
+        # After a stall one revolution visits every bucket
+        start = max(self.current + 1, target - len(self.slots) + 1)
+        fired = []
+        for tick in range(start, target + 1):
+            bucket = self.slots[tick % len(self.slots)]
+            due = [key for key, at in bucket.items() if at <= target]
+            for key in due:
+                del bucket[key]
+                del self._slot_of[key]
+            fired.extend(due)
+        self.current = max(self.current, target)
+        return fired
+
+
+class SessionExpiryScheduler:
+    """
+    Expires live question sessions at their ``expiresAt`` instead of on the
+    next student request, so ``find_active_sessions`` only ever sees
+    sessions that are really open.
+
+    Sessions are put on a one-second timer wheel when triggered, and every
+    ``LIVE_SESSION_EXPIRY_RESYNC_SECONDS`` the sessions expiring soon are
+    reloaded through the (status, expiresAt) index, which also picks up
+    sessions created by other workers or before a restart. Expiry is a
+    conditional update, so several workers racing on one session is
+    harmless. Watchers of an expired session get a ``final`` dashboard event.
+
+    Finished sessions older than ``LIVE_SESSION_ARCHIVE_AFTER_DAYS`` are
+    moved to the archive collection once an hour (0 disables archiving).
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SessionExpiryScheduler, cls).__new__(cls)
+            cls._instance._wheel = TimerWheel()
+            cls._instance._task = None
+            cls._instance.resync_interval = float(os.getenv("LIVE_SESSION_EXPIRY_RESYNC_SECONDS", "60"))
+            cls._instance.archive_after = timedelta(days=float(
+                os.getenv("LIVE_SESSION_ARCHIVE_AFTER_DAYS", "30")
+            ))
+            cls._instance.archive_interval = 3600.0
+        return cls._instance
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def schedule(self, session_id: str, expires_at: Optional[datetime]) -> None:
+        if isinstance(expires_at, datetime):
+            self._wheel.schedule(session_id, expires_at.timestamp())
+
+    def cancel(self, session_id: str) -> None:
+        self._wheel.cancel(session_id)
+
+    async def expire(self, session_ids: List[str]) -> int:
+        """Expire due sessions now and notify caches and dashboard watchers"""
+        expired = set(await LiveQuestionSessionModel.expire_sessions(session_ids))
+        cache = LiveSessionCache()
+        stream = DashboardStream()
+        for session_id in session_ids:
+            self._wheel.cancel(session_id)
+            if session_id in expired:
+                cache.mark_session_status(session_id, "expired")
+                await stream.publish_final(session_id, "expired")
+            else:
+                # Completed (or expired) elsewhere; the next read loads its real status
+                cache.invalidate_session(session_id)
+        return len(expired)
+
+    async def _resync(self) -> None:
+        horizon = datetime.now() + timedelta(seconds=self.resync_interval * 2)
+        for session in await LiveQuestionSessionModel.find_expiring(horizon):
+            if session["id"] not in self._wheel:
+                self.schedule(session["id"], session.get("expiresAt"))
+
+    async def _archive(self) -> None:
+        archived = await LiveQuestionSessionModel.archive_finished_sessions(datetime.now() - self.archive_after)
+        if archived:
+            print(f"🗄️  Archived {archived} finished live question sessions")
+
+    async def _run(self) -> None:
+        next_resync = 0.0
+        next_archive = time.monotonic() + 60
+        while True:
+            try:
+                if time.monotonic() >= next_resync:
+                    next_resync = time.monotonic() + self.resync_interval
+                    await self._resync()
+                if self.archive_after and time.monotonic() >= next_archive:
+                    next_archive = time.monotonic() + self.archive_interval
+                    await self._archive()
+
+                due = self._wheel.advance(time.time())
+                if due:
+                    expired = await self.expire(due)
+                    if expired:
+                        print(f"⏰ Expired {expired} live question sessions")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Session expiry scheduler error: {e}")
+
+            tick = self._wheel.tick
+            await asyncio.sleep(tick - time.time() % tick)
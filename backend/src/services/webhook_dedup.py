@@ -0,0 +1,93 @@
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+import hashlib
+import os
+from ..models.webhook_receipt import WebhookReceiptModel
+
+
+def fingerprint(event: Dict[str, Any]) -> Optional[str]:
+    """
+    Identity of a webhook delivery: event type, event_ts, meeting uuid and
+    participant. Zoom retries resend the same body, so a retry has the same
+    fingerprint. None when the event has no timestamp to tell deliveries apart.
+    """
+    event_ts = event.get("event_ts")
+    if event_ts is None:
+        return None
+    obj = event.get("payload", {}).get("object", {}) or {}
+    participant = obj.get("participant", {}) or {}
+    participant_key = (
+        participant.get("participant_uuid")
+        or participant.get("participant_user_id")
+        or participant.get("user_id")
+        or participant.get("id")
+        or participant.get("user_name")
+        or ""
+    )
+    key = f"{event.get('event')}|{event_ts}|{obj.get('uuid') or obj.get('id') or ''}|{participant_key}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class WebhookDeduplicator:
+    """
+    Drops repeated Zoom webhook deliveries.
+
+    Recently seen fingerprints are kept in an in-memory LRU
+    (``WEBHOOK_DEDUP_LRU_SIZE``), so a retry seen by this process is dropped
+    without touching MongoDB. Fingerprints missing from the LRU are
+    claimed in ``webhook_receipts`` (unique ``_id``, TTL index) with one
+    insert per batch, which catches retries that went to another worker
+    or arrived after a restart. Deliveries that then fail processing are
+    ``release``d again, so a retry is processed instead of dropped.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(WebhookDeduplicator, cls).__new__(cls)
+            cls._instance._recent = OrderedDict()
+            cls._instance.max_size = int(os.getenv("WEBHOOK_DEDUP_LRU_SIZE", "50000"))
+        return cls._instance
+
+    def _remember(self, key: str) -> None:
+        self._recent[key] = True
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_size:
+            self._recent.popitem(last=False)
+
+    async def mark_new(self, events: List[Dict[str, Any]]) -> List[bool]:
+        """For each event of a batch, whether it is its first delivery"""
+        keys = [fingerprint(event) for event in events]
+        unknown = list(dict.fromkeys(
+            key for key in keys if key is not None and key not in self._recent
+        ))
+
+        claimed = set(unknown)
+        if unknown:
+            try:
+                claimed = await WebhookReceiptModel.claim_many(unknown)
+            except Exception as e:
+                # Better to store a retry twice than to lose an event
+                print(f"❌ Error recording webhook receipts: {e}")
+
+        is_new = []
+        for key in keys:
+            if key is None:
+                is_new.append(True)
+                continue
+            # Only the first copy within the batch counts
+            is_new.append(key in claimed)
+            claimed.discard(key)
+            self._remember(key)
+        return is_new
+
+    async def release(self, events: List[Dict[str, Any]]) -> None:
+        """Forget events whose processing failed; their next delivery counts as new"""
+        keys = list(dict.fromkeys(key for key in map(fingerprint, events) if key is not None))
+        for key in keys:
+            self._recent.pop(key, None)
+        if keys:
+            try:
+                await WebhookReceiptModel.release_many(keys)
+            except Exception as e:
+                print(f"❌ Error releasing webhook receipts: {e}")
@@ -0,0 +1,201 @@
+from typing import Any, Callable, Dict, Iterable, Mapping, NamedTuple, Optional
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+# Standard library only: the Lambda adapter ships this file next to its handler
+
+URL_VALIDATION = "endpoint.url_validation"
+PARTICIPANT_JOINED = ("meeting.participant_joined", "participant.joined")
+PARTICIPANT_LEFT = ("meeting.participant_left", "participant.left")
+
+SIGNATURE_HEADER = "x-zoom-signature"
+TIMESTAMP_HEADER = "x-zoom-request-timestamp"
+
+# Signed deliveries older than this are treated as replays
+MAX_TIMESTAMP_AGE_SECONDS = 300
+
+
+def configured_secret() -> str:
+    """Zoom's webhook secret token; both names have been used in .env files"""
+    return os.getenv("ZOOM_WEBHOOK_SECRET") or os.getenv("ZOOM_WEBHOOK_SECRET_TOKEN", "")
+
+
+def compute_signature(secret: str, timestamp: str, body: bytes) -> str:
+    """``x-zoom-signature`` of a request body, computed on the bytes as received"""
+    message = b"v0:" + timestamp.encode() + b":" + body
+    return "v0=" + hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def encrypt_token(secret: str, plain_token: str) -> str:
+    """``encryptedToken`` answering Zoom's URL validation challenge"""
+    if not secret:
+        return ""
+    hashed = hmac.new(secret.encode(), plain_token.encode(), hashlib.sha256).digest()
+    return base64.b64encode(hashed).decode()
+
+
+def _header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    # Starlette and Werkzeug headers ignore case; a Lambda event's dict does not
+    value = headers.get(name)
+    if value is None:
+        for key, candidate in headers.items():
+            if key.lower() == name:
+                return candidate
+    return value
+
+
+class Delivery:
+    """A webhook request, parsed once and handed to the sink as is"""
+    __slots__ = ("raw", "headers", "event", "event_type", "meeting_id")
+
+    def __init__(self, raw: bytes, headers: Mapping[str, str], event: Dict[str, Any]):
+        self.raw = raw
+        self.headers = headers
+        self.event = event
+        self.event_type = event.get("event")
+        self.meeting_id = ((event.get("payload") or {}).get("object") or {}).get("id")
+
+
+class IngestResult(NamedTuple):
+    status_code: int
+    body: Dict[str, Any]
+
+
+class DispatchTable:
+    """
+    Event type -> handler, one dict lookup per event instead of a chain of
+    comparisons. ``on`` registers a handler for several types at once, e.g.
+    ``PARTICIPANT_JOINED``, which Zoom sends under two names.
+    """
+
+    def __init__(self, fallback: Optional[Callable[..., Any]] = None):
+        self._handlers: Dict[str, Callable[..., Any]] = {}
+        self.fallback = fallback
+
+    def on(self, event_types: Iterable[str], handler: Callable[..., Any]) -> "DispatchTable":
+        for event_type in ([event_types] if isinstance(event_types, str) else event_types):
+            self._handlers[event_type] = handler
+        return self
+
+    def handles(self, event_type: Optional[str]) -> bool:
+        return event_type in self._handlers
+
+    def __call__(self, event_type: Optional[str], *args: Any) -> Any:
+        handler = self._handlers.get(event_type, self.fallback)
+        if handler is None:
+            return None
+        return handler(*args)
+
+
+class WebhookIngestCore:
+    """
+    Framework-agnostic front half of every Zoom webhook entry point.
+
+    ``receive`` takes the body bytes and headers exactly as they arrived,
+    parses the body once, answers URL validation, checks the signature
+    against the same bytes and hands a ``Delivery`` to the sink. The sink
+    decides what happens next and what the caller answers:
+
+    - ``WebhookIngestQueue`` (FastAPI) queues the parsed event and acks
+    - ``ParticipantStoreSink`` (Flask) writes participants synchronously
+    - ``ForwardSink`` (Lambda) relays the untouched body to a backend
+
+    A sink is any object with ``accept(delivery) -> IngestResult``. Adapters
+    only translate their framework's request into ``receive`` and the
+    ``IngestResult`` back into a response.
+
+    With a secret configured every delivery must carry a valid signature
+    and a timestamp no older than ``MAX_TIMESTAMP_AGE_SECONDS``. Without
+    one (development) signatures are not checked at all.
+
+    ``secret=None`` makes the entry point a relay: signatures are left to
+    the sink's destination and URL validation is forwarded to it as well.
+    """
+
+    def __init__(self, sink: Any, secret: Optional[str] = ""):
+        self.sink = sink
+        self.secret = configured_secret() if secret == "" else secret
+        self.relay = secret is None
+
+    def receive(self, raw: bytes, headers: Mapping[str, str]) -> IngestResult:
+        try:
+            event = json.loads(raw)
+        except ValueError:
+            return IngestResult(400, {"error": "Invalid JSON body"})
+        if not isinstance(event, dict):
+            return IngestResult(400, {"error": "Webhook body must be a JSON object"})
+
+        delivery = Delivery(raw, headers, event)
+        if self.relay:
+            return self.sink.accept(delivery)
+
+        if delivery.event_type == URL_VALIDATION:
+            plain = (event.get("payload") or {}).get("plainToken")
+            if not isinstance(plain, str):
+                return IngestResult(400, {"error": "Missing plainToken"})
+            return IngestResult(200, {"plainToken": plain, "encryptedToken": encrypt_token(self.secret, plain)})
+
+        if self.secret:
+            rejected = self._check_signature(raw, headers)
+            if rejected:
+                return IngestResult(401, {"error": rejected})
+
+        return self.sink.accept(delivery)
+
+    def _check_signature(self, raw: bytes, headers: Mapping[str, str]) -> Optional[str]:
+        """Why a delivery fails verification, or None when it passes"""
+        signature = _header(headers, SIGNATURE_HEADER)
+        timestamp = _header(headers, TIMESTAMP_HEADER)
+        if not signature or not timestamp:
+            return "Missing signature"
+        try:
+            sent_at = int(timestamp)
+        except ValueError:
+            return "Invalid timestamp"
+        if abs(time.time() - sent_at) > MAX_TIMESTAMP_AGE_SECONDS:
+            return "Stale timestamp"
+        if not hmac.compare_digest(compute_signature(self.secret, timestamp, raw), signature):
+            return "Invalid signature"
+        return None
+
+
+class ForwardSink:
+    """Relays deliveries byte for byte, so the destination can check Zoom's signature"""
+
+    def __init__(self, url: str, timeout: float = 10):
+        self.url = url
+        self.timeout = timeout
+        # Follows redirects, e.g. ngrok's 307
+        self._opener = urllib.request.build_opener(urllib.request.HTTPRedirectHandler())
+
+    def accept(self, delivery: Delivery) -> IngestResult:
+        headers = {"Content-Type": "application/json"}
+        for name in (SIGNATURE_HEADER, TIMESTAMP_HEADER):
+            value = _header(delivery.headers, name)
+            if value:
+                headers[name] = value
+
+        request = urllib.request.Request(self.url, data=delivery.raw, headers=headers)
+        try:
+            with self._opener.open(request, timeout=self.timeout) as response:
+                return IngestResult(response.getcode(), self._json(response.read()))
+        except urllib.error.HTTPError as e:
+            return IngestResult(e.code, {"error": "Failed to forward webhook", "message": e.read().decode("utf-8", "replace")})
+        except urllib.error.URLError as e:
+            print(f"❌ Could not forward webhook to {self.url}: {e}")
+            return IngestResult(502, {"error": "Connection error", "message": str(e)})
+
+    @staticmethod
+    def _json(body: bytes) -> Dict[str, Any]:
+        if not body:
+            return {"status": "received"}
+        try:
+            return json.loads(body)
+        except ValueError:
+            return {"status": "received", "raw": body.decode("utf-8", "replace")}
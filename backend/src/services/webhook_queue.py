@@ -0,0 +1,191 @@
+from typing import Any, Dict, List, Tuple
+import asyncio
+import os
+import time
+from .zoom_webhook_service import ZoomWebhookService
+from .webhook_dedup import WebhookDeduplicator
+from .webhook_ingest import Delivery, IngestResult
+
+
+class WebhookIngestQueue:
+    """
+    Bounded in-process queue between the Zoom webhook endpoint and storage.
+
+    It is the sink of ``WebhookIngestCore`` for the FastAPI endpoint: the
+    core parses and verifies the delivery and ``accept`` queues it, so Zoom
+    gets its 200 before anything is written. A consumer takes up to
+    ``WEBHOOK_BATCH_SIZE`` queued deliveries at a time and hands them to
+    ``ZoomWebhookService``; events of different
+    meetings are processed concurrently (at most ``WEBHOOK_WORKERS`` at a
+    time) while events of one meeting stay in arrival order, so a leave is
+    never stored before its join. Runs of participant joins/leaves are
+    submitted to ``ParticipantWriteBatcher`` together so they share bulk
+    writes; it keeps their order. Repeated deliveries are dropped by
+    ``WebhookDeduplicator`` first; events that fail are released from it
+    again, so Zoom's retry of them is not mistaken for a duplicate.
+
+    When ``WEBHOOK_QUEUE_SIZE`` deliveries are waiting, ``offer`` refuses and
+    the endpoint answers 503 so Zoom retries later. ``stop`` stops
+    accepting and drains what is queued before the application exits.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(WebhookIngestQueue, cls).__new__(cls)
+            cls._instance._queue = None
+            cls._instance._consumer = None
+            cls._instance._accepting = False
+            cls._instance._service = ZoomWebhookService()
+            cls._instance._dedup = WebhookDeduplicator()
+            cls._instance.max_size = int(os.getenv("WEBHOOK_QUEUE_SIZE", "10000"))
+            cls._instance.workers = int(os.getenv("WEBHOOK_WORKERS", "8"))
+            cls._instance.batch_size = int(os.getenv("WEBHOOK_BATCH_SIZE", "200"))
+            cls._instance.drain_timeout = float(os.getenv("WEBHOOK_DRAIN_SECONDS", "10"))
+            cls._instance._reset_metrics()
+        return cls._instance
+
+    def _reset_metrics(self) -> None:
+        self._metrics = {
+            "received": 0,
+            "rejected": 0,
+            "processed": 0,
+            "failed": 0,
+            "duplicates": 0,
+            "batches": 0,
+            "highWaterMark": 0,
+            "lagTotalMs": 0.0,
+            "lagMaxMs": 0.0,
+        }
+
+    def start(self) -> None:
+        if self._consumer is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._accepting = True
+            self._consumer = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        """Stop accepting events and drain the queue (up to ``WEBHOOK_DRAIN_SECONDS``)"""
+        if self._consumer is None:
+            return
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️  Webhook queue shut down with {self._queue.qsize()} events unprocessed")
+        self._consumer.cancel()
+        try:
+            await self._consumer
+        except asyncio.CancelledError:
+            pass
+        self._consumer = None
+
+    def accept(self, delivery: Delivery) -> IngestResult:
+        """Sink entry point: ack a queued delivery, 503 (Zoom retries later) when full"""
+        if not self.offer(delivery):
+            return IngestResult(503, {"error": "Webhook queue is full"})
+        return IngestResult(200, {"status": "ok"})
+
+    def offer(self, delivery: Delivery) -> bool:
+        """Queue a parsed webhook delivery; False when the queue is full or shutting down"""
+        if not self._accepting:
+            self._metrics["rejected"] += 1
+            return False
+        try:
+            self._queue.put_nowait((delivery, time.monotonic()))
+        except asyncio.QueueFull:
+            self._metrics["rejected"] += 1
+            return False
+        self._metrics["received"] += 1
+        depth = self._queue.qsize()
+        if depth > self._metrics["highWaterMark"]:
+            self._metrics["highWaterMark"] = depth
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        metrics = dict(self._metrics)
+        done = metrics["processed"] + metrics["failed"]
+        metrics["depth"] = self._queue.qsize() if self._queue is not None else 0
+        metrics["capacity"] = self.max_size
+        metrics["accepting"] = self._accepting
+        lag_total = metrics.pop("lagTotalMs")
+        metrics["lagAvgMs"] = round(lag_total / done, 2) if done else 0.0
+        metrics["lagMaxMs"] = round(metrics["lagMaxMs"], 2)
+        return metrics
+
+    async def _consume(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._process_batch(batch)
+            except Exception as e:
+                print(f"❌ Webhook batch failed: {e}")
+                await self._dedup.release([delivery.event for delivery, _ in batch])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _process_batch(self, batch: List[Tuple[Delivery, float]]) -> None:
+        self._metrics["batches"] += 1
+        before = {key: self._metrics[key] for key in ("processed", "failed", "duplicates")}
+
+        # Zoom retries deliveries it thinks failed; drop the repeats
+        is_new = await self._dedup.mark_new([delivery.event for delivery, _ in batch])
+
+        # Per meeting, in arrival order
+        by_meeting: Dict[Any, List[Tuple[Dict[str, Any], float]]] = {}
+        for (delivery, queued_at), new in zip(batch, is_new):
+            if not new:
+                self._metrics["duplicates"] += 1
+                continue
+            by_meeting.setdefault(delivery.meeting_id, []).append((delivery.event, queued_at))
+
+        limit = asyncio.Semaphore(self.workers)
+        failed: List[Dict[str, Any]] = []
+
+        async def run(events: List[Tuple[Dict[str, Any], float]]):
+            async with limit:
+                index = 0
+                while index < len(events):
+                    # Consecutive joins/leaves go to ParticipantWriteBatcher
+                    # together; it applies them in submission order
+                    end = index
+                    while end < len(events) and self._service.is_batched_participant_event(events[end][0]):
+                        end += 1
+                    if end > index:
+                        await asyncio.gather(*[
+                            self._handle(event, queued_at, failed) for event, queued_at in events[index:end]
+                        ])
+                        index = end
+                    else:
+                        await self._handle(*events[index], failed)
+                        index += 1
+
+        await asyncio.gather(*[run(events) for events in by_meeting.values()])
+        if failed:
+            await self._dedup.release(failed)
+
+        # One line per batch; events are not logged one by one
+        counts = {key: self._metrics[key] - value for key, value in before.items()}
+        print(
+            f"📥 {len(batch)} Zoom events: {counts['processed']} processed, "
+            f"{counts['failed']} failed, {counts['duplicates']} duplicates"
+        )
+
+    async def _handle(self, event: Dict[str, Any], queued_at: float, failed: List[Dict[str, Any]]) -> None:
+        try:
+            result = await self._service.handle_event(event)
+            ok = result.get("status") != "error"
+        except Exception as e:
+            print(f"❌ Error handling Zoom event {event.get('event')}: {e}")
+            ok = False
+        self._metrics["processed" if ok else "failed"] += 1
+        if not ok:
+            failed.append(event)
+
+        lag = (time.monotonic() - queued_at) * 1000
+        self._metrics["lagTotalMs"] += lag
+        if lag > self._metrics["lagMaxMs"]:
+            self._metrics["lagMaxMs"] = lag
@@ -1,63 +1,222 @@
 import os
-import requests
+import asyncio
 import base64
+import random
+import time
+import httpx
 from typing import Optional
 from datetime import datetime, timedelta
-import json
+
+
+class ZoomDeliveryUnknown(Exception):
+    """
+    A message request went out but its outcome is unknown (5xx, or the
+    connection broke after sending). The message may have been posted, so
+    sending it again risks a duplicate.
+    """
 
 
 class ZoomChatService:
-    """Service to send messages to Zoom meeting chat using Zoom API"""
-    
-    def __init__(self):
-        self.client_id = os.getenv("ZOOM_CLIENT_ID", "")
-        self.client_secret = os.getenv("ZOOM_CLIENT_SECRET", "")
-        self.account_id = os.getenv("ZOOM_ACCOUNT_ID", "")
-        self.chatbot_jid = os.getenv("ZOOM_CHATBOT_JID", "")
-        self.access_token = None
-        self.token_expires_at = None
-    
-    def get_access_token(self) -> Optional[str]:
+    """
+    Service to send messages to Zoom meeting chat using Zoom API.
+
+    All calls go through one shared ``httpx.AsyncClient`` (keep-alive pool)
+    so they never block the event loop. Concurrent callers share a single
+    OAuth token refresh. Failed requests are retried with jittered
+    exponential backoff, honouring ``Retry-After``; once Zoom reports the
+    rate limit as exhausted every caller waits until it resets instead of
+    piling on more 429s.
+
+    Only retries that cannot duplicate a side effect are made: GETs and
+    token requests are retried on 429, 5xx and any transport error, while
+    other requests (chat message POSTs) only on 429 or when the connection
+    failed before the request was sent. When a message request may have
+    been applied, ``ZoomDeliveryUnknown`` is raised instead of returning
+    False, so callers can tell it from a rejection that is safe to retry.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ZoomChatService, cls).__new__(cls)
+            cls._instance.client_id = os.getenv("ZOOM_CLIENT_ID", "")
+            cls._instance.client_secret = os.getenv("ZOOM_CLIENT_SECRET", "")
+            cls._instance.account_id = os.getenv("ZOOM_ACCOUNT_ID", "")
+            cls._instance.chatbot_jid = os.getenv("ZOOM_CHATBOT_JID", "")
+            cls._instance.api_base_url = os.getenv("ZOOM_API_BASE_URL", "https://api.zoom.us/v2").rstrip("/")
+            cls._instance.oauth_url = os.getenv("ZOOM_OAUTH_URL", "https://zoom.us/oauth/token")
+            cls._instance.timeout = float(os.getenv("ZOOM_API_TIMEOUT_SECONDS", "10"))
+            cls._instance.max_retries = int(os.getenv("ZOOM_API_MAX_RETRIES", "3"))
+            cls._instance.backoff_base = 0.5
+            cls._instance.backoff_cap = 10.0
+            cls._instance.access_token = None
+            cls._instance.token_expires_at = None
+            cls._instance._token_refresh = None
+            cls._instance._client = None
+            cls._instance._blocked_until = 0.0
+        return cls._instance
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the connection pool (on application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_access_token(self) -> Optional[str]:
         """Get or refresh OAuth access token for Zoom API"""
         # Check if token is still valid
         if self.access_token and self.token_expires_at:
             if datetime.now() < self.token_expires_at:
                 return self.access_token
-        
+
+        # Only one refresh at a time; everyone else waits for its result
+        if self._token_refresh is not None:
+            return await asyncio.shield(self._token_refresh)
+
+        future = asyncio.get_running_loop().create_future()
+        self._token_refresh = future
+        try:
+            token = await self._fetch_access_token()
+            future.set_result(token)
+            return token
+        except Exception as e:
+            print(f"❌ Error getting Zoom access token: {e}")
+            return None
+        finally:
+            # Release waiters even if this refresh failed or was cancelled
+            if not future.done():
+                future.set_result(None)
+            self._token_refresh = None
+
+    def invalidate_token(self, token: str) -> None:
+        """Drop a token Zoom rejected so the next call fetches a new one"""
+        if self.access_token == token:
+            self.access_token = None
+            self.token_expires_at = None
+
+    async def _fetch_access_token(self) -> Optional[str]:
         # Get new token using Server-to-Server OAuth
         if not self.account_id or not self.client_id or not self.client_secret:
             print("⚠️  Zoom credentials not configured")
             return None
-        
-        try:
-            # Encode credentials
-            credentials = f"{self.client_id}:{self.client_secret}"
-            encoded_credentials = base64.b64encode(credentials.encode()).decode()
-            
-            # Request token
-            url = f"https://zoom.us/oauth/token?grant_type=account_credentials&account_id={self.account_id}"
-            headers = {
+
+        # Encode credentials
+        credentials = f"{self.client_id}:{self.client_secret}"
+        encoded_credentials = base64.b64encode(credentials.encode()).decode()
+
+        # Request token
+        response = await self._send(
+            "POST",
+            self.oauth_url,
+            params={"grant_type": "account_credentials", "account_id": self.account_id},
+            headers={
                 "Authorization": f"Basic {encoded_credentials}",
                 "Content-Type": "application/x-www-form-urlencoded"
-            }
-            
-            response = requests.post(url, headers=headers)
-            
-            if response.status_code == 200:
-                data = response.json()
-                self.access_token = data.get("access_token")
-                expires_in = data.get("expires_in", 3600)
-                self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)
-                print(f"✅ Zoom access token obtained (expires in {expires_in}s)")
-                return self.access_token
+            },
+            idempotent=True
+        )
+
+        if response is not None and response.status_code == 200:
+            data = response.json()
+            self.access_token = data.get("access_token")
+            expires_in = data.get("expires_in", 3600)
+            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)
+            print(f"✅ Zoom access token obtained (expires in {expires_in}s)")
+            return self.access_token
+        if response is not None:
+            print(f"❌ Failed to get Zoom token: {response.status_code} - {response.text}")
+        return None
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        # Full jitter keeps many callers from retrying in lockstep
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+        return delay
+
+    def _note_rate_limit(self, response: httpx.Response) -> None:
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        retry_after = response.headers.get("Retry-After")
+        if response.status_code == 429 or remaining == "0":
+            wait = float(retry_after) if retry_after and retry_after.isdigit() else 1.0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + min(wait, self.backoff_cap))
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        **kwargs
+    ) -> Optional[httpx.Response]:
+        """
+        Send a request with retries; None if it never got a response.
+
+        ``idempotent`` defaults to True for GET. A 5xx or an error after the
+        request went out (e.g. a read timeout) may mean a non-idempotent
+        request was applied, so it raises ``ZoomDeliveryUnknown`` instead
+        of being retried.
+        """
+        if idempotent is None:
+            idempotent = method.upper() == "GET"
+        client = self._get_client()
+        response = None
+        for attempt in range(self.max_retries + 1):
+            wait = self._blocked_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                response = await client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # Nothing was sent
+                print(f"⚠️  Zoom request failed ({type(e).__name__}), attempt {attempt + 1}")
+                response = None
+            except httpx.TransportError as e:
+                print(f"⚠️  Zoom request failed ({type(e).__name__}), attempt {attempt + 1}")
+                if not idempotent:
+                    raise ZoomDeliveryUnknown(f"{type(e).__name__} after {method} {url} was sent") from e
+                response = None
             else:
-                print(f"❌ Failed to get Zoom token: {response.status_code} - {response.text}")
+                self._note_rate_limit(response)
+                if response.status_code != 429 and response.status_code < 500:
+                    return response
+                print(f"⚠️  Zoom returned {response.status_code}, attempt {attempt + 1}")
+                if response.status_code != 429 and not idempotent:
+                    raise ZoomDeliveryUnknown(f"Zoom returned {response.status_code} to {method} {url}")
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._retry_delay(attempt, response))
+        return response
+
+    async def _api_request(self, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        """Authenticated Zoom API call; a rejected token is refreshed once"""
+        response = None
+        for _ in range(2):
+            token = await self.get_access_token()
+            if not token:
                 return None
-        except Exception as e:
-            print(f"❌ Error getting Zoom access token: {e}")
-            return None
-    
-    def send_message_to_meeting(
+            response = await self._send(
+                method,
+                f"{self.api_base_url}{path}",
+                headers={"Authorization": f"Bearer {token}"},
+                **kwargs
+            )
+            if response is None or response.status_code != 401:
+                return response
+            self.invalidate_token(token)
+        return response
+
+    async def send_message_to_meeting(
         self,
         meeting_id: str,
         message: str,
@@ -65,32 +224,29 @@ class ZoomChatService:
     ) -> bool:
         """
         Send a message to Zoom meeting chat
-        
+
         Args:
             meeting_id: The Zoom meeting ID
             message: The message to send
             bot_jid: The chatbot JID (optional, uses env var if not provided)
-        
+
         Returns:
-            True if message sent successfully, False otherwise
+            True if message sent successfully, False if it was not (safe to retry)
+
+        Raises:
+            ZoomDeliveryUnknown: the message may have been posted
         """
-        token = self.get_access_token()
+        token = await self.get_access_token()
         if not token:
             print("❌ Cannot send message: No access token")
             return False
-        
+
         jid = bot_jid or self.chatbot_jid
         if not jid:
             print("❌ Cannot send message: No chatbot JID configured")
             return False
-        
+
         try:
-            url = "https://api.zoom.us/v2/im/chat/messages"
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-            
             payload = {
                 "robot_jid": jid,
                 "to_jid": f"{meeting_id}@conference.zoomgov.com",  # Meeting channel
@@ -107,53 +263,53 @@ class ZoomChatService:
                     ]
                 }
             }
-            
-            response = requests.post(url, headers=headers, json=payload)
-            
-            if response.status_code in [200, 201]:
+
+            response = await self._api_request("POST", "/im/chat/messages", json=payload)
+
+            if response is not None and response.status_code in [200, 201]:
                 print(f"✅ Message sent to Zoom meeting {meeting_id}")
                 return True
-            else:
-                print(f"❌ Failed to send message: {response.status_code} - {response.text}")
-                # Try alternative format
-                return self._send_message_alternative(meeting_id, message, token, jid)
+            if response is None:
+                # No token, or the request never reached Zoom
+                return False
+            print(f"❌ Failed to send message: {response.status_code} - {response.text}")
+            if response.status_code == 429:
+                return False
+            # Rejected outright: try the alternative format
+            return await self._send_message_alternative(meeting_id, message)
+        except ZoomDeliveryUnknown:
+            raise
         except Exception as e:
             print(f"❌ Error sending message to Zoom: {e}")
             return False
-    
-    def _send_message_alternative(
+
+    async def _send_message_alternative(
         self,
         meeting_id: str,
-        message: str,
-        token: str,
-        jid: str
+        message: str
     ) -> bool:
         """Try alternative API format for sending messages"""
         try:
             # Alternative: Use in-meeting chat API
-            url = f"https://api.zoom.us/v2/meetings/{meeting_id}/chat"
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-            
             payload = {
                 "message": message
             }
-            
-            response = requests.post(url, headers=headers, json=payload)
-            
-            if response.status_code in [200, 201]:
+
+            response = await self._api_request("POST", f"/meetings/{meeting_id}/chat", json=payload)
+
+            if response is not None and response.status_code in [200, 201]:
                 print(f"✅ Message sent using alternative API")
                 return True
             else:
-                print(f"❌ Alternative API also failed: {response.status_code}")
+                print(f"❌ Alternative API also failed: {response.status_code if response is not None else 'no response'}")
                 return False
+        except ZoomDeliveryUnknown:
+            raise
         except Exception as e:
             print(f"❌ Alternative send also failed: {e}")
             return False
-    
-    def send_question_link(
+
+    async def send_question_link(
         self,
         meeting_id: str,
         question_text: str,
@@ -162,15 +318,18 @@ class ZoomChatService:
     ) -> bool:
         """
         Send a question link to Zoom meeting chat
-        
+
         Args:
             meeting_id: The Zoom meeting ID
             question_text: The question text
             question_url: The URL where students can answer
             time_limit: Time limit in seconds
-        
+
         Returns:
             True if sent successfully
+
+        Raises:
+            ZoomDeliveryUnknown: the message may have been posted
         """
         message = (
             f"📝 **NEW QUESTION** (Time limit: {time_limit}s)\n\n"
@@ -178,27 +337,25 @@ class ZoomChatService:
             f"👉 Click here to answer: {question_url}\n\n"
             f"⏱️ Answer quickly to get full points!"
         )
-        
-        return self.send_message_to_meeting(meeting_id, message)
-    
-    def test_connection(self) -> dict:
+
+        return await self.send_message_to_meeting(meeting_id, message)
+
+    async def test_connection(self) -> dict:
         """Test Zoom API connection"""
-        token = self.get_access_token()
-        
+        token = await self.get_access_token()
+
         if not token:
             return {
                 "success": False,
                 "message": "Failed to get access token",
                 "configured": bool(self.client_id and self.client_secret and self.account_id)
             }
-        
+
         try:
             # Test by getting user info
-            url = "https://api.zoom.us/v2/users/me"
-            headers = {"Authorization": f"Bearer {token}"}
-            response = requests.get(url, headers=headers)
-            
-            if response.status_code == 200:
+            response = await self._api_request("GET", "/users/me")
+
+            if response is not None and response.status_code == 200:
                 return {
                     "success": True,
                     "message": "Zoom API connection successful",
@@ -207,7 +364,7 @@ class ZoomChatService:
             else:
                 return {
                     "success": False,
-                    "message": f"API test failed: {response.status_code}",
+                    "message": f"API test failed: {response.status_code if response is not None else 'no response'}",
                     "configured": True
                 }
         except Exception as e:
@@ -216,4 +373,3 @@ class ZoomChatService:
                 "message": f"Connection test error: {str(e)}",
                 "configured": True
             }
-
@@ -0,0 +1,156 @@
+from typing import Any, Dict, Optional
+from datetime import datetime, timedelta
+import asyncio
+import os
+import random
+from ..models.zoom_outbox import ZoomOutboxModel
+from .zoom_chat_service import ZoomChatService, ZoomDeliveryUnknown
+
+
+class ZoomOutboxWorker:
+    """
+    Drains the ``zoom_outbox`` collection in the background.
+
+    ``ZOOM_OUTBOX_CONCURRENCY`` workers claim due jobs (leased, so a crashed
+    process's jobs are picked up again), deliver them through
+    ``ZoomChatService`` and record the outcome. A send can outlast the
+    lease (retries, backoff, token refresh), so the lease is extended every
+    third of its length until the send returns. Failed jobs are retried
+    with jittered exponential backoff and dead-lettered after
+    ``ZOOM_OUTBOX_MAX_ATTEMPTS``. A send that may have been posted anyway
+    (``ZoomDeliveryUnknown``) is never retried; the job is parked as
+    ``unknown``. Outcomes are only recorded while this worker still holds
+    the job's lease. Messages to one meeting go out in the
+    order they were queued: a job is put back while an older job for the
+    same meeting is still unfinished.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ZoomOutboxWorker, cls).__new__(cls)
+            cls._instance._tasks = []
+            cls._instance._wakeup = asyncio.Event()
+            cls._instance._sending = set()
+            cls._instance.concurrency = int(os.getenv("ZOOM_OUTBOX_CONCURRENCY", "4"))
+            cls._instance.max_attempts = int(os.getenv("ZOOM_OUTBOX_MAX_ATTEMPTS", "5"))
+            cls._instance.poll_interval = 1.0
+            cls._instance.lease = timedelta(seconds=120)
+            cls._instance.backoff_cap = 300.0
+        return cls._instance
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """A job was just queued; wake an idle worker instead of waiting for the next poll"""
+        self._wakeup.set()
+
+    async def enqueue_question_link(
+        self,
+        meeting_id: str,
+        session_id: str,
+        question_text: str,
+        question_url: str,
+        time_limit: int
+    ) -> dict:
+        job = await ZoomOutboxModel.enqueue(
+            meeting_id,
+            {
+                "type": "question_link",
+                "questionText": question_text,
+                "questionUrl": question_url,
+                "timeLimit": time_limit,
+            },
+            session_id=session_id
+        )
+        self.notify()
+        return job
+
+    async def _deliver(self, payload: Dict[str, Any], meeting_id: str) -> Optional[str]:
+        """Send one job; returns an error message or None on success, raises ZoomDeliveryUnknown"""
+        service = ZoomChatService()
+        if payload.get("type") == "question_link":
+            sent = await service.send_question_link(
+                meeting_id=meeting_id,
+                question_text=payload["questionText"],
+                question_url=payload["questionUrl"],
+                time_limit=payload.get("timeLimit", 30)
+            )
+        else:
+            sent = await service.send_message_to_meeting(meeting_id, payload["message"])
+        return None if sent else "Zoom did not accept the message"
+
+    def _retry_at(self, attempts: int) -> datetime:
+        delay = random.uniform(0.5, 1.0) * min(self.backoff_cap, 2 ** attempts)
+        return datetime.now() + timedelta(seconds=delay)
+
+    async def _process(self, job: dict) -> None:
+        job_id = job["id"]
+        if await ZoomOutboxModel.has_earlier_unfinished(job):
+            await ZoomOutboxModel.release(job, datetime.now() + timedelta(seconds=self.poll_interval))
+            return
+
+        heartbeat = asyncio.create_task(self._keep_leased(job))
+        unknown = False
+        try:
+            error = await self._deliver(job["payload"], job["meetingId"])
+        except ZoomDeliveryUnknown as e:
+            error, unknown = str(e), True
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            heartbeat.cancel()
+
+        if error is None:
+            recorded = await ZoomOutboxModel.mark_delivered(job)
+        elif unknown:
+            print(f"⚠️  Zoom message {job_id} may have been posted, not retrying: {error}")
+            recorded = await ZoomOutboxModel.mark_unknown(job, error)
+        elif job["attempts"] >= self.max_attempts:
+            print(f"❌ Zoom message {job_id} dead-lettered after {job['attempts']} attempts: {error}")
+            recorded = await ZoomOutboxModel.mark_failed(job, error, None)
+        else:
+            recorded = await ZoomOutboxModel.mark_failed(job, error, self._retry_at(job["attempts"]))
+        if not recorded:
+            print(f"⚠️  Zoom message {job_id} was reclaimed by another worker; outcome not recorded")
+
+    async def _keep_leased(self, job: dict) -> None:
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                if not await ZoomOutboxModel.extend_lease(job, self.lease):
+                    print(f"⚠️  Lease on Zoom message {job['id']} was lost while sending")
+                    return
+            except Exception as e:
+                print(f"⚠️  Could not extend lease on Zoom message {job['id']}: {e}")
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                job = await ZoomOutboxModel.claim(self.lease, skip_meetings=self._sending)
+                if job is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                self._sending.add(job["meetingId"])
+                try:
+                    await self._process(job)
+                finally:
+                    self._sending.discard(job["meetingId"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Zoom outbox worker error: {e}")
+                await asyncio.sleep(self.poll_interval)
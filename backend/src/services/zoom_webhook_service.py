@@ -2,18 +2,38 @@ from typing import Dict, Optional
 from datetime import datetime
 from ..models.zoom_event import ZoomMeetingEvent, ZoomParticipant
 from ..database.connection import get_database, get_database_by_name
+from ..models.zoom_attendance_model import participant_key
+from .participant_writer import ParticipantWriteBatcher
+from .attendance_sessionizer import AttendanceSessionizer
+from .event_archive import EventArchive
+from .webhook_ingest import (
+    DispatchTable,
+    PARTICIPANT_JOINED,
+    PARTICIPANT_LEFT,
+    URL_VALIDATION,
+    compute_signature,
+    configured_secret,
+    encrypt_token,
+)
 import hmac
-import hashlib
-import base64
-import os
-import json
+
+
+PARTICIPANT_EVENTS = set(PARTICIPANT_JOINED + PARTICIPANT_LEFT)
 
 
 class ZoomWebhookService:
     """Service to handle Zoom webhook events"""
     
     def __init__(self):
-        self.secret_token = os.getenv("ZOOM_WEBHOOK_SECRET_TOKEN", "")
+        self.secret_token = configured_secret()
+        self.dispatch = (
+            DispatchTable(fallback=self.handle_unknown_event)
+            .on("meeting.started", self.handle_meeting_started)
+            .on("meeting.ended", lambda event_data, raw_ref: self.handle_meeting_ended(event_data))
+            .on(PARTICIPANT_JOINED, self.handle_participant_joined)
+            .on(PARTICIPANT_LEFT, self.handle_participant_left)
+            .on("recording.completed", lambda event_data, raw_ref: self.handle_recording_completed(event_data))
+        )
     
     def verify_webhook(self, payload: bytes, signature: str, timestamp: str) -> bool:
         """Verify Zoom webhook signature"""
@@ -21,48 +41,29 @@ class ZoomWebhookService:
             # In development, allow without verification
             return True
         
-        message = f"v0:{timestamp}:{payload.decode('utf-8')}"
-        hash_signature = hmac.new(
-            self.secret_token.encode('utf-8'),
-            message.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
-        
-        expected_signature = f"v0={hash_signature}"
+        expected_signature = compute_signature(self.secret_token, timestamp, payload)
         return hmac.compare_digest(signature, expected_signature)
     
+    @staticmethod
+    def is_batched_participant_event(event_data: Dict) -> bool:
+        """Whether the event is a join/leave written through ParticipantWriteBatcher"""
+        if event_data.get("event") not in PARTICIPANT_EVENTS:
+            return False
+        meeting = event_data.get("payload", {}).get("object", {}) or {}
+        return bool((meeting.get("participant") or {}).get("participant_uuid"))
+    
     async def handle_event(self, event_data: Dict) -> Dict:
         """Handle incoming Zoom webhook event"""
         event_type = event_data.get("event")
-        print(f"📥 Received Zoom event: {event_type}")
-        print(f"   Event data: {event_data}")
         
         try:
-            if event_type == "endpoint.url_validation":
-                print("   → Handling URL validation")
+            if event_type == URL_VALIDATION:
                 return await self.handle_validation(event_data)
-            elif event_type == "meeting.started":
-                print("   → Handling meeting.started")
-                return await self.handle_meeting_started(event_data)
-            elif event_type == "meeting.ended":
-                print("   → Handling meeting.ended")
-                return await self.handle_meeting_ended(event_data)
-            elif event_type == "participant.joined" or event_type == "meeting.participant_joined":
-                print(f"   → Handling {event_type}")
-                return await self.handle_participant_joined(event_data)
-            elif event_type == "participant.left" or event_type == "meeting.participant_left":
-                print(f"   → Handling {event_type}")
-                return await self.handle_participant_left(event_data)
-            elif event_type == "recording.completed":
-                print("   → Handling recording.completed")
-                return await self.handle_recording_completed(event_data)
-            else:
-                print(f"   ⚠️  Unknown event type: {event_type}")
-                return {
-                    "status": "received",
-                    "event": event_type,
-                    "message": "Event logged but not processed"
-                }
+            
+            # The raw event goes to the on-disk archive; documents keep a pointer
+            raw_ref = EventArchive().append(event_data)
+            
+            return await self.dispatch(event_type, event_data, raw_ref)
         except Exception as e:
             print(f"❌ Error handling Zoom event: {e}")
             import traceback
@@ -72,6 +73,16 @@ class ZoomWebhookService:
                 "message": str(e)
             }
     
+    async def handle_unknown_event(self, event_data: Dict, raw_ref: Optional[Dict] = None) -> Dict:
+        """Events without a handler are archived but not processed"""
+        event_type = event_data.get("event")
+        print(f"   ⚠️  Unknown event type: {event_type}")
+        return {
+            "status": "received",
+            "event": event_type,
+            "message": "Event logged but not processed"
+        }
+    
     async def handle_validation(self, event_data: Dict) -> Dict:
         """Handle Zoom webhook URL validation"""
         plain_token = event_data.get("payload", {}).get("plainToken", "")
@@ -87,15 +98,9 @@ class ZoomWebhookService:
         if not self.secret_token:
             return ""
         
-        hash_signature = hmac.new(
-            self.secret_token.encode('utf-8'),
-            plain_token.encode('utf-8'),
-            hashlib.sha256
-        ).digest()
-        
-        return base64.b64encode(hash_signature).decode('utf-8')
+        return encrypt_token(self.secret_token, plain_token)
     
-    async def handle_meeting_started(self, event_data: Dict) -> Dict:
+    async def handle_meeting_started(self, event_data: Dict, raw_ref: Optional[Dict] = None) -> Dict:
         """Handle meeting started event"""
         # Get zoom_attendance database
         zoom_db = get_database_by_name("zoom_attendance")
@@ -107,7 +112,7 @@ class ZoomWebhookService:
         meeting = payload.get("object", {})
         
         if not meeting:
-            print(f"⚠️  No meeting object in payload: {payload}")
+            print("⚠️  No meeting object in meeting.started payload")
             return {"status": "error", "message": "No meeting object in payload"}
         
         # Parse start_time if it's a string
@@ -131,20 +136,12 @@ class ZoomWebhookService:
             "timezone": meeting.get("timezone", ""),
             "status": "started",
             "created_at": datetime.now(),
-            "raw_meeting_data": meeting  # Store raw data for reference
+            "raw_ref": raw_ref  # Raw event in the webhook archive (EventArchive.lookup)
         }
         
-        print(f"   💾 Saving to database: zoom_attendance, collection: meetings")
-        
         try:
             # Save to zoom_attendance database, meetings collection
-            result = await zoom_db.meetings.insert_one(meeting_data)
-            print(f"✅ Meeting stored successfully!")
-            print(f"      Database: zoom_attendance")
-            print(f"      Collection: meetings")
-            print(f"      Meeting ID: {meeting.get('id')}")
-            print(f"      Topic: {meeting.get('topic')}")
-            print(f"      MongoDB ID: {result.inserted_id}")
+            await zoom_db.meetings.insert_one(meeting_data)
         except Exception as e:
             print(f"❌ Error storing meeting: {e}")
             import traceback
@@ -179,8 +176,6 @@ class ZoomWebhookService:
         else:
             end_time = datetime.fromtimestamp(event_data.get("event_ts", 0) / 1000)
         
-        print(f"   💾 Updating in database: zoom_attendance, collection: meetings")
-        
         try:
             result = await zoom_db.meetings.update_one(
                 {"zoom_meeting_id": meeting_id},
@@ -194,25 +189,25 @@ class ZoomWebhookService:
                 }
             )
             
-            if result.modified_count > 0:
-                print(f"   ✅ Meeting ended updated: {meeting_id}")
-            else:
+            if result.matched_count == 0:
                 print(f"   ⚠️  Meeting not found to update: {meeting_id}")
         except Exception as e:
             print(f"   ❌ Error updating meeting: {e}")
             return {"status": "error", "message": f"Error updating meeting: {str(e)}"}
         
+        try:
+            await AttendanceSessionizer().meeting_ended(meeting_id, end_time)
+        except Exception as e:
+            print(f"   ⚠️  Attendance summary not updated: {e}")
+        
         return {
             "status": "success",
             "message": "Meeting ended event processed",
             "meeting_id": meeting_id
         }
     
-    async def handle_participant_joined(self, event_data: Dict) -> Dict:
+    async def handle_participant_joined(self, event_data: Dict, raw_ref: Optional[Dict] = None) -> Dict:
         """Handle participant joined event"""
-        print(f"   👤 Processing participant.joined event")
-        print(f"   Full event data: {json.dumps(event_data, indent=2, default=str)}")
-        
         # Get zoom_attendance database
         zoom_db = get_database_by_name("zoom_attendance")
         if zoom_db is None:
@@ -220,7 +215,6 @@ class ZoomWebhookService:
             return {"status": "error", "message": "Database not connected"}
         
         payload = event_data.get("payload", {})
-        print(f"   Payload keys: {list(payload.keys())}")
         
         # Zoom can send participant data in different structures
         # Try multiple possible locations
@@ -241,21 +235,8 @@ class ZoomWebhookService:
                 # Participant data might be directly in object
                 participant = obj
         
-        print(f"   Meeting ID: {meeting.get('id')}")
-        print(f"   Meeting object keys: {list(meeting.keys())}")
-        print(f"   Participant found: {bool(participant)}")
-        if participant:
-            print(f"   Participant keys: {list(participant.keys())}")
-            print(f"   Participant data: {participant}")
-        
         if not participant:
-            print("   ⚠️  No participant data found in event!")
-            print(f"   Full payload structure:")
-            print(f"   {json.dumps(payload, indent=2, default=str)}")
-            # Try to extract any user-like data
-            if "object" in payload:
-                obj = payload.get("object", {})
-                print(f"   Object contains: {list(obj.keys())}")
+            print(f"   ⚠️  No participant data in {event_data.get('event')} for meeting {meeting.get('id')}")
             return {"status": "error", "message": "No participant data in event"}
         
         # Parse join_time if it's a string
@@ -288,33 +269,38 @@ class ZoomWebhookService:
             "email": participant.get("email") or participant.get("user_email"),
             "participant_user_id": participant.get("participant_user_id"),
             "participant_uuid": participant.get("participant_uuid"),
+            "participant_key": participant_key(participant),
             "public_ip": participant.get("public_ip"),
             "private_ip": participant.get("private_ip"),
             "join_time": join_time,
             "status": "joined",
             "created_at": datetime.now(),
-            "raw_participant_data": participant  # Store raw data for debugging
+            "raw_ref": raw_ref  # Raw event in the webhook archive (EventArchive.lookup)
         }
         
-        print(f"   📝 Participant data to store: {participant_data}")
-        print(f"   💾 Saving to database: zoom_attendance, collection: participants")
-        
         try:
             # Save to zoom_attendance database, participants collection
-            result = await zoom_db.participants.insert_one(participant_data)
-            print(f"   ✅ Participant stored successfully!")
-            print(f"      Database: zoom_attendance")
-            print(f"      Collection: participants")
-            print(f"      Name: {participant_data.get('user_name')}")
-            print(f"      User ID: {participant_data.get('user_id')}")
-            print(f"      Meeting ID: {participant_data.get('zoom_meeting_id')}")
-            print(f"      MongoDB ID: {result.inserted_id}")
+            if participant_data.get("participant_uuid"):
+                # Batched with other joins/leaves; a rejoin reuses the document
+                await ParticipantWriteBatcher().join(participant_data)
+            else:
+                await zoom_db.participants.insert_one(participant_data)
         except Exception as e:
             print(f"   ❌ Error storing participant: {e}")
             import traceback
             traceback.print_exc()
             return {"status": "error", "message": f"Error storing participant: {str(e)}"}
         
+        try:
+            await AttendanceSessionizer().join(
+                participant_data["zoom_meeting_id"],
+                participant_data["participant_key"],
+                self._attendance_identity(participant_data),
+                join_time
+            )
+        except Exception as e:
+            print(f"   ⚠️  Attendance summary not updated: {e}")
+        
         return {
             "status": "success",
             "message": "Participant joined event processed",
@@ -322,11 +308,8 @@ class ZoomWebhookService:
             "user_id": participant_data.get("user_id")
         }
     
-    async def handle_participant_left(self, event_data: Dict) -> Dict:
+    async def handle_participant_left(self, event_data: Dict, raw_ref: Optional[Dict] = None) -> Dict:
         """Handle participant left event"""
-        print(f"   👋 Processing participant.left event")
-        print(f"   Full event data: {json.dumps(event_data, indent=2, default=str)}")
-        
         # Get zoom_attendance database
         zoom_db = get_database_by_name("zoom_attendance")
         if zoom_db is None:
@@ -337,32 +320,14 @@ class ZoomWebhookService:
         meeting = payload.get("object", {})
         participant = meeting.get("participant", {})
         
-        print(f"   Meeting ID: {meeting.get('id')}")
-        print(f"   Meeting object keys: {list(meeting.keys())}")
-        print(f"   Participant found: {bool(participant)}")
-        if participant:
-            print(f"   Participant keys: {list(participant.keys())}")
-            print(f"   Participant data: {participant}")
-        
         if not participant:
-            print("   ⚠️  No participant data in event!")
+            print(f"   ⚠️  No participant data in {event_data.get('event')} for meeting {meeting.get('id')}")
             return {"status": "error", "message": "No participant data in event"}
         
-        # Extract user_id using same logic as join handler
-        user_id = (
-            participant.get("user_id") or 
-            participant.get("id") or 
-            participant.get("participant_user_id") or
-            "unknown"
-        )
-        participant_user_id = participant.get("participant_user_id")
+        # Same canonical identity the join handler stored
+        key = participant_key(participant)
         meeting_id = meeting.get("id")
         
-        print(f"   🔍 Searching for participant:")
-        print(f"      Meeting ID: {meeting_id}")
-        print(f"      User ID: {user_id}")
-        print(f"      Participant User ID: {participant_user_id}")
-        
         # Parse leave_time if it's a string
         leave_time_str = participant.get("leave_time")
         if isinstance(leave_time_str, str):
@@ -373,81 +338,61 @@ class ZoomWebhookService:
         else:
             leave_time = datetime.fromtimestamp(event_data.get("event_ts", 0) / 1000)
         
-        print(f"   💾 Updating in database: zoom_attendance, collection: participants")
+        left_record = self._participant_left_record(meeting, participant, leave_time)
+        left_record["raw_ref"] = raw_ref
         
         try:
-            # Try multiple query combinations to find the participant
-            update_data = {
-                "$set": {
+            if participant.get("participant_uuid"):
+                # Batched upsert on (meeting, participant_uuid)
+                await ParticipantWriteBatcher().leave(left_record)
+            else:
+                # Close the most recent open join for this participant in one
+                # indexed lookup; the upsert records a leave whose join we missed
+                changes = {
                     "leave_time": leave_time,
                     "leave_reason": participant.get("leave_reason", ""),
                     "status": "left",
                     "updated_at": datetime.now()
                 }
-            }
-            
-            # First try: match by meeting_id and user_id (most common case)
-            query1 = {
-                "zoom_meeting_id": meeting_id,
-                "user_id": user_id
-            }
-            print(f"   🔍 Trying query 1: {query1}")
-            result = await zoom_db.participants.update_one(query1, update_data)
-            
-            if result.modified_count > 0:
-                print(f"   ✅ Participant left updated (query 1): {user_id}")
-            else:
-                # Second try: match by meeting_id and participant_user_id
-                if participant_user_id:
-                    query2 = {
-                        "zoom_meeting_id": meeting_id,
-                        "participant_user_id": participant_user_id
-                    }
-                    print(f"   🔍 Trying query 2: {query2}")
-                    result = await zoom_db.participants.update_one(query2, update_data)
-                    
-                    if result.modified_count > 0:
-                        print(f"   ✅ Participant left updated (query 2): {participant_user_id}")
-                    else:
-                        # Third try: match by meeting_id and email
-                        email = participant.get("email")
-                        if email:
-                            query3 = {
-                                "zoom_meeting_id": meeting_id,
-                                "email": email
-                            }
-                            print(f"   🔍 Trying query 3: {query3}")
-                            result = await zoom_db.participants.update_one(query3, update_data)
-                            
-                            if result.modified_count > 0:
-                                print(f"   ✅ Participant left updated (query 3): {email}")
-                            else:
-                                print(f"   ⚠️  Participant not found with any query")
-                                # Create new record if not found
-                                await self._create_participant_left_record(zoom_db, meeting, participant, leave_time)
-                        else:
-                            print(f"   ⚠️  Participant not found, creating new record")
-                            await self._create_participant_left_record(zoom_db, meeting, participant, leave_time)
-                else:
-                    print(f"   ⚠️  Participant not found, creating new record")
-                    await self._create_participant_left_record(zoom_db, meeting, participant, leave_time)
-            
-            # Log final result
-            print(f"   ✅ Participant left event processed successfully")
-            
+                on_insert = {
+                    k: v for k, v in left_record.items()
+                    if k not in changes and k not in ("zoom_meeting_id", "participant_key")
+                }
+                await zoom_db.participants.find_one_and_update(
+                    {"zoom_meeting_id": meeting_id, "participant_key": key, "status": "joined"},
+                    {"$set": changes, "$setOnInsert": on_insert},
+                    sort=[("join_time", -1)],
+                    upsert=True
+                )
         except Exception as e:
             print(f"   ❌ Error updating participant: {e}")
             import traceback
             traceback.print_exc()
             return {"status": "error", "message": f"Error updating participant: {str(e)}"}
         
+        try:
+            await AttendanceSessionizer().leave(
+                meeting_id, key, self._attendance_identity(left_record), leave_time
+            )
+        except Exception as e:
+            print(f"   ⚠️  Attendance summary not updated: {e}")
+        
         return {
             "status": "success",
             "message": "Participant left event processed"
         }
     
-    async def _create_participant_left_record(self, zoom_db, meeting: Dict, participant: Dict, leave_time: datetime):
-        """Helper method to create a new participant record for left event"""
+    @staticmethod
+    def _attendance_identity(participant_data: Dict) -> Dict:
+        """Fields copied onto the participant's attendance summary"""
+        return {
+            "user_id": participant_data.get("user_id"),
+            "user_name": participant_data.get("user_name"),
+            "email": participant_data.get("email"),
+        }
+    
+    def _participant_left_record(self, meeting: Dict, participant: Dict, leave_time: datetime) -> Dict:
+        """Participant record for a left event whose join was never stored"""
         user_id = (
             participant.get("user_id") or 
             participant.get("id") or 
@@ -464,6 +409,7 @@ class ZoomWebhookService:
             "email": participant.get("email"),
             "participant_user_id": participant.get("participant_user_id"),
             "participant_uuid": participant.get("participant_uuid"),
+            "participant_key": participant_key(participant),
             "public_ip": participant.get("public_ip"),
             "private_ip": participant.get("private_ip"),
             "join_time": None,  # We don't have join time for left events
@@ -472,12 +418,7 @@ class ZoomWebhookService:
             "status": "left",
             "created_at": datetime.now()
         }
-        
-        result = await zoom_db.participants.insert_one(participant_data)
-        print(f"   ✅ Created new participant record for left event")
-        print(f"      MongoDB ID: {result.inserted_id}")
-        print(f"      User: {participant_data.get('user_name')}")
-        print(f"      Meeting ID: {participant_data.get('zoom_meeting_id')}")
+        return participant_data
     
     async def handle_recording_completed(self, event_data: Dict) -> Dict:
         """Handle recording completed event"""
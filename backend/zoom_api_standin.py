@@ -0,0 +1,166 @@
+"""Local stand-in for the Zoom OAuth and chat APIs
+
+Serves the endpoints ZoomChatService calls, with configurable latency and
+injected 429/503 failures, so the client's pooling, single-flight token
+refresh and retry behaviour can be exercised without a Zoom account.
+
+    python zoom_api_standin.py --port 9100            # just serve
+    python zoom_api_standin.py --check --sends 200    # serve and drive ZoomChatService against it
+
+To point the backend at it, set in .env:
+
+    ZOOM_API_BASE_URL=http://127.0.0.1:9100/v2
+    ZOOM_OAUTH_URL=http://127.0.0.1:9100/oauth/token
+"""
+import argparse
+import asyncio
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+stats = Counter()
+tokens = set()
+settings = {"latency": 0.05, "fail_rate": 0.1, "rate_limit_every": 25}
+
+app = FastAPI()
+
+
+async def simulate(request: Request):
+    """Latency, auth check and injected failures shared by the API endpoints"""
+    await asyncio.sleep(settings["latency"])
+    stats["api_calls"] += 1
+    token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    if token not in tokens:
+        stats["unauthorized"] += 1
+        return JSONResponse({"code": 124, "message": "Invalid access token."}, status_code=401)
+    if settings["rate_limit_every"] and stats["api_calls"] % settings["rate_limit_every"] == 0:
+        stats["rate_limited"] += 1
+        return JSONResponse(
+            {"code": 429, "message": "Too many requests."},
+            status_code=429,
+            headers={"Retry-After": "1", "X-RateLimit-Remaining": "0"}
+        )
+    if random.random() < settings["fail_rate"]:
+        stats["server_errors"] += 1
+        return JSONResponse({"message": "Service unavailable"}, status_code=503)
+    return None
+
+
+@app.post("/oauth/token")
+async def oauth_token(grant_type: str, account_id: str):
+    await asyncio.sleep(settings["latency"] * 4)
+    stats["token_fetches"] += 1
+    token = secrets.token_urlsafe(16)
+    tokens.add(token)
+    return {"access_token": token, "token_type": "bearer", "expires_in": 3600}
+
+
+@app.post("/v2/im/chat/messages")
+async def chat_message(request: Request):
+    failure = await simulate(request)
+    if failure:
+        return failure
+    stats["messages"] += 1
+    return JSONResponse({"message_id": secrets.token_hex(8)}, status_code=201)
+
+
+@app.post("/v2/meetings/{meeting_id}/chat")
+async def meeting_chat(meeting_id: str, request: Request):
+    failure = await simulate(request)
+    if failure:
+        return failure
+    stats["alternative_messages"] += 1
+    return JSONResponse({}, status_code=201)
+
+
+@app.get("/v2/users/me")
+async def users_me(request: Request):
+    failure = await simulate(request)
+    return failure or {"id": "standin", "email": "standin@example.com"}
+
+
+@app.get("/_stats")
+async def get_stats():
+    return dict(stats)
+
+
+async def check(port: int, sends: int):
+    os.environ.update({
+        "ZOOM_CLIENT_ID": "standin",
+        "ZOOM_CLIENT_SECRET": "standin",
+        "ZOOM_ACCOUNT_ID": "standin",
+        "ZOOM_CHATBOT_JID": "standin@xmpp.zoom.us",
+        "ZOOM_API_BASE_URL": f"http://127.0.0.1:{port}/v2",
+        "ZOOM_OAUTH_URL": f"http://127.0.0.1:{port}/oauth/token",
+    })
+    from src.services.zoom_chat_service import ZoomChatService, ZoomDeliveryUnknown
+    service = ZoomChatService()
+
+    # A ticker shows whether Zoom calls ever stall the event loop
+    lag = [0.0]
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag[0] = max(lag[0], time.perf_counter() - before - 0.01)
+
+    ticking = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        service.send_question_link(f"8{i:09d}", "Stand-in question?", "http://localhost/question/x", 30)
+        for i in range(sends)
+    ], return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticking
+    await service.aclose()
+
+    unknown = sum(isinstance(result, ZoomDeliveryUnknown) for result in results)
+    print(f"   sent {sum(result is True for result in results)}/{sends} ({unknown} unknown) in {elapsed:.2f}s, max event loop lag {lag[0] * 1000:.1f} ms")
+    print(f"   stand-in saw: {dict(stats)}")
+
+
+def serve_and_check(port: int, sends: int):
+    # The stand-in gets its own thread and loop so the lag measured in
+    # check() is the client's alone
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    serving = threading.Thread(target=server.run, daemon=True)
+    serving.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        asyncio.run(check(port, sends))
+    finally:
+        server.should_exit = True
+        serving.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per API call")
+    parser.add_argument("--fail-rate", type=float, default=0.1, help="share of calls answered with 503")
+    parser.add_argument("--rate-limit-every", type=int, default=25, help="answer every Nth call with 429 (0 = never)")
+    parser.add_argument("--check", action="store_true", help="drive ZoomChatService against the stand-in")
+    parser.add_argument("--sends", type=int, default=100)
+    args = parser.parse_args()
+    settings.update(latency=args.latency, fail_rate=args.fail_rate, rate_limit_every=args.rate_limit_every)
+
+    if args.check:
+        serve_and_check(args.port, args.sends)
+    else:
+        uvicorn.run(app, host="127.0.0.1", port=args.port)
@@ -0,0 +1,131 @@
+"""
+Benchmark direct-message fan-out against a local Zoom API stand-in
+Compares the old one-at-a-time loop with ZoomChatAPI.send_bulk_messages
+
+    python benchmark_fanout.py --recipients 300 --latency 0.15 --rate 20
+"""
+import argparse
+import json
+import os
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandinState:
+    """Counters and rate limit of the stand-in"""
+
+    def __init__(self, latency, limit_per_second):
+        self.latency = latency
+        self.limit_per_second = limit_per_second
+        self.lock = threading.Lock()
+        self.window = 0
+        self.in_window = 0
+        self.messages = 0
+        self.rate_limited = 0
+        self.token_fetches = 0
+        self.connections = set()
+
+
+def make_handler(state):
+    class ZoomStandin(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like api.zoom.us
+
+        def log_message(self, *args):
+            pass
+
+        def reply(self, status, body, headers=None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            with state.lock:
+                state.connections.add(self.client_address)
+
+            if self.path.startswith('/oauth/token'):
+                with state.lock:
+                    state.token_fetches += 1
+                return self.reply(200, {'access_token': secrets.token_hex(8), 'expires_in': 3600})
+
+            time.sleep(state.latency)
+            with state.lock:
+                second = int(time.time())
+                if second != state.window:
+                    state.window, state.in_window = second, 0
+                state.in_window += 1
+                limited = state.in_window > state.limit_per_second
+                if limited:
+                    state.rate_limited += 1
+                else:
+                    state.messages += 1
+
+            if limited:
+                return self.reply(429, {'code': 429, 'message': 'Too many requests'}, {'Retry-After': '1'})
+            return self.reply(201, {'id': secrets.token_hex(8)})
+
+    return ZoomStandin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--recipients', type=int, default=300)
+    parser.add_argument('--latency', type=float, default=0.15, help='seconds per Zoom call')
+    parser.add_argument('--rate', type=float, default=20, help="stand-in's per-second limit")
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--serial-sample', type=int, default=30, help='recipients timed with the serial loop')
+    parser.add_argument('--port', type=int, default=9200)
+    args = parser.parse_args()
+
+    state = StandinState(args.latency, args.rate)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # The client reads its configuration when imported
+    os.environ.update({
+        'ZOOM_ACCOUNT_ID': 'standin',
+        'ZOOM_CLIENT_ID': 'standin',
+        'ZOOM_CLIENT_SECRET': 'standin',
+        'ZOOM_API_BASE_URL': f'http://127.0.0.1:{args.port}/v2',
+        'ZOOM_OAUTH_URL': f'http://127.0.0.1:{args.port}/oauth/token',
+        'ZOOM_CHAT_RATE_PER_SECOND': str(args.rate),
+        'ZOOM_CHAT_BURST': str(args.rate),
+        'ZOOM_FANOUT_WORKERS': str(args.workers),
+    })
+    import builtins
+    quiet_print = builtins.print
+    builtins.print = lambda *a, **k: None  # the client logs every send
+    try:
+        from zoom_chat import ZoomChatAPI
+        client = ZoomChatAPI()
+        users = [f'user-{i:04d}' for i in range(args.recipients)]
+
+        started = time.perf_counter()
+        for user_id in users[:args.serial_sample]:
+            client.send_chat_message(user_id, 'benchmark')
+        serial = (time.perf_counter() - started) / args.serial_sample
+
+        state.connections.clear()
+        started = time.perf_counter()
+        results = client.send_bulk_messages(users, 'benchmark')
+        elapsed = time.perf_counter() - started
+    finally:
+        builtins.print = quiet_print
+        server.shutdown()
+
+    print(f"serial loop : {1 / serial:6.1f} msg/s  -> {args.recipients} recipients in ~{serial * args.recipients:.0f}s")
+    print(f"fan-out     : {args.recipients / elapsed:6.1f} msg/s  -> {args.recipients} recipients in {elapsed:.1f}s "
+          f"({results['success']} ok, {results['failed']} failed)")
+    print(f"stand-in    : {state.rate_limited} rate-limited responses, {state.token_fetches} token fetch(es), "
+          f"{len(state.connections)} connections for the fan-out")
+
+
+if __name__ == '__main__':
+    main()
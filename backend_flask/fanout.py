@@ -0,0 +1,77 @@
+"""
+Concurrent message fan-out for Zoom direct messages
+Sends one message to many recipients from a bounded thread pool,
+rate limited by a token bucket shared by all sends
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, up to ``burst`` at once"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Drain the bucket so nobody sends for ``seconds`` (after a 429)"""
+        with self.lock:
+            self.tokens = min(self.tokens, -seconds * self.rate)
+            self.updated_at = time.monotonic()
+
+
+# Shared by every fan-out in this process, since Zoom's limit is per account
+rate_limiter = TokenBucket(
+    float(os.getenv('ZOOM_CHAT_RATE_PER_SECOND', '10')),
+    float(os.getenv('ZOOM_CHAT_BURST', '10'))
+)
+
+MAX_WORKERS = int(os.getenv('ZOOM_FANOUT_WORKERS', '16'))
+
+
+def fan_out(send, recipients, max_workers=MAX_WORKERS):
+    """
+    Call ``send(recipient)`` for every recipient concurrently
+
+    Args:
+        send (callable): Sends to one recipient and returns a result dict
+        recipients (list): Recipients, passed to ``send`` one at a time
+        max_workers (int): Upper bound on sends in flight
+
+    Yields:
+        tuple: (recipient, result) as each send finishes
+    """
+    if not recipients:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(recipients))) as pool:
+        futures = {pool.submit(send, recipient): recipient for recipient in recipients}
+
+        for future in as_completed(futures):
+            recipient = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            yield recipient, result
@@ -2,9 +2,12 @@
 Send question endpoint
 Broadcasts question links to all participants in a meeting
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from database import get_db
 from zoom_chat import get_zoom_chat
+from fanout import fan_out
+import json
+import time
 
 
 # Create Blueprint
@@ -20,11 +23,12 @@ def send_question():
     {
         "question_link": "https://example.com/question/abc123",
         "meeting_id": "123456789",
-        "send_to_meeting_chat": true  // Optional: if true, sends to meeting chat instead of DMs
+        "send_to_meeting_chat": true,  // Optional: if true, sends to meeting chat instead of DMs
+        "stream": false                // Optional: stream direct-message results as NDJSON
     }
     
     Returns:
-        JSON response with results
+        JSON response with results (or one JSON line per recipient when streaming)
     """
     print("\n" + "="*60)
     print("📤 SEND QUESTION REQUEST")
@@ -40,6 +44,7 @@ def send_question():
         question_link = data.get('question_link')
         meeting_id = data.get('meeting_id')
         send_to_meeting_chat = data.get('send_to_meeting_chat', True)  # Default to meeting chat
+        stream = data.get('stream', False)
         
         # Validate input
         if not question_link:
@@ -94,25 +99,27 @@ def send_question():
             
             print(f"✅ Found {len(participants)} participants")
             
-            # Send messages to all participants
+            # Send messages to all participants concurrently
+            def send(participant):
+                response = zoom_chat.send_chat_message(participant.get('user_id'), message)
+                
+                # Add participant info to response
+                response['name'] = participant.get('name', 'Unknown')
+                response['email'] = participant.get('email', '')
+                return response
+            
+            if stream:
+                return Response(
+                    stream_with_context(_stream_results(send, participants, meeting_id)),
+                    mimetype='application/x-ndjson'
+                )
+            
             results = []
             success_count = 0
             failed_count = 0
+            started = time.perf_counter()
             
-            for participant in participants:
-                user_id = participant.get('user_id')
-                name = participant.get('name', 'Unknown')
-                email = participant.get('email', '')
-                
-                print(f"\n📨 Sending to: {name} ({user_id})")
-                
-                # Send message
-                response = zoom_chat.send_chat_message(user_id, message)
-                
-                # Add participant info to response
-                response['name'] = name
-                response['email'] = email
-                
+            for participant, response in fan_out(send, participants):
                 results.append(response)
                 
                 if response.get('success'):
@@ -120,11 +127,14 @@ def send_question():
                 else:
                     failed_count += 1
             
+            elapsed = time.perf_counter() - started
+            
             print(f"\n{'='*60}")
             print(f"✅ SENDING COMPLETE")
             print(f"   Total: {len(participants)}")
             print(f"   Success: {success_count}")
             print(f"   Failed: {failed_count}")
+            print(f"   Took: {elapsed:.1f}s ({len(participants) / elapsed if elapsed else 0:.1f} msg/s)")
             print(f"{'='*60}\n")
             
             return jsonify({
@@ -145,6 +155,34 @@ def send_question():
         return jsonify({'error': str(e)}), 500
 
 
+def _stream_results(send, participants, meeting_id):
+    """
+    Yield one JSON line per recipient as its send finishes, then a summary line
+    
+    Args:
+        send (callable): Sends the message to one participant
+        participants (list): Participant documents
+        meeting_id (str): Zoom meeting ID
+    """
+    success_count = 0
+    started = time.perf_counter()
+    
+    for participant, response in fan_out(send, participants):
+        if response.get('success'):
+            success_count += 1
+        yield json.dumps({'type': 'result', **response}, default=str) + '\n'
+    
+    yield json.dumps({
+        'type': 'summary',
+        'meeting_id': meeting_id,
+        'method': 'direct_messages',
+        'total_participants': len(participants),
+        'success_count': success_count,
+        'failed_count': len(participants) - success_count,
+        'elapsed_seconds': round(time.perf_counter() - started, 3)
+    }) + '\n'
+
+
 @send_question_bp.route('/meetings/<meeting_id>/participants', methods=['GET'])
 def get_meeting_participants(meeting_id):
     """
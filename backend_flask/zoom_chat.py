@@ -5,7 +5,13 @@ Uses Server-to-Server OAuth for authentication
 import requests
 import base64
 import os
+import threading
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from fanout import fan_out, rate_limiter, MAX_WORKERS
+
+REQUEST_TIMEOUT = 10
+MAX_RATE_LIMIT_RETRIES = 3
 
 
 class ZoomChatAPI:
@@ -16,8 +22,18 @@ class ZoomChatAPI:
         self.client_id = os.getenv('ZOOM_CLIENT_ID')
         self.client_secret = os.getenv('ZOOM_CLIENT_SECRET')
         
+        self.api_base_url = os.getenv('ZOOM_API_BASE_URL', 'https://api.zoom.us/v2').rstrip('/')
+        self.oauth_url = os.getenv('ZOOM_OAUTH_URL', 'https://zoom.us/oauth/token')
+        
         self.access_token = None
         self.token_expires_at = None
+        self.token_lock = threading.Lock()
+        
+        # One keep-alive pool shared by every thread of a fan-out
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
     def get_access_token(self):
         """
@@ -31,6 +47,15 @@ class ZoomChatAPI:
             if datetime.now() < self.token_expires_at:
                 return self.access_token
         
+        # Fan-out threads share one refresh
+        with self.token_lock:
+            if self.access_token and self.token_expires_at:
+                if datetime.now() < self.token_expires_at:
+                    return self.access_token
+            return self._request_access_token()
+    
+    def _request_access_token(self):
+        """Request a new token from Zoom (caller holds token_lock)"""
         # Validate credentials
         if not all([self.account_id, self.client_id, self.client_secret]):
             print("❌ Missing Zoom credentials in environment variables")
@@ -42,7 +67,7 @@ class ZoomChatAPI:
             encoded_credentials = base64.b64encode(credentials.encode()).decode()
             
             # Request new token
-            url = f"https://zoom.us/oauth/token?grant_type=account_credentials&account_id={self.account_id}"
+            url = f"{self.oauth_url}?grant_type=account_credentials&account_id={self.account_id}"
             
             headers = {
                 "Authorization": f"Basic {encoded_credentials}",
@@ -50,7 +75,7 @@ class ZoomChatAPI:
             }
             
             print(f"🔑 Requesting Zoom access token...")
-            response = requests.post(url, headers=headers)
+            response = self.session.post(url, headers=headers, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 200:
                 data = response.json()
@@ -91,7 +116,7 @@ class ZoomChatAPI:
             }
         
         try:
-            url = f"https://api.zoom.us/v2/chat/users/{user_id}/messages"
+            url = f"{self.api_base_url}/chat/users/{user_id}/messages"
             
             headers = {
                 "Authorization": f"Bearer {token}",
@@ -103,7 +128,17 @@ class ZoomChatAPI:
             }
             
             print(f"📤 Sending direct message to user: {user_id}")
-            response = requests.post(url, headers=headers, json=payload)
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                rate_limiter.acquire()
+                response = self.session.post(url, headers=headers, json=payload, timeout=REQUEST_TIMEOUT)
+                if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                    break
+                
+                # Over Zoom's rate limit: hold every sender back, then retry
+                retry_after = response.headers.get('Retry-After', '1')
+                wait = float(retry_after) if retry_after.isdigit() else 1.0
+                print(f"⚠️  Rate limited by Zoom, pausing sends for {wait}s")
+                rate_limiter.pause(wait)
             
             if response.status_code in [200, 201]:
                 print(f"✅ Message sent successfully to {user_id}")
@@ -161,7 +196,7 @@ class ZoomChatAPI:
         
         try:
             # Use Chatbot API to send to meeting channel
-            url = "https://api.zoom.us/v2/im/chat/messages"
+            url = f"{self.api_base_url}/im/chat/messages"
             
             headers = {
                 "Authorization": f"Bearer {token}",
@@ -189,7 +224,7 @@ class ZoomChatAPI:
             }
             
             print(f"📤 Sending to meeting chat: {meeting_id}")
-            response = requests.post(url, headers=headers, json=payload)
+            response = self.session.post(url, headers=headers, json=payload, timeout=REQUEST_TIMEOUT)
             
             if response.status_code in [200, 201]:
                 print(f"✅ Message sent to meeting chat successfully")
@@ -236,8 +271,7 @@ class ZoomChatAPI:
         
         print(f"📨 Sending bulk messages to {len(user_ids)} users...")
         
-        for user_id in user_ids:
-            response = self.send_chat_message(user_id, message)
+        for user_id, response in fan_out(lambda recipient: self.send_chat_message(recipient, message), user_ids):
             results['responses'].append(response)
             
             if response.get('success'):
@@ -267,10 +301,10 @@ class ZoomChatAPI:
         
         try:
             # Test by getting user info
-            url = "https://api.zoom.us/v2/users/me"
+            url = f"{self.api_base_url}/users/me"
             headers = {"Authorization": f"Bearer {token}"}
             
-            response = requests.get(url, headers=headers)
+            response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
             
             if response.status_code == 200:
                 return {
@@ -1,131 +1,95 @@
-from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import JSONResponse
-import hmac
-import hashlib
-import os
+"""
+Zoom webhook endpoint (Flask adapter)
+Parsing, URL validation and signature checks live in the shared ingestion
+core (backend/src/services/webhook_ingest.py); this module only stores
+participants as they join and leave
+"""
+from flask import Blueprint, request, jsonify
 from datetime import datetime
-import base64
-from src.database.connection import get_database
-
-router = APIRouter(prefix="/api/zoom", tags=["Zoom Webhook"])
-
-# -------------------------------------------------------------------
-# VERIFY SIGNATURE
-# -------------------------------------------------------------------
-def verify_signature(secret: str, payload: bytes, timestamp: str, signature: str):
-    message = f"v0:{timestamp}:{payload.decode('utf-8')}"
-    hash_signature = hmac.new(
-        secret.encode("utf-8"),
-        message.encode("utf-8"),
-        hashlib.sha256
-    ).hexdigest()
-    expected_signature = f"v0={hash_signature}"
-    return hmac.compare_digest(signature, expected_signature)
-
-
-# -------------------------------------------------------------------
-# MAIN WEBHOOK ENDPOINT
-# -------------------------------------------------------------------
-@router.post("/webhook")
-async def zoom_webhook(request: Request):
-    try:
-        payload_raw = await request.body()
-        data = await request.json()
-
-        event = data.get("event", "")
-        print("\n============================")
-        print(f"🔔 ZOOM EVENT RECEIVED: {event}")
-        print("============================")
-
-        # URL VALIDATION EVENT
-        if event == "endpoint.url_validation":
-            return await handle_url_validation(data)
-
-        # PARTICIPANT JOIN
-        if event in ["meeting.participant_joined", "participant.joined"]:
-            return await handle_participant_joined(data)
-
-        # PARTICIPANT LEFT
-        if event in ["meeting.participant_left", "participant.left"]:
-            return await handle_participant_left(data)
-
-        return {"status": "ignored", "event": event}
-
-    except Exception as e:
-        print("❌ Webhook error:", e)
-        return JSONResponse(status_code=500, content={"error": str(e)})
-
-
-# -------------------------------------------------------------------
-# URL VALIDATION
-# -------------------------------------------------------------------
-async def handle_url_validation(data: dict):
-    print("🔐 Handling URL validation...")
-
-    plain_token = data["payload"]["plainToken"]
-    secret = os.getenv("ZOOM_WEBHOOK_SECRET", "")
-
-    if not secret:
-        raise HTTPException(status_code=500, detail="ZOOM_WEBHOOK_SECRET not set")
-
-    hashed = hmac.new(
-        secret.encode("utf-8"),
-        plain_token.encode("utf-8"),
-        hashlib.sha256
-    ).digest()
-
-    encrypted_token = base64.b64encode(hashed).decode("utf-8")
-
-    return {
-        "plainToken": plain_token,
-        "encryptedToken": encrypted_token
-    }
-
-
-# -------------------------------------------------------------------
-# PARTICIPANT JOINED
-# -------------------------------------------------------------------
-async def handle_participant_joined(data: dict):
-    payload = data["payload"]["object"]
-    participant = payload.get("participant", {})
-
-    db = get_database()
-    await db.participants.insert_one({
-        "meeting_id": payload.get("id"),
-        "user_id": participant.get("user_id") or participant.get("id"),
-        "name": participant.get("user_name") or participant.get("name"),
-        "email": participant.get("email"),
-        "join_time": datetime.utcnow(),
-        "status": "joined",
-    })
-
-    print("✅ Participant stored (joined)")
-    return {"status": "success", "event": "joined"}
-
-
-# -------------------------------------------------------------------
-# PARTICIPANT LEFT
-# -------------------------------------------------------------------
-async def handle_participant_left(data: dict):
-    payload = data["payload"]["object"]
-    participant = payload.get("participant", {})
-
-    meeting_id = payload.get("id")
-    user_id = participant.get("user_id") or participant.get("id")
-
-    db = get_database()
-    await db.participants.update_one(
-        {"meeting_id": meeting_id, "user_id": user_id},
-        {"$set": {"left_time": datetime.utcnow(), "status": "left"}}
-    )
-
-    print("👋 Participant left updated")
-    return {"status": "success", "event": "left"}
-
-
-# -------------------------------------------------------------------
-# TEST ENDPOINT
-# -------------------------------------------------------------------
-@router.get("/webhook/test")
-async def test():
-    return {"status": "ok", "message": "Webhook active"}
+from pathlib import Path
+import sys
+
+from database import get_db
+
+# The core is plain Python; import it from the FastAPI backend's tree
+backend_dir = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(backend_dir))
+
+from src.services.webhook_ingest import (
+    DispatchTable,
+    IngestResult,
+    PARTICIPANT_JOINED,
+    PARTICIPANT_LEFT,
+    WebhookIngestCore,
+)
+
+
+# Create Blueprint
+webhook_bp = Blueprint('zoom_webhook', __name__, url_prefix='/api/zoom')
+
+
+class ParticipantStoreSink:
+    """Writes joins and leaves to the participants collection before answering"""
+
+    def __init__(self):
+        self.dispatch = (
+            DispatchTable(fallback=lambda delivery: {'status': 'ignored', 'event': delivery.event_type})
+            .on(PARTICIPANT_JOINED, self.participant_joined)
+            .on(PARTICIPANT_LEFT, self.participant_left)
+        )
+
+    def accept(self, delivery):
+        print(f"🔔 ZOOM EVENT RECEIVED: {delivery.event_type}")
+        try:
+            return IngestResult(200, self.dispatch(delivery.event_type, delivery))
+        except Exception as e:
+            print(f"❌ Webhook error: {e}")
+            return IngestResult(500, {'error': str(e)})
+
+    @staticmethod
+    def _participant(delivery):
+        participant = ((delivery.event.get('payload') or {}).get('object') or {}).get('participant') or {}
+        return participant, participant.get('user_id') or participant.get('id')
+
+    def participant_joined(self, delivery):
+        participant, user_id = self._participant(delivery)
+        if not user_id:
+            return {'status': 'ignored', 'event': delivery.event_type, 'reason': 'no user id'}
+        get_db().add_participant({
+            'meeting_id': str(delivery.meeting_id),
+            'user_id': str(user_id),
+            'name': participant.get('user_name') or participant.get('name'),
+            'email': participant.get('email'),
+            'join_time': datetime.utcnow(),
+            'status': 'joined'
+        })
+        return {'status': 'success', 'event': 'joined'}
+
+    def participant_left(self, delivery):
+        _, user_id = self._participant(delivery)
+        if not user_id:
+            return {'status': 'ignored', 'event': delivery.event_type, 'reason': 'no user id'}
+        # Questions are only sent to participants still in the meeting
+        get_db().remove_participant(delivery.meeting_id, user_id)
+        return {'status': 'success', 'event': 'left'}
+
+
+ingest = WebhookIngestCore(ParticipantStoreSink())
+
+
+@webhook_bp.route('/webhook', methods=['POST'])
+def zoom_webhook():
+    """
+    Receive Zoom webhook events
+
+    Returns:
+        JSON response from the ingestion core
+    """
+    result = ingest.receive(request.get_data(), request.headers)
+    return jsonify(result.body), result.status_code
+
+
+@webhook_bp.route('/webhook/test', methods=['GET'])
+def test():
+    """Check that the webhook endpoint is registered"""
+    return jsonify({'status': 'ok', 'message': 'Webhook active'})